@@ -0,0 +1,16 @@
+# coding: utf-8
+
+import sys
+
+
+collect_ignore = []
+
+if sys.version_info < (3, 5):
+    # Modules and tests which use "async" and "await".
+    collect_ignore.extend([
+        "il2fb/parsers/game_log/servers.py",
+        "il2fb/parsers/game_log/tailing.py",
+        "tests/test_bus.py",
+        "tests/test_servers.py",
+        "tests/test_tailing.py",
+    ])
@@ -0,0 +1,471 @@
+# coding: utf-8
+"""
+Compact binary archives of events.
+
+Archive consists of a header, a sequence of records and a footer. Records are
+either events or definitions of strings. Strings (callsigns, names of
+aircraft, codes of flights, paths of buildings, etc.) are interned: each of
+them is defined once before the first event which refers to it, and events
+refer to strings by their indices. Events are stored as their type codes,
+time as seconds of day, positions as fixed-point integers and other fields
+as integers or indices of strings. Fields which are ``None`` (e.g. skipped by
+projection) are not stored at all.
+
+Records can be read sequentially from any stream, even from an unfinished
+archive. Footer contains the whole table of strings and offsets of events,
+so events of finished archives can be accessed randomly.
+
+All numbers are stored in little-endian byte order.
+
+"""
+
+import array
+import datetime
+import struct
+
+from il2fb.commons import actors
+from il2fb.commons.organization import Belligerents
+from il2fb.commons.spatial import Point2D
+
+from .taxonomy import get_event_class, get_event_type_code
+
+
+ARCHIVE_MAGIC = b"IL2FBEVA"
+ARCHIVE_FORMAT_VERSION = 1
+
+#: Positions are stored with precision of 2 digits after point, as in logs.
+POSITION_SCALE = 100
+
+HEADER = struct.Struct("<8sH")
+TRAILER = struct.Struct("<QQ8s")
+
+RECORD_TAG = struct.Struct("<B")
+STRING_RECORD = 0
+EVENT_RECORD = 1
+FOOTER_RECORD = 2
+
+EVENT_HEAD = struct.Struct("<HB")
+LENGTH = struct.Struct("<I")
+OFFSET = struct.Struct("<Q")
+
+TIME = struct.Struct("<I")
+DATE = struct.Struct("<I")
+POSITION = struct.Struct("<ii")
+BELLIGERENT = struct.Struct("<B")
+INTEGER = struct.Struct("<i")
+STRING = struct.Struct("<I")
+ACTOR = struct.Struct("<B")
+
+FIELD_KINDS = {
+    'time': TIME,
+    'date': DATE,
+    'pos': POSITION,
+    'belligerent': BELLIGERENT,
+    'actor': ACTOR,
+    'attacker': ACTOR,
+    'assistant': ACTOR,
+    'seat': ACTOR,
+    'index': INTEGER,
+    'fuel': INTEGER,
+}
+
+#: Schemas of actors. Tag of actor is its index plus one.
+ACTOR_SCHEMAS = (
+    (actors.Human, (
+        ('callsign', STRING),
+    )),
+    (actors.HumanAircraft, (
+        ('callsign', STRING),
+        ('aircraft', STRING),
+    )),
+    (actors.HumanAircraftCrewMember, (
+        ('callsign', STRING),
+        ('aircraft', STRING),
+        ('index', INTEGER),
+    )),
+    (actors.AIAircraft, (
+        ('flight', STRING),
+        ('aircraft', INTEGER),
+    )),
+    (actors.AIAircraftCrewMember, (
+        ('flight', STRING),
+        ('aircraft', INTEGER),
+        ('index', INTEGER),
+    )),
+    (actors.StationaryUnit, (
+        ('id', STRING),
+    )),
+    (actors.MovingUnit, (
+        ('id', STRING),
+    )),
+    (actors.MovingUnitMember, (
+        ('id', STRING),
+        ('index', INTEGER),
+    )),
+    (actors.Building, (
+        ('name', STRING),
+    )),
+    (actors.Bridge, (
+        ('id', STRING),
+    )),
+)
+
+ACTOR_TAGS = {
+    actor_class: tag
+    for tag, (actor_class, schema) in enumerate(ACTOR_SCHEMAS, 1)
+}
+
+
+class ArchiveFormatError(ValueError):
+    pass
+
+
+def get_event_schema(event_class):
+    """
+    Get a tuple of pairs of field names and their kinds for a given event
+    class.
+
+    """
+    return tuple(
+        (name, FIELD_KINDS.get(name, STRING))
+        for name in event_class.__slots__
+    )
+
+
+class EventEncoder(object):
+    """
+    Encoder of events into bytes.
+
+    ``intern`` is a callable which takes a string and returns its index
+    within a table of strings.
+
+    """
+
+    def __init__(self, intern):
+        self._intern = intern
+        self._schemas = {}
+
+    def encode(self, event, buffer):
+        """
+        Append encoded event to a given ``bytearray``.
+
+        """
+        type_code = get_event_type_code(event)
+        schema = self._schemas.get(type_code)
+
+        if schema is None:
+            schema = get_event_schema(get_event_class(type_code))
+            self._schemas[type_code] = schema
+
+        payload = bytearray()
+        mask = 0
+
+        for bit, (name, kind) in enumerate(schema):
+            value = getattr(event, name)
+
+            if value is not None:
+                mask |= 1 << bit
+                self._encode_value(value, kind, payload)
+
+        buffer += EVENT_HEAD.pack(type_code, mask)
+        buffer += payload
+
+    def _encode_value(self, value, kind, buffer):
+        if kind is STRING:
+            buffer += STRING.pack(self._intern(value))
+        elif kind is TIME:
+            seconds = value.hour * 3600 + value.minute * 60 + value.second
+            buffer += TIME.pack(seconds)
+        elif kind is POSITION:
+            buffer += POSITION.pack(
+                int(round(value.x * POSITION_SCALE)),
+                int(round(value.y * POSITION_SCALE)),
+            )
+        elif kind is ACTOR:
+            self._encode_actor(value, buffer)
+        elif kind is INTEGER:
+            buffer += INTEGER.pack(value)
+        elif kind is DATE:
+            buffer += DATE.pack(value.toordinal())
+        elif kind is BELLIGERENT:
+            buffer += BELLIGERENT.pack(value.value)
+
+    def _encode_actor(self, actor, buffer):
+        try:
+            tag = ACTOR_TAGS[actor.__class__]
+        except KeyError:
+            raise ValueError(
+                "Unsupported actor: {0}".format(actor.__class__.__name__)
+            )
+
+        buffer += ACTOR.pack(tag)
+        schema = ACTOR_SCHEMAS[tag - 1][1]
+
+        for name, kind in schema:
+            self._encode_value(getattr(actor, name), kind, buffer)
+
+
+class EventDecoder(object):
+    """
+    Decoder of events from bytes.
+
+    ``strings`` is a sequence of strings referred by events. It may grow
+    while decoder is in use.
+
+    """
+
+    def __init__(self, strings):
+        self._strings = strings
+        self._schemas = {}
+
+    def decode(self, read):
+        """
+        Decode a single event. ``read`` is a callable which takes a number of
+        bytes and returns them.
+
+        """
+        type_code, mask = EVENT_HEAD.unpack(read(EVENT_HEAD.size))
+        event_class = get_event_class(type_code)
+        schema = self._schemas.get(type_code)
+
+        if schema is None:
+            schema = get_event_schema(event_class)
+            self._schemas[type_code] = schema
+
+        data = {}
+
+        for bit, (name, kind) in enumerate(schema):
+            if mask & (1 << bit):
+                data[name] = self._decode_value(kind, read)
+            else:
+                data[name] = None
+
+        return event_class(**data)
+
+    def _decode_value(self, kind, read):
+        if kind is ACTOR:
+            return self._decode_actor(read)
+
+        values = kind.unpack(read(kind.size))
+
+        if kind is STRING:
+            return self._strings[values[0]]
+        elif kind is TIME:
+            seconds = values[0]
+            return datetime.time(
+                seconds // 3600, seconds % 3600 // 60, seconds % 60,
+            )
+        elif kind is POSITION:
+            return Point2D(
+                values[0] / float(POSITION_SCALE),
+                values[1] / float(POSITION_SCALE),
+            )
+        elif kind is INTEGER:
+            return values[0]
+        elif kind is DATE:
+            return datetime.date.fromordinal(values[0])
+        elif kind is BELLIGERENT:
+            return Belligerents.get_by_value(values[0])
+
+    def _decode_actor(self, read):
+        tag = ACTOR.unpack(read(ACTOR.size))[0]
+
+        try:
+            actor_class, schema = ACTOR_SCHEMAS[tag - 1]
+        except IndexError:
+            raise ArchiveFormatError("Unknown tag of actor: {0}".format(tag))
+
+        return actor_class(*[
+            self._decode_value(kind, read)
+            for name, kind in schema
+        ])
+
+
+def _pack_string(value):
+    data = value.encode('utf-8')
+    return LENGTH.pack(len(data)) + data
+
+
+class ArchiveWriter(object):
+    """
+    Writer of events into a binary stream.
+
+    Archive must be closed to write its footer. Stream itself is not closed.
+
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._strings = {}
+        self._string_list = []
+        self._offsets = array.array('Q')
+        self._encoder = EventEncoder(self._intern)
+        self._offset = 0
+        self._closed = False
+        self._write(HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_FORMAT_VERSION))
+
+    def _write(self, data):
+        self._stream.write(data)
+        self._offset += len(data)
+
+    def _intern(self, value):
+        index = self._strings.get(value)
+
+        if index is None:
+            index = len(self._string_list)
+            self._strings[value] = index
+            self._string_list.append(value)
+            self._write(RECORD_TAG.pack(STRING_RECORD) + _pack_string(value))
+
+        return index
+
+    def write(self, event):
+        buffer = bytearray(RECORD_TAG.pack(EVENT_RECORD))
+        self._encoder.encode(event, buffer)
+        self._offsets.append(self._offset)
+        self._write(bytes(buffer))
+
+    def write_many(self, events):
+        for event in events:
+            self.write(event)
+
+    def close(self):
+        if self._closed:
+            return
+
+        footer_offset = self._offset
+        buffer = bytearray(RECORD_TAG.pack(FOOTER_RECORD))
+        buffer += LENGTH.pack(len(self._string_list))
+
+        for value in self._string_list:
+            buffer += _pack_string(value)
+
+        offsets = self._offsets
+        buffer += struct.pack("<{0}Q".format(len(offsets)), *offsets)
+        buffer += TRAILER.pack(footer_offset, len(offsets), ARCHIVE_MAGIC)
+
+        self._write(bytes(buffer))
+        self._stream.flush()
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _is_seekable(stream):
+    seekable = getattr(stream, 'seekable', None)
+
+    if seekable is not None:
+        return seekable()
+
+    # File objects of Python 2 do not tell whether they are seekable.
+    try:
+        stream.seek(0, 1)
+    except (IOError, OSError):
+        return False
+
+    return True
+
+
+class ArchiveReader(object):
+    """
+    Reader of events from a binary stream.
+
+    Iteration reads events sequentially and works with any stream. Random
+    access requires a seekable stream with a finished archive.
+
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._strings = None
+        self._offsets = None
+
+        magic, version = HEADER.unpack(self._read(HEADER.size))
+
+        if magic != ARCHIVE_MAGIC:
+            raise ArchiveFormatError("Stream does not contain an archive")
+
+        if version != ARCHIVE_FORMAT_VERSION:
+            raise ArchiveFormatError(
+                "Unsupported version of archive format: {0}".format(version)
+            )
+
+    def _read(self, size):
+        data = self._stream.read(size)
+
+        if len(data) != size:
+            raise ArchiveFormatError("Unexpected end of archive")
+
+        return data
+
+    def _read_string(self):
+        size = LENGTH.unpack(self._read(LENGTH.size))[0]
+        return self._read(size).decode('utf-8')
+
+    def __iter__(self):
+        if _is_seekable(self._stream):
+            self._stream.seek(HEADER.size)
+
+        strings = []
+        decoder = EventDecoder(strings)
+
+        while True:
+            tag = self._stream.read(RECORD_TAG.size)
+
+            if not tag:
+                break
+
+            tag = RECORD_TAG.unpack(tag)[0]
+
+            if tag == EVENT_RECORD:
+                yield decoder.decode(self._read)
+            elif tag == STRING_RECORD:
+                strings.append(self._read_string())
+            elif tag == FOOTER_RECORD:
+                break
+            else:
+                raise ArchiveFormatError(
+                    "Unknown tag of record: {0}".format(tag)
+                )
+
+    def _load_footer(self):
+        self._stream.seek(-TRAILER.size, 2)
+        footer_offset, count, magic = TRAILER.unpack(
+            self._read(TRAILER.size)
+        )
+
+        if magic != ARCHIVE_MAGIC:
+            raise ArchiveFormatError("Archive is not finished")
+
+        self._stream.seek(footer_offset + RECORD_TAG.size)
+        size = LENGTH.unpack(self._read(LENGTH.size))[0]
+        self._strings = [self._read_string() for i in range(size)]
+        self._offsets = array.array('Q', struct.unpack(
+            "<{0}Q".format(count),
+            self._read(OFFSET.size * count),
+        ))
+
+    def count(self):
+        """
+        Get number of events in a finished archive.
+
+        """
+        if self._offsets is None:
+            self._load_footer()
+
+        return len(self._offsets)
+
+    def get(self, index):
+        """
+        Get event by its index in a finished archive.
+
+        """
+        if self._offsets is None:
+            self._load_footer()
+
+        self._stream.seek(self._offsets[index] + RECORD_TAG.size)
+        return EventDecoder(self._strings).decode(self._read)
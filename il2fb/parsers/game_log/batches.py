@@ -0,0 +1,346 @@
+# coding: utf-8
+"""
+Columnar batches of events in shared memory.
+
+Worker processes write parsed events into blocks of shared memory instead
+of pickling them to parent process. A block contains columns of type codes,
+times (seconds of day), positions (fixed-point integers) and identifiers of
+actors (indices within a table of strings of the batch), so parent can scan
+them through zero-copy views. Every event is also stored in the format of
+binary archives, so full event objects are rebuilt only on demand.
+
+Columns use native byte order, as blocks never leave their host. Missing
+times and actors are stored as ``-1``, missing positions as
+``MISSING_POSITION``.
+
+Requires Python 3.8+. Not available on Windows, where a block is freed as
+soon as its last handle is closed, so it cannot outlive the worker which
+writes it.
+
+"""
+
+import array
+import io
+import os
+import struct
+import sys
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    resource_tracker = shared_memory = None
+
+from .archives import (
+    ACTOR_SCHEMAS, ACTOR_TAGS, POSITION_SCALE, EventDecoder, EventEncoder,
+)
+from .parsers import GameLogEventParser
+from .taxonomy import get_event_type_code
+
+
+BATCH_MAGIC = b"IL2FBEVB"
+
+#: Magic, number of events, number of strings, sizes of payload and of
+#: strings.
+BATCH_HEADER = struct.Struct("=8sIIII")
+
+MISSING_POSITION = -2 ** 31
+
+#: Since Python 3.13 blocks can be created without registering them in
+#: resource tracker, which unlinks blocks left by exited processes.
+_CAN_UNTRACK = sys.version_info >= (3, 13)
+
+
+def _check_support():
+    if shared_memory is None:
+        raise RuntimeError("Shared memory is not available")
+
+    if os.name == 'nt':
+        raise RuntimeError(
+            "Batches of events are not available on Windows, as blocks of "
+            "shared memory are freed there when their writers close them"
+        )
+
+
+def _create_block(size):
+    if _CAN_UNTRACK:
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+
+    return shared_memory.SharedMemory(create=True, size=size)
+
+
+def _get_actor_id(actor):
+    try:
+        tag = ACTOR_TAGS[actor.__class__]
+    except KeyError:
+        return None
+
+    name = ACTOR_SCHEMAS[tag - 1][1][0][0]
+    return getattr(actor, name)
+
+
+def _align(size):
+    return (size + 3) & ~3
+
+
+def write_batch(events):
+    """
+    Write events into a new block of shared memory and get its name.
+
+    Block is owned by the process which attaches it with ``EventBatch`` or
+    frees it with ``discard_batch``.
+
+    """
+    _check_support()
+
+    strings = {}
+    string_list = []
+
+    def intern(value):
+        index = strings.get(value)
+
+        if index is None:
+            index = strings[value] = len(string_list)
+            string_list.append(value)
+
+        return index
+
+    encoder = EventEncoder(intern)
+    type_codes = array.array('H')
+    times = array.array('i')
+    xs = array.array('i')
+    ys = array.array('i')
+    actor_ids = array.array('i')
+    offsets = array.array('I', [0, ])
+    payload = bytearray()
+
+    for event in events:
+        type_codes.append(get_event_type_code(event))
+
+        time = getattr(event, 'time', None)
+        times.append(
+            -1 if time is None else
+            time.hour * 3600 + time.minute * 60 + time.second
+        )
+
+        pos = getattr(event, 'pos', None)
+        if pos is None:
+            xs.append(MISSING_POSITION)
+            ys.append(MISSING_POSITION)
+        else:
+            xs.append(int(round(pos.x * POSITION_SCALE)))
+            ys.append(int(round(pos.y * POSITION_SCALE)))
+
+        actor = getattr(event, 'actor', None)
+        actor_id = _get_actor_id(actor) if actor is not None else None
+        actor_ids.append(-1 if actor_id is None else intern(actor_id))
+
+        encoder.encode(event, payload)
+        offsets.append(len(payload))
+
+    string_offsets = array.array('I', [0, ])
+    string_data = bytearray()
+
+    for value in string_list:
+        string_data += value.encode('utf-8')
+        string_offsets.append(len(string_data))
+
+    header = BATCH_HEADER.pack(
+        BATCH_MAGIC, len(type_codes), len(string_list), len(payload),
+        len(string_data),
+    )
+    parts = [
+        header, times, xs, ys, actor_ids, offsets, string_offsets,
+        type_codes, payload, string_data,
+    ]
+    size = sum(_align(len(memoryview(x).cast('B'))) for x in parts)
+    block = _create_block(max(size, 1))
+
+    try:
+        position = 0
+
+        for part in parts:
+            data = memoryview(part).cast('B')
+            block.buf[position:position + len(data)] = data
+            position += _align(len(data))
+    except Exception:
+        block.close()
+        block.unlink()
+        raise
+
+    if not _CAN_UNTRACK:
+        # Ownership is passed to the process which attaches the block.
+        resource_tracker.unregister(block._name, 'shared_memory')
+
+    block.close()
+    return block.name
+
+
+class EventBatch(object):
+    """
+    Batch of events attached from a block of shared memory.
+
+    Block is unlinked right after attaching, and memory is freed after the
+    batch is closed. Views of columns must not be used after that.
+
+    Batch is a sequence of events which are rebuilt on each access.
+
+    """
+
+    def __init__(self, name):
+        self._block = None
+        self._views = []
+        self._strings = None
+        self._decoder = None
+
+        _check_support()
+
+        self._block = shared_memory.SharedMemory(name=name)
+        self._block.unlink()
+
+        buffer = self._block.buf
+        (
+            magic, count, string_count, payload_size, strings_size,
+        ) = BATCH_HEADER.unpack_from(buffer)
+
+        if magic != BATCH_MAGIC:
+            self.close()
+            raise ValueError("Block {0} is not a batch".format(name))
+
+        self._count = count
+        self._string_count = string_count
+        self._position = _align(BATCH_HEADER.size)
+
+        self.times = self._take('i', count)
+        self.pos_x = self._take('i', count)
+        self.pos_y = self._take('i', count)
+        self.actor_ids = self._take('i', count)
+        self._offsets = self._take('I', count + 1)
+        self._string_offsets = self._take('I', string_count + 1)
+        self.type_codes = self._take('H', count)
+        self._payload = self._take('B', payload_size)
+        self._string_data = self._take('B', strings_size)
+
+    def _take(self, typecode, count):
+        size = array.array(typecode).itemsize * count
+        view = self._block.buf[self._position:self._position + size]
+        self._position += _align(size)
+        view = view.cast(typecode)
+        self._views.append(view)
+        return view
+
+    @property
+    def strings(self):
+        """
+        Get table of strings of the batch.
+
+        """
+        if self._strings is None:
+            offsets = self._string_offsets
+            data = self._string_data
+            self._strings = [
+                bytes(data[offsets[i]:offsets[i + 1]]).decode('utf-8')
+                for i in range(self._string_count)
+            ]
+
+        return self._strings
+
+    def get_actor_id(self, index):
+        """
+        Get identifier of actor of an event, e.g. callsign or flight, or
+        ``None`` if event has no actor.
+
+        """
+        actor_id = self.actor_ids[index]
+        return self.strings[actor_id] if actor_id >= 0 else None
+
+    def _get_decoder(self):
+        if self._decoder is None:
+            self._decoder = EventDecoder(self.strings)
+
+        return self._decoder
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError("Index of event is out of range")
+
+        start, end = self._offsets[index], self._offsets[index + 1]
+        stream = io.BytesIO(self._payload[start:end])
+        return self._get_decoder().decode(stream.read)
+
+    def __iter__(self):
+        decoder = self._get_decoder()
+        read = io.BytesIO(self._payload).read
+
+        for i in range(self._count):
+            yield decoder.decode(read)
+
+    def close(self):
+        if self._block is None:
+            return
+
+        for view in reversed(self._views):
+            view.release()
+
+        self._views = []
+        self._block.close()
+        self._block = None
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ParseLinesToBatch(object):
+    """
+    Parse stage which maps a list of lines to a name of a block of shared
+    memory with their events. It is meant to run in processes and to be
+    followed by ``attach_batch`` stage.
+
+    Accepts an instance of ``GameLogEventParser``. A new parser with default
+    options is built if it is not given.
+
+    """
+
+    def __init__(self, parser=None, ignore_errors=False):
+        _check_support()
+
+        self.parser = parser if parser is not None else GameLogEventParser()
+        self.ignore_errors = ignore_errors
+
+    def __call__(self, lines):
+        return [write_batch(self.parser.parse_lines(
+            lines, ignore_errors=self.ignore_errors,
+        )), ]
+
+
+def discard_batch(name):
+    """
+    Free a block of shared memory written by ``write_batch`` without
+    reading it.
+
+    """
+    _check_support()
+
+    block = shared_memory.SharedMemory(name=name)
+    block.close()
+    block.unlink()
+
+
+def attach_batch(name):
+    """
+    Stage which maps a name of a block of shared memory to an
+    ``EventBatch``.
+
+    """
+    return [EventBatch(name), ]
@@ -0,0 +1,272 @@
+# coding: utf-8
+"""
+Bloom filters of chunks of log files.
+
+Log file is split into chunks of lines of about the same size. Tokens (see
+``tokens`` module) of each chunk are added to a Bloom filter of that chunk.
+Filters tell for sure that a chunk does not mention a token, so queries for
+rare callsigns need to parse only a few chunks. Filters are much smaller
+than inverted index.
+
+Filters of a log are stored in a sidecar file next to it and are rebuilt if
+size or modification time of log, or options of filters change.
+
+Compressed logs are decompressed on the fly, so byte ranges of their chunks
+refer to decompressed data.
+
+"""
+
+import hashlib
+import math
+import os
+import struct
+
+from collections import namedtuple
+
+from .constants import LOG_ENCODING
+from .parsers import GameLogEventParser
+from .streams import open_log
+from .tokens import ACTOR_FIELDS, get_event_tokens
+from .utils import atomic_write
+
+
+BLOOM_MAGIC = b"IL2FBBLM"
+BLOOM_FORMAT_VERSION = 2
+SIDECAR_SUFFIX = ".bloom"
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_ERROR_RATE = 0.001
+
+HEADER = struct.Struct("<8sHQdQdI")
+CHUNK_HEADER = struct.Struct("<QQIB")
+HASHES = struct.Struct("<QQ")
+
+
+class BloomFilter(object):
+    """
+    Bloom filter of strings with ``size`` bits and ``hash_count`` hash
+    functions.
+
+    """
+
+    def __init__(self, size, hash_count, data=None):
+        self.size = size
+        self.hash_count = hash_count
+        self.data = (
+            bytearray(data) if data is not None else
+            bytearray((size + 7) // 8)
+        )
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=DEFAULT_ERROR_RATE):
+        """
+        Create filter which gives a given rate of false positives after
+        ``capacity`` strings are added.
+
+        """
+        capacity = max(capacity, 1)
+        size = int(math.ceil(
+            -capacity * math.log(error_rate) / (math.log(2) ** 2)
+        ))
+        hash_count = int(round(size / float(capacity) * math.log(2)))
+        return cls(size, max(hash_count, 1))
+
+    def _iter_positions(self, value):
+        digest = hashlib.sha1(value.encode('utf-8')).digest()
+        first, second = HASHES.unpack(digest[:HASHES.size])
+
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value):
+        data = self.data
+
+        for position in self._iter_positions(value):
+            data[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        data = self.data
+
+        for position in self._iter_positions(value):
+            if not data[position >> 3] & (1 << (position & 7)):
+                return False
+
+        return True
+
+
+#: Filter of a byte range of a log.
+ChunkFilter = namedtuple('ChunkFilter', ['start', 'end', 'filter'])
+
+
+def _iter_chunks(path, chunk_size, parser, encoding):
+    with open_log(path) as f:
+        start = offset = 0
+        tokens = set()
+
+        for line in f:
+            offset += len(line)
+            event = parser.parse(
+                line.decode(encoding).rstrip("\r\n"), ignore_errors=True,
+            )
+
+            if event is not None:
+                tokens.update(get_event_tokens(event))
+
+            if offset - start >= chunk_size:
+                yield start, offset, tokens
+                start = offset
+                tokens = set()
+
+        if offset > start:
+            yield start, offset, tokens
+
+
+def build_chunk_filters(
+    path, chunk_size=DEFAULT_CHUNK_SIZE, error_rate=DEFAULT_ERROR_RATE,
+    parser=None, encoding=LOG_ENCODING,
+):
+    """
+    Parse a log file and build Bloom filters of its chunks.
+
+    """
+    if parser is None:
+        parser = GameLogEventParser(fields=ACTOR_FIELDS)
+
+    results = []
+
+    for start, end, tokens in _iter_chunks(path, chunk_size, parser, encoding):
+        bloom = BloomFilter.for_capacity(len(tokens), error_rate)
+
+        for token in tokens:
+            bloom.add(token)
+
+        results.append(ChunkFilter(start, end, bloom))
+
+    return results
+
+
+def get_sidecar_path(path):
+    return path + SIDECAR_SUFFIX
+
+
+def save_chunk_filters(
+    chunk_filters, path, chunk_size=DEFAULT_CHUNK_SIZE,
+    error_rate=DEFAULT_ERROR_RATE, stat=None,
+):
+    """
+    Atomically write filters of chunks of a log file to its sidecar file.
+
+    ``chunk_size`` and ``error_rate`` must be the ones filters were built
+    with. ``stat`` is the result of ``os.stat()`` of log taken before
+    filters were built. Log is examined now if it is not given, so it must
+    not change since filters were built.
+
+    """
+    if stat is None:
+        stat = os.stat(path)
+
+    with atomic_write(get_sidecar_path(path)) as f:
+        f.write(HEADER.pack(
+            BLOOM_MAGIC, BLOOM_FORMAT_VERSION,
+            stat.st_size, stat.st_mtime, chunk_size, error_rate,
+            len(chunk_filters),
+        ))
+
+        for start, end, bloom in chunk_filters:
+            f.write(CHUNK_HEADER.pack(
+                start, end, bloom.size, bloom.hash_count,
+            ))
+            f.write(bloom.data)
+
+
+def load_chunk_filters(
+    path, chunk_size=DEFAULT_CHUNK_SIZE, error_rate=DEFAULT_ERROR_RATE,
+):
+    """
+    Load filters of chunks of a log file from its sidecar file. ``None`` is
+    returned if sidecar does not exist, is broken, is older than log or was
+    built with other options.
+
+    """
+    try:
+        stat = os.stat(path)
+
+        with open(get_sidecar_path(path), 'rb') as f:
+            data = f.read()
+
+        (
+            magic, version, size, mtime, sidecar_chunk_size,
+            sidecar_error_rate, count,
+        ) = HEADER.unpack_from(data, 0)
+
+        if (
+            magic != BLOOM_MAGIC or
+            version != BLOOM_FORMAT_VERSION or
+            size != stat.st_size or
+            mtime != stat.st_mtime or
+            sidecar_chunk_size != chunk_size or
+            sidecar_error_rate != error_rate
+        ):
+            return None
+
+        results = []
+        position = HEADER.size
+
+        for i in range(count):
+            start, end, bits, hash_count = CHUNK_HEADER.unpack_from(
+                data, position,
+            )
+            position += CHUNK_HEADER.size
+            length = (bits + 7) // 8
+            bloom = BloomFilter(
+                bits, hash_count, data[position:position + length],
+            )
+            position += length
+            results.append(ChunkFilter(start, end, bloom))
+
+        return results
+    except (IOError, OSError, struct.error):
+        return None
+
+
+def get_chunk_filters(
+    path, chunk_size=DEFAULT_CHUNK_SIZE, error_rate=DEFAULT_ERROR_RATE,
+    **kwargs
+):
+    """
+    Get filters of chunks of a log file from its sidecar file. Filters are
+    rebuilt and saved if log or options have changed or sidecar is missing.
+
+    Accepts the same keyword arguments as ``build_chunk_filters``.
+
+    """
+    chunk_filters = load_chunk_filters(path, chunk_size, error_rate)
+
+    if chunk_filters is None:
+        # Log may grow while it is parsed, so it is examined beforehand.
+        stat = os.stat(path)
+        chunk_filters = build_chunk_filters(
+            path, chunk_size, error_rate, **kwargs
+        )
+
+        try:
+            save_chunk_filters(
+                chunk_filters, path, chunk_size, error_rate, stat,
+            )
+        except (IOError, OSError):
+            pass
+
+    return chunk_filters
+
+
+def find_chunks(path, token, **kwargs):
+    """
+    Get a list of ``(start, end)`` byte ranges of chunks of a log file which
+    may mention a given token.
+
+    """
+    return [
+        (start, end)
+        for start, end, bloom in get_chunk_filters(path, **kwargs)
+        if token in bloom
+    ]
@@ -0,0 +1,162 @@
+# coding: utf-8
+"""
+In-process bus which fans parsed events out to subscribers.
+
+Subscribers register for event classes or categories from ``taxonomy``
+module. Bus precomputes a table which maps type codes of events to lists of
+their subscribers, so delivery of an event costs a single lookup and a call
+of each interested subscriber. Types of events are not checked by
+subscribers themselves.
+
+Subscribers may be plain callables or coroutine functions. Coroutines are
+scheduled on the running asyncio loop by ``publish`` or awaited by
+``publish_async``.
+
+"""
+
+import inspect
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+from .taxonomy import (
+    EVENT_CLASSES, TYPE_CODES, get_event_type_code, get_events_by_categories,
+)
+
+
+def _is_coroutine_function(function):
+    if asyncio is None:
+        return False
+
+    return (
+        asyncio.iscoroutinefunction(function) or
+        asyncio.iscoroutinefunction(getattr(function, '__call__', None))
+    )
+
+
+class EventBus(object):
+    """
+    Publish/subscribe bus for parsed events.
+
+    """
+
+    def __init__(self):
+        self._subscriptions = []
+        self._table = None
+
+    def subscribe(self, subscriber, events=None, categories=None,
+                  predicate=None):
+        """
+        Register a subscriber for given events. Returns the subscriber.
+
+        ``events`` is an event class or an iterable of event classes.
+        ``categories`` is a bitmask of categories from ``taxonomy`` module:
+        subscriber receives events which belong to any of them. Subscriber
+        receives all events if neither of them is given.
+
+        ``predicate`` is an optional callable which accepts an event and
+        tells whether it must be delivered. It is called only for events of
+        subscribed types.
+
+        """
+        if inspect.isclass(events):
+            events = [events, ]
+
+        if categories is not None:
+            events = set(events or ())
+            events.update(get_events_by_categories(categories))
+        elif events is None:
+            events = EVENT_CLASSES.values()
+
+        codes = frozenset(get_event_type_code(event) for event in events)
+        is_async = _is_coroutine_function(subscriber)
+
+        self._subscriptions.append((subscriber, codes, predicate, is_async))
+        self._table = None
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """
+        Unregister all subscriptions of a given subscriber.
+
+        """
+        self._subscriptions = [
+            x for x in self._subscriptions if x[0] is not subscriber
+        ]
+        self._table = None
+
+    def _build_table(self):
+        table = [() for i in range(max(EVENT_CLASSES) + 1)]
+
+        for subscriber, codes, predicate, is_async in self._subscriptions:
+            for code in codes:
+                table[code] += ((subscriber, predicate, is_async), )
+
+        self._table = table
+
+    def get_subscribers(self, event):
+        """
+        Get subscribers of an event or an event class in order of
+        registration. Predicates are not applied.
+
+        """
+        if self._table is None:
+            self._build_table()
+
+        return [x[0] for x in self._table[get_event_type_code(event)]]
+
+    def _deliver(self, event):
+        if self._table is None:
+            self._build_table()
+
+        try:
+            code = TYPE_CODES[event.__class__]
+        except KeyError:
+            code = get_event_type_code(event)
+
+        coroutines = []
+
+        for subscriber, predicate, is_async in self._table[code]:
+            if predicate is not None and not predicate(event):
+                continue
+
+            if is_async:
+                coroutines.append(subscriber(event))
+            else:
+                subscriber(event)
+
+        return coroutines
+
+    def publish(self, event):
+        """
+        Deliver an event to its subscribers.
+
+        Plain subscribers are called immediately. Coroutines of asynchronous
+        subscribers are scheduled on the running loop. Returns a list of
+        scheduled tasks.
+
+        """
+        coroutines = self._deliver(event)
+        return [asyncio.ensure_future(x) for x in coroutines]
+
+    def publish_many(self, events):
+        """
+        Deliver each event of an iterable. Returns a list of scheduled tasks.
+
+        """
+        tasks = []
+
+        for event in events:
+            tasks.extend(self.publish(event))
+
+        return tasks
+
+    def publish_async(self, event):
+        """
+        Deliver an event to its subscribers and get an awaitable which is
+        done when all asynchronous subscribers have processed it.
+
+        """
+        return asyncio.gather(*self._deliver(event))
@@ -0,0 +1,442 @@
+# coding: utf-8
+"""
+Command-line bulk parser of game logs.
+
+Parses log files, which may be compressed, and writes their events in one of
+supported formats. Files are read in a separate thread and may be parsed by
+multiple processes.
+
+"""
+
+import argparse
+import csv
+import datetime
+import glob
+import io
+import os
+import sys
+import time
+
+from json.encoder import encode_basestring_ascii as encode_string
+
+import six
+
+from il2fb.commons.events import EventParsingException
+
+from . import events as _events
+from .archives import ArchiveWriter
+from .constants import LOG_ENCODING
+from .exporters import JSONLinesExporter, get_event_serializer
+from .parsers import GameLogEventParser
+from .pipelines import (
+    INLINE, PROCESS, THREAD, AttachDates, ParseLines, Pipeline, ReadChunks,
+    SplitLines, Stage,
+)
+from .profiling import MODES as PROFILING_MODES, ParseProfiler
+from .sinks import SQLiteSink
+from .taxonomy import EVENT_TYPE_NAMES
+
+
+JSONL = 'jsonl'
+CSV = 'csv'
+BINARY = 'binary'
+SQLITE = 'sqlite'
+
+FORMATS = (JSONL, CSV, BINARY, SQLITE)
+
+MOMENT_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+)
+
+CSV_COLUMNS = ("date", "time", "event", "pos_x", "pos_y", "data")
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+class _CountingParseLines(ParseLines):
+    """
+    Parse stage which also counts non-blank lines. Maps a list of lines to
+    a tuple of number of lines and list of events.
+
+    """
+
+    def __call__(self, lines):
+        parse = self.parser.parse
+        ignore_errors = self.ignore_errors
+        results = []
+        count = 0
+
+        for line in lines:
+            line = line.rstrip("\r\n")
+
+            if line:
+                count += 1
+                event = parse(line, ignore_errors=ignore_errors)
+
+                if event is not None:
+                    results.append(event)
+
+        return [(count, results), ]
+
+
+class _JSONLinesOutput(object):
+
+    def __init__(self, stream):
+        self._exporter = JSONLinesExporter(stream)
+
+    def write_many(self, items):
+        self._exporter.write_many(event for date, event in items)
+
+    def close(self):
+        self._exporter.close()
+
+
+class _CSVOutput(object):
+
+    def __init__(self, stream):
+        self._writer = csv.writer(stream)
+        self._writer.writerow(CSV_COLUMNS)
+        self._serializers = {}
+
+    def _get_serializer(self, event_class):
+        serializer = self._serializers.get(event_class)
+
+        if serializer is None:
+            serialize = get_event_serializer(event_class)
+            extra = '"name":{0}'.format(encode_string(event_class.__name__))
+            serializer = self._serializers[event_class] = (
+                lambda event: serialize(event, extra)
+            )
+
+        return serializer
+
+    def write_many(self, items):
+        rows = []
+
+        for date, event in items:
+            time = getattr(event, 'time', None)
+            pos = getattr(event, 'pos', None)
+            rows.append((
+                date.isoformat() if date is not None else "",
+                time.isoformat() if time is not None else "",
+                event.name,
+                pos.x if pos is not None else "",
+                pos.y if pos is not None else "",
+                self._get_serializer(event.__class__)(event),
+            ))
+
+        self._writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class _ArchiveOutput(object):
+
+    def __init__(self, stream):
+        self._writer = ArchiveWriter(stream)
+
+    def write_many(self, items):
+        self._writer.write_many(event for date, event in items)
+
+    def close(self):
+        self._writer.close()
+
+
+def _parse_moment(value):
+    for moment_format in MOMENT_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, moment_format)
+        except ValueError:
+            continue
+
+    raise argparse.ArgumentTypeError(
+        "Invalid date and time: {0}".format(value)
+    )
+
+
+def _parse_types(value):
+    names = [x.strip() for x in value.split(",") if x.strip()]
+    unknown = [x for x in names if x not in EVENT_TYPE_NAMES]
+
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            "Unknown events: {0}".format(", ".join(unknown))
+        )
+
+    return [getattr(_events, x) for x in names]
+
+
+def make_argument_parser():
+    parser = argparse.ArgumentParser(
+        prog="il2fb-parse-log",
+        description="Parse events from game logs of IL-2 FB dedicated "
+                    "server.",
+    )
+    parser.add_argument(
+        'paths', metavar="PATH", nargs='+',
+        help="path or glob pattern of log file",
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help="output file (default: standard output)",
+    )
+    parser.add_argument(
+        '-f', '--format', choices=FORMATS, default=JSONL,
+        help="output format (default: %(default)s)",
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help="number of parsing processes (default: %(default)s)",
+    )
+    parser.add_argument(
+        '-t', '--types', type=_parse_types,
+        help="comma-separated names of events to output, e.g. "
+             "HumanHasConnected,HumanHasDisconnected",
+    )
+    parser.add_argument(
+        '--since', type=_parse_moment,
+        help="skip events before given date and time, e.g. "
+             "'2013-09-15 20:33:05'",
+    )
+    parser.add_argument(
+        '--until', type=_parse_moment,
+        help="skip events after given date and time",
+    )
+    parser.add_argument(
+        '--strict', action='store_true',
+        help="fail on lines which cannot be parsed instead of skipping them",
+    )
+    parser.add_argument(
+        '--encoding', default=LOG_ENCODING,
+        help="encoding of logs (default: %(default)s)",
+    )
+    parser.add_argument(
+        '--stats', action='store_true',
+        help="print throughput and number of unknown lines to stderr",
+    )
+    parser.add_argument(
+        '--profile', choices=PROFILING_MODES,
+        help="profile stages of parsing and print them to stderr",
+    )
+    parser.add_argument(
+        '--profile-output',
+        help="file for collapsed stacks of profiling, e.g. for flame graphs",
+    )
+    return parser
+
+
+def expand_paths(patterns):
+    """
+    Expand glob patterns into a list of paths. Patterns which match nothing
+    are kept as they are.
+
+    """
+    paths = []
+
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        paths.extend(matches or [pattern, ])
+
+    return paths
+
+
+def _open_output(args):
+    if args.format == SQLITE:
+        return SQLiteSink(args.output), None
+
+    if args.format == BINARY:
+        if args.output:
+            stream = io.open(args.output, 'wb')
+        else:
+            stream = getattr(sys.stdout, 'buffer', sys.stdout)
+    elif args.output and args.format == CSV and six.PY2:
+        # "csv" module of Python 2 writes byte strings.
+        stream = open(args.output, 'wb')
+    elif args.output:
+        stream = io.open(args.output, 'w', newline="")
+    else:
+        stream = sys.stdout
+
+    output_class = {
+        JSONL: _JSONLinesOutput,
+        CSV: _CSVOutput,
+        BINARY: _ArchiveOutput,
+    }[args.format]
+    return output_class(stream), (stream if args.output else None)
+
+
+def _is_within(date, event, since, until):
+    time = getattr(event, 'time', None)
+
+    if date is None or time is None:
+        return False
+
+    moment = datetime.datetime.combine(date, time)
+    return (
+        (since is None or moment >= since) and
+        (until is None or moment <= until)
+    )
+
+
+def _format_rate(count, elapsed):
+    return "{0:.0f}".format(count / elapsed if elapsed else 0.0)
+
+
+def _print_stats(name, counts, skipped_label, elapsed, stream):
+    lines, parsed, written = counts
+    stream.write(
+        "{0}: {1} lines, {2} {3}, {4} events written, {5:.2f}s, "
+        "{6} lines/s\n"
+        .format(
+            name, lines, lines - parsed, skipped_label, written, elapsed,
+            _format_rate(lines, elapsed),
+        )
+    )
+
+
+STAGE_ROW = "  {0:<8} {1:>8} {2:>10} {3:>12} {4:>10}\n"
+
+
+def _print_stage_metrics(metrics, stream):
+    stream.write(STAGE_ROW.format(
+        "stage", "items", "busy, s", "max lat., s", "items/s",
+    ))
+
+    for x in metrics:
+        stream.write(STAGE_ROW.format(
+            x.name, x.items_in, "{0:.3f}".format(x.busy_time),
+            "{0:.4f}".format(x.max_latency), "{0:.1f}".format(x.throughput),
+        ))
+
+
+def run(args, stats_stream=None):
+    """
+    Parse files according to parsed command-line arguments. Returns total
+    number of written events.
+
+    """
+    stats_stream = stats_stream if stats_stream is not None else sys.stderr
+    use_filter = args.since is not None or args.until is not None
+    types = selection = args.types
+
+    if types:
+        # Dates of events are taken from "Mission is playing" events.
+        types = tuple(types)
+        selection = set(types)
+        selection.add(_events.MissionIsPlaying)
+
+    parser = GameLogEventParser(only=selection)
+    mode = PROCESS if args.jobs > 1 else INLINE
+    profiler = None
+
+    if args.profile:
+        profiler = ParseProfiler(parser, args.profile)
+        parser = profiler.parser
+        profiler.start()
+    skipped_label = "skipped lines" if args.types else "unknown lines"
+    output, stream = _open_output(args)
+    totals = [0, 0, 0]
+    total_started = _timer()
+
+    try:
+        for path in expand_paths(args.paths):
+            pipeline = Pipeline([
+                Stage(ReadChunks(), 'read', THREAD),
+                Stage(SplitLines(args.encoding), 'split'),
+                Stage(
+                    _CountingParseLines(parser, not args.strict), 'parse',
+                    mode, args.jobs,
+                ),
+            ])
+            attach_dates = AttachDates()
+            started = _timer()
+            # Numbers of lines, parsed events and written events.
+            counts = [0, 0, 0]
+
+            for lines, events in pipeline.process([path, ]):
+                items = attach_dates(events)[0]
+
+                if selection is not types:
+                    items = [x for x in items if isinstance(x[1], types)]
+
+                counts[0] += lines
+                counts[1] += len(items)
+
+                if use_filter:
+                    items = [
+                        (date, event) for date, event in items
+                        if _is_within(date, event, args.since, args.until)
+                    ]
+
+                output.write_many(items)
+                counts[2] += len(items)
+
+            totals = [x + y for x, y in zip(totals, counts)]
+
+            if args.stats:
+                _print_stats(
+                    path, counts, skipped_label, _timer() - started,
+                    stats_stream,
+                )
+                _print_stage_metrics(pipeline.metrics, stats_stream)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+        output.close()
+
+        if stream is not None:
+            stream.close()
+
+    if profiler is not None:
+        stats_stream.write(profiler.format_table())
+
+        if args.profile_output:
+            with io.open(args.profile_output, 'w') as f:
+                profiler.write_collapsed(f)
+
+    if args.stats:
+        _print_stats(
+            "total", totals, skipped_label, _timer() - total_started,
+            stats_stream,
+        )
+
+    return totals[2]
+
+
+def main(argv=None):
+    """
+    Entry point of ``il2fb-parse-log`` command.
+
+    """
+    argument_parser = make_argument_parser()
+    args = argument_parser.parse_args(argv)
+
+    if args.format == SQLITE and not args.output:
+        argument_parser.error("--output is required for sqlite format")
+
+    if args.jobs < 1:
+        argument_parser.error("--jobs must be positive")
+
+    if args.profile and args.jobs > 1:
+        argument_parser.error("--profile cannot be used with --jobs")
+
+    for path in expand_paths(args.paths):
+        if not os.path.isfile(path):
+            argument_parser.error("File not found: {0}".format(path))
+
+    try:
+        run(args)
+    except EventParsingException as e:
+        sys.stderr.write("{0}\n".format(e))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
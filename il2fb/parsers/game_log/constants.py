@@ -6,6 +6,10 @@ from collections import namedtuple
 LOG_TIME_FORMAT = "%I:%M:%S %p"
 LOG_DATE_FORMAT = "%b %d, %Y"
 
+#: Single-byte encoding used to decode raw log lines: it maps every possible
+#: byte to a character, so decoding never fails.
+LOG_ENCODING = "latin-1"
+
 
 TARGET_STATES = namedtuple(
     'TARGET_STATES',
@@ -12,9 +12,6 @@ from il2fb.commons.regex import (
     WHITESPACE, NON_WHITESPACES, NUMBER, END_OF_STRING,
     make_matcher, named_group,
 )
-from il2fb.commons.transformers import (
-    get_int_transformer, transform_belligerent, transform_2d_pos,
-)
 
 from .constants import TARGET_STATES
 from .l10n import translations
@@ -32,6 +29,7 @@ from .regex import (
     BUILDING_ACTOR_GROUP, BRIDGE_ACTOR_GROUP, TREE,
 )
 from .transformers import (
+    get_int_transformer, transform_belligerent, transform_2d_pos,
     transform_date, transform_time,
     transform_human_as_actor,
     transform_human_aircraft_as_actor,
@@ -0,0 +1,241 @@
+# coding: utf-8
+"""
+Fast export of events.
+
+``to_primitive()`` of events builds nested dictionaries and translates
+verbose names every time it is called. Exporters use serializers which are
+generated for each class of events instead. Serializers produce JSON strings
+directly and know how to encode each field in advance. Translated verbose
+names are cached for each language. Output is written in batches.
+
+"""
+
+import json
+
+from json.encoder import encode_basestring_ascii as encode_string
+
+import six
+
+from verboselib import get_language
+
+
+def encode_value(value):
+    """
+    Encode a value of unknown type into JSON.
+
+    """
+    if value is None:
+        return "null"
+    elif isinstance(value, six.string_types):
+        return encode_string(value)
+    elif isinstance(value, bool):
+        return "true" if value else "false"
+    elif isinstance(value, six.integer_types):
+        return str(value)
+    elif isinstance(value, float):
+        return repr(value)
+    elif hasattr(value, '__slots__'):
+        return encode_structure(value)
+    elif hasattr(value, 'isoformat'):
+        return '"' + value.isoformat() + '"'
+    else:
+        return json.dumps(value)
+
+
+def encode_temporal(value):
+    if value is None:
+        return "null"
+
+    return '"' + value.isoformat() + '"'
+
+
+def encode_point(value):
+    if value is None:
+        return "null"
+
+    return '{"x":' + repr(value.x) + ',"y":' + repr(value.y) + '}'
+
+
+#: Translated constants for each language.
+_CONSTANTS = {}
+
+
+def encode_constant(value):
+    if value is None:
+        return "null"
+
+    key = (get_language(), value)
+    result = _CONSTANTS.get(key)
+
+    if result is None:
+        result = json.dumps(value.to_primitive(), separators=(',', ':'))
+        _CONSTANTS[key] = result
+
+    return result
+
+
+#: Generated serializers of structures (actors, etc.).
+_STRUCTURE_SERIALIZERS = {}
+
+
+def encode_structure(value):
+    if value is None:
+        return "null"
+
+    cls = value.__class__
+    serializer = _STRUCTURE_SERIALIZERS.get(cls)
+
+    if serializer is None:
+        serializer = _make_serializer(cls.__name__, cls.__slots__)
+        _STRUCTURE_SERIALIZERS[cls] = serializer
+
+    return serializer(value)
+
+
+#: Encoders of fields of events by names of fields.
+FIELD_ENCODERS = {
+    'time': encode_temporal,
+    'date': encode_temporal,
+    'pos': encode_point,
+    'belligerent': encode_constant,
+    'actor': encode_structure,
+    'attacker': encode_structure,
+    'assistant': encode_structure,
+    'seat': encode_structure,
+}
+
+
+def _make_serializer(name, fields, with_extra=False):
+    """
+    Generate a function which encodes given fields of an object into a JSON
+    object.
+
+    If ``with_extra`` is set, function takes a string with additional encoded
+    members as the second argument and appends them to the object.
+
+    """
+    namespace = {}
+    items = []
+
+    for i, field in enumerate(fields):
+        encoder_name = "encode_{0}".format(i)
+        namespace[encoder_name] = FIELD_ENCODERS.get(field, encode_value)
+        key = "{0}{1}:".format("," if i else "", encode_string(field))
+        items.append(repr(key))
+        items.append("{0}(obj.{1})".format(encoder_name, field))
+
+    if with_extra:
+        if fields:
+            items.append("','")
+        items.append("extra")
+
+    items.append("'}'")
+    source = (
+        "def serialize(obj{0}):\n"
+        "    return ''.join(('{{', {1}))\n"
+    ).format(", extra" if with_extra else "", ", ".join(items))
+
+    code = compile(source, "<serializer of {0}>".format(name), 'exec')
+    six.exec_(code, namespace)
+    return namespace['serialize']
+
+
+#: Generated serializers of events.
+_EVENT_SERIALIZERS = {}
+
+
+def get_event_serializer(event_class):
+    """
+    Get serializer for a given class of events.
+
+    Serializer takes an event and a string with encoded ``name`` and
+    ``verbose_name`` members and returns a JSON object as a string. Output
+    matches ``to_primitive()`` of event.
+
+    """
+    serializer = _EVENT_SERIALIZERS.get(event_class)
+
+    if serializer is None:
+        serializer = _make_serializer(
+            event_class.__name__, event_class.__slots__, with_extra=True,
+        )
+        _EVENT_SERIALIZERS[event_class] = serializer
+
+    return serializer
+
+
+class JSONLinesExporter(object):
+    """
+    Exporter of events into a text stream in JSON Lines format.
+
+    Lines are collected and written to stream in batches of ``batch_size``
+    lines. Exporter must be flushed or closed to write the rest of them.
+    Stream itself is not closed.
+
+    Verbose names of events are translated into the language which is active
+    at the moment of export.
+
+    """
+
+    def __init__(self, stream, batch_size=1000):
+        self._stream = stream
+        self._batch_size = batch_size
+        self._lines = []
+        self._entries = {}
+
+    def _get_entries(self):
+        language = get_language()
+        entries = self._entries.get(language)
+
+        if entries is None:
+            entries = self._entries[language] = {}
+
+        return entries
+
+    def _get_entry(self, entries, event_class):
+        verbose_name = six.text_type(event_class.verbose_name)
+        entry = (
+            get_event_serializer(event_class),
+            '"name":{0},"verbose_name":{1}'.format(
+                encode_string(event_class.__name__),
+                encode_string(verbose_name),
+            ),
+        )
+        entries[event_class] = entry
+        return entry
+
+    def write(self, event):
+        self.write_many([event, ])
+
+    def write_many(self, events):
+        entries = self._get_entries()
+        lines = self._lines
+        batch_size = self._batch_size
+
+        for event in events:
+            event_class = event.__class__
+            entry = entries.get(event_class)
+
+            if entry is None:
+                entry = self._get_entry(entries, event_class)
+
+            serializer, extra = entry
+            lines.append(serializer(event, extra))
+
+            if len(lines) >= batch_size:
+                self.flush()
+
+    def flush(self):
+        if self._lines:
+            self._lines.append("")
+            self._stream.write("\n".join(self._lines))
+            del self._lines[:]
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,505 @@
+# coding: utf-8
+"""
+Inverted index of log files.
+
+Index maps tokens (see ``tokens`` module) to byte offsets of lines which
+mention them, so that only those lines need to be parsed again to get the
+history of a pilot.
+
+Index is a directory of immutable segments. Adding logs creates a new
+segment, so index is updated incrementally. Growing logs are indexed from
+the place where previous segment has stopped. Segments can be merged into a
+single one by compaction.
+
+Logs which were truncated, rotated or replaced are detected by their size
+and by a digest of their beginning. They are indexed again from the start,
+and a range which starts at zero supersedes postings of the same log in
+older segments.
+
+Segment is a binary file which consists of:
+
+* header;
+* table of files: paths, byte ranges and digests of indexed files;
+* directory of terms: fixed-size entries sorted by terms;
+* terms;
+* postings: pairs of indices of files and offsets of lines.
+
+Directory of terms is searched in place via ``mmap``, so segments are not
+loaded into memory. All numbers are stored in little-endian byte order.
+
+Index supports a single writer at a time.
+
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+
+from .constants import LOG_ENCODING
+from .parsers import GameLogEventParser
+from .tokens import ACTOR_FIELDS, get_event_tokens
+from .utils import atomic_write
+
+
+SEGMENT_MAGIC = b"IL2FBIDX"
+SEGMENT_FORMAT_VERSION = 1
+SEGMENT_FILE_NAME_TEMPLATE = "segment-{0:08d}.idx"
+SEGMENT_FILE_NAME_REGEX = re.compile(r"^segment-(\d{8})\.idx$")
+
+HEADER = struct.Struct("<8sHII")
+FILE_ENTRY = struct.Struct("<IQQ20s")
+TERM_ENTRY = struct.Struct("<QIQI")
+POSTING = struct.Struct("<IQ")
+
+#: Number of bytes at the beginning of logs which are digested to detect
+#: replaced logs.
+FINGERPRINT_SIZE = 4096
+
+MISSING_FINGERPRINT = b"\x00" * 20
+
+
+def get_fingerprint(stream, size):
+    """
+    Get digest of the first ``min(size, FINGERPRINT_SIZE)`` bytes of a
+    binary stream.
+
+    """
+    stream.seek(0)
+    data = stream.read(min(size, FINGERPRINT_SIZE))
+    return hashlib.sha1(data).digest()
+
+
+def write_segment(path, files, postings, fingerprints=None):
+    """
+    Atomically write a segment.
+
+    ``files`` is a list of ``(path, start, end)`` tuples. ``postings`` maps
+    terms to lists of ``(file_index, offset)`` tuples. ``fingerprints`` is
+    an optional list of digests of files (see ``get_fingerprint``) taken at
+    their ends.
+
+    """
+    if fingerprints is None:
+        fingerprints = [None, ] * len(files)
+
+    terms = sorted(
+        (term.encode('utf-8'), term)
+        for term in postings
+    )
+
+    file_entries = bytearray()
+
+    for (file_path, start, end), fingerprint in zip(files, fingerprints):
+        data = file_path.encode('utf-8')
+        file_entries += FILE_ENTRY.pack(
+            len(data), start, end, fingerprint or MISSING_FINGERPRINT,
+        )
+        file_entries += data
+
+    terms_offset = (
+        HEADER.size + len(file_entries) + TERM_ENTRY.size * len(terms)
+    )
+    postings_offset = terms_offset + sum(len(x[0]) for x in terms)
+
+    directory = bytearray()
+    term_data = bytearray()
+    posting_data = bytearray()
+
+    for data, term in terms:
+        items = sorted(set(postings[term]))
+        directory += TERM_ENTRY.pack(
+            terms_offset + len(term_data),
+            len(data),
+            postings_offset + len(posting_data),
+            len(items),
+        )
+        term_data += data
+
+        for item in items:
+            posting_data += POSTING.pack(*item)
+
+    with atomic_write(path) as f:
+        f.write(HEADER.pack(
+            SEGMENT_MAGIC, SEGMENT_FORMAT_VERSION, len(files), len(terms),
+        ))
+        f.write(file_entries)
+        f.write(directory)
+        f.write(term_data)
+        f.write(posting_data)
+
+
+class IndexSegment(object):
+    """
+    Read-only segment of index mapped into memory.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, file_count, term_count = HEADER.unpack_from(
+            self._data, 0,
+        )
+
+        if magic != SEGMENT_MAGIC or version != SEGMENT_FORMAT_VERSION:
+            self._data.close()
+            raise ValueError("Invalid segment of index: {0}".format(path))
+
+        self.files = []
+        self.fingerprints = []
+        position = HEADER.size
+
+        for i in range(file_count):
+            size, start, end, fingerprint = FILE_ENTRY.unpack_from(
+                self._data, position,
+            )
+            position += FILE_ENTRY.size
+            file_path = self._data[position:position + size].decode('utf-8')
+            position += size
+            self.files.append((file_path, start, end))
+            self.fingerprints.append(
+                None if fingerprint == MISSING_FINGERPRINT else fingerprint
+            )
+
+        self._directory_offset = position
+        self._term_count = term_count
+
+    def __len__(self):
+        return self._term_count
+
+    def _get_entry(self, i):
+        return TERM_ENTRY.unpack_from(
+            self._data, self._directory_offset + TERM_ENTRY.size * i,
+        )
+
+    def _get_term(self, entry):
+        return self._data[entry[0]:entry[0] + entry[1]]
+
+    def _iter_postings(self, entry):
+        position = entry[2]
+
+        for i in range(entry[3]):
+            file_index, offset = POSTING.unpack_from(self._data, position)
+            position += POSTING.size
+            yield self.files[file_index][0], offset
+
+    def lookup(self, term):
+        """
+        Get a list of ``(path, offset)`` tuples for a given term.
+
+        """
+        term = term.encode('utf-8')
+        low, high = 0, self._term_count
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if self._get_term(self._get_entry(middle)) < term:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self._term_count:
+            entry = self._get_entry(low)
+
+            if self._get_term(entry) == term:
+                return list(self._iter_postings(entry))
+
+        return []
+
+    def iter_items(self):
+        """
+        Iterate over ``(term, postings)`` tuples in order of terms.
+
+        """
+        for i in range(self._term_count):
+            entry = self._get_entry(i)
+            yield (
+                self._get_term(entry).decode('utf-8'),
+                list(self._iter_postings(entry)),
+            )
+
+    def close(self):
+        self._data.close()
+
+
+class LogIndex(object):
+    """
+    Inverted index of log files stored in a given directory.
+
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self._segments = None
+
+    @property
+    def segments(self):
+        if self._segments is None:
+            names = sorted(
+                name for name in os.listdir(self.directory)
+                if SEGMENT_FILE_NAME_REGEX.match(name)
+            )
+            self._segments = [
+                IndexSegment(os.path.join(self.directory, name))
+                for name in names
+            ]
+
+        return self._segments
+
+    def _get_next_segment_path(self):
+        numbers = [
+            SEGMENT_FILE_NAME_REGEX.match(os.path.basename(x.path)).group(1)
+            for x in self.segments
+        ]
+        number = max(map(int, numbers)) + 1 if numbers else 0
+        file_name = SEGMENT_FILE_NAME_TEMPLATE.format(number)
+        return os.path.join(self.directory, file_name)
+
+    def _add_segment(self, files, postings, fingerprints):
+        path = self._get_next_segment_path()
+        write_segment(path, files, postings, fingerprints)
+        self.segments.append(IndexSegment(path))
+
+    def _get_superseded(self):
+        """
+        Get a list of sets of paths which are indexed again by newer
+        segments, one set per segment.
+
+        """
+        results = []
+        reset = set()
+
+        for segment in reversed(self.segments):
+            results.append(reset)
+            reset = reset.union(
+                file_path for file_path, start, end in segment.files
+                if start == 0
+            )
+
+        results.reverse()
+        return results
+
+    def _get_last_range(self, path):
+        for segment in reversed(self.segments):
+            for i, (file_path, start, end) in enumerate(segment.files):
+                if file_path == path:
+                    return end, segment.fingerprints[i]
+
+        return 0, None
+
+    def _get_valid_size(self, path, stream):
+        end, fingerprint = self._get_last_range(path)
+
+        if os.fstat(stream.fileno()).st_size < end:
+            return None
+
+        if (
+            fingerprint is not None and
+            get_fingerprint(stream, end) != fingerprint
+        ):
+            return None
+
+        return end
+
+    def get_indexed_size(self, path):
+        """
+        Get number of bytes of a given log which are indexed already.
+        Returns ``0`` if log was truncated or replaced since it was indexed.
+
+        """
+        path = os.path.abspath(path)
+
+        with open(path, 'rb') as f:
+            return self._get_valid_size(path, f) or 0
+
+    def add_files(self, paths, parser=None, encoding=LOG_ENCODING):
+        """
+        Index new parts of given log files and store them as a new segment.
+        Incomplete last lines are left for the next update.
+
+        Returns number of indexed lines.
+
+        """
+        if parser is None:
+            parser = GameLogEventParser(fields=ACTOR_FIELDS)
+
+        files = []
+        fingerprints = []
+        postings = {}
+        count = 0
+
+        for path in paths:
+            path = os.path.abspath(path)
+            file_index = len(files)
+
+            with open(path, 'rb') as f:
+                start = self._get_valid_size(path, f)
+                # Log was truncated or replaced, so it is indexed again.
+                reset = start is None
+                start = offset = start or 0
+                f.seek(start)
+
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+
+                    event = parser.parse(
+                        line.decode(encoding).rstrip("\r\n"),
+                        ignore_errors=True,
+                    )
+
+                    tokens = get_event_tokens(event) if event else ()
+
+                    for token in tokens:
+                        postings.setdefault(token, []).append(
+                            (file_index, offset)
+                        )
+
+                    if tokens:
+                        count += 1
+
+                    offset += len(line)
+
+                if offset > start or reset:
+                    files.append((path, start, offset))
+                    fingerprints.append(get_fingerprint(f, offset))
+
+        if files:
+            self._add_segment(files, postings, fingerprints)
+
+        return count
+
+    def add_file(self, path, parser=None, encoding=LOG_ENCODING):
+        return self.add_files([path, ], parser=parser, encoding=encoding)
+
+    def lookup(self, token):
+        """
+        Get a sorted list of ``(path, offset)`` tuples of lines which
+        mention a given token.
+
+        """
+        results = []
+
+        for segment, superseded in zip(
+            self.segments, self._get_superseded(),
+        ):
+            results.extend(
+                x for x in segment.lookup(token) if x[0] not in superseded
+            )
+
+        # Segments may overlap if compaction was interrupted.
+        return sorted(set(results))
+
+    def iter_lines(self, token, encoding=LOG_ENCODING):
+        """
+        Read lines which mention a given token. Yields ``(path, offset,
+        line)`` tuples.
+
+        """
+        results = self.lookup(token)
+        stream = None
+        current_path = None
+
+        try:
+            for path, offset in results:
+                if path != current_path:
+                    if stream is not None:
+                        stream.close()
+
+                    stream = open(path, 'rb')
+                    current_path = path
+
+                stream.seek(offset)
+                line = stream.readline().decode(encoding).rstrip("\r\n")
+                yield path, offset, line
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def iter_events(self, token, parser=None, encoding=LOG_ENCODING):
+        """
+        Parse lines which mention a given token. Yields ``(path, offset,
+        event)`` tuples.
+
+        """
+        parser = parser if parser is not None else GameLogEventParser()
+
+        for path, offset, line in self.iter_lines(token, encoding=encoding):
+            yield path, offset, parser.parse(line)
+
+    def compact(self):
+        """
+        Merge all segments into a single one.
+
+        """
+        segments = list(self.segments)
+
+        if len(segments) < 2:
+            return
+
+        files = []
+        fingerprints = []
+        file_indices = {}
+        postings = {}
+
+        for segment, superseded in zip(segments, self._get_superseded()):
+            entries = zip(segment.files, segment.fingerprints)
+
+            for (file_path, start, end), fingerprint in entries:
+                if file_path in superseded:
+                    continue
+
+                i = file_indices.get(file_path)
+
+                if i is None:
+                    file_indices[file_path] = len(files)
+                    files.append((file_path, start, end))
+                    fingerprints.append(fingerprint)
+                else:
+                    if end >= files[i][2]:
+                        fingerprints[i] = fingerprint
+
+                    start = min(start, files[i][1])
+                    end = max(end, files[i][2])
+                    files[i] = (file_path, start, end)
+
+            for term, items in segment.iter_items():
+                items = [
+                    (file_indices[path], offset)
+                    for path, offset in items
+                    if path not in superseded
+                ]
+
+                if items:
+                    postings.setdefault(term, []).extend(items)
+
+        self._add_segment(files, postings, fingerprints)
+
+        for segment in segments:
+            segment.close()
+            os.remove(segment.path)
+
+        self._segments = self._segments[-1:]
+
+    def close(self):
+        if self._segments is not None:
+            for segment in self._segments:
+                segment.close()
+
+            self._segments = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,99 @@
+# coding: utf-8
+"""
+Lazy events.
+
+Lazy events keep raw strings captured by regular expressions and run
+transformers of fields only when those fields are accessed for the first
+time. Results are cached in event's slots.
+
+"""
+
+from .transformers import get_transformer_field
+
+
+def _restore_event(event_class, data):
+    return event_class(**data)
+
+
+class LazyEventMixin(object):
+    """
+    Mixin for lazy counterparts of event classes.
+
+    Lazy event classes have the same names as original ones and are
+    subclasses of them. Lazy events are pickled as original events with all
+    fields evaluated.
+
+    """
+    event_class = None
+    field_transformers = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self.event_class.__slots__:
+            raise AttributeError(name)
+
+        data = self._data
+        transformer = self.field_transformers.get(name)
+
+        if transformer is not None:
+            transformer(data)
+
+        value = data[name]
+        setattr(self, name, value)
+        return value
+
+    def __reduce__(self):
+        data = {
+            name: getattr(self, name)
+            for name in self.event_class.__slots__
+        }
+        return (_restore_event, (self.event_class, data))
+
+
+def make_lazy_event_class(event_class, transformers=None, skipped=None):
+    """
+    Create lazy counterpart of a given event class.
+
+    ``transformers`` override transformers of event and ``skipped`` are
+    names of fields which are always ``None``. Transformers which do not
+    declare their fields are run when event is created.
+
+    """
+    if transformers is None:
+        transformers = event_class.transformers
+
+    field_transformers = {}
+    eager_transformers = []
+
+    for transformer in transformers:
+        field_name = get_transformer_field(transformer)
+
+        if field_name is None:
+            eager_transformers.append(transformer)
+        else:
+            field_transformers[field_name] = transformer
+
+    skipped = tuple(skipped or ())
+    eager_transformers = tuple(eager_transformers)
+
+    def __init__(self, data):
+        for transformer in eager_transformers:
+            transformer(data)
+
+        for name in skipped:
+            data[name] = None
+
+        self._data = data
+
+    attrs = {
+        '__init__': __init__,
+        '__module__': event_class.__module__,
+        '__doc__': event_class.__doc__,
+        'event_class': event_class,
+        'field_transformers': field_transformers,
+    }
+    metaclass = type(event_class)
+    return metaclass(
+        event_class.__name__,
+        (LazyEventMixin, event_class),
+        attrs,
+    )
@@ -0,0 +1,99 @@
+# coding: utf-8
+"""
+Time-ordered merging of events of multiple logs.
+
+Events of each source must be ordered already, as they are within a single
+log. Sources are merged lazily with a heap, so only one event of each
+source is kept in memory at a time.
+
+"""
+
+import datetime
+import heapq
+
+import six
+
+from .constants import LOG_ENCODING
+from .missions import iter_dated_events
+from .parsers import GameLogEventParser
+
+
+#: Key of events which come before the first event with date and time.
+MIN_KEY = (datetime.date.min, datetime.time.min)
+
+
+def iter_file_events(
+    path, parser=None, ignore_errors=False, encoding=LOG_ENCODING,
+    threaded=False,
+):
+    """
+    Lazily parse a log file and yield ``(date, event)`` tuples. Dates are
+    taken from "Mission is playing" events.
+
+    """
+    parser = parser if parser is not None else GameLogEventParser()
+    events = parser.parse_file(
+        path, ignore_errors=ignore_errors, encoding=encoding,
+        threaded=threaded,
+    )
+    return iter_dated_events(events)
+
+
+def merge_events(sources):
+    """
+    Merge streams of events into a single stream ordered by date and time.
+
+    ``sources`` is a mapping or an iterable of pairs of tags and iterables
+    of ``(date, event)`` tuples. Yields ``(tag, date, event)`` tuples.
+
+    Events without date or time keep their places within their sources.
+    Events with equal dates and times are yielded in order of sources.
+
+    """
+    if isinstance(sources, dict):
+        sources = six.iteritems(sources)
+
+    heap = []
+
+    def push(index, tag, iterator, last_key):
+        for date, event in iterator:
+            time = getattr(event, 'time', None)
+            key = (
+                (date, time)
+                if date is not None and time is not None else
+                last_key
+            )
+            heapq.heappush(heap, (key, index, tag, date, event, iterator))
+            return
+
+    for index, (tag, events) in enumerate(sources):
+        push(index, tag, iter(events), MIN_KEY)
+
+    while heap:
+        key, index, tag, date, event, iterator = heapq.heappop(heap)
+        yield tag, date, event
+        push(index, tag, iterator, key)
+
+
+def merge_files(paths, parser=None, **kwargs):
+    """
+    Lazily parse log files and merge their events by date and time.
+
+    ``paths`` is a mapping of tags to paths or an iterable of paths, which
+    are used as tags. All files are parsed by a single parser. Other keyword
+    arguments are passed to ``iter_file_events``.
+
+    Yields ``(tag, date, event)`` tuples.
+
+    """
+    if not isinstance(paths, dict):
+        paths = [(path, path) for path in paths]
+    else:
+        paths = list(six.iteritems(paths))
+
+    parser = parser if parser is not None else GameLogEventParser()
+    sources = [
+        (tag, iter_file_events(path, parser=parser, **kwargs))
+        for tag, path in paths
+    ]
+    return merge_events(sources)
@@ -0,0 +1,154 @@
+# coding: utf-8
+"""
+Splitting of game logs into missions.
+
+Missions are located by searching raw bytes for mission lifecycle lines, so
+whole logs do not need to go through the parser. Resulting byte ranges can be
+parsed independently from each other (e.g. in parallel), as each range knows
+the date of its mission beforehand.
+
+"""
+
+import datetime
+
+from collections import namedtuple
+
+from .constants import LOG_DATE_FORMAT, LOG_ENCODING
+from .events import (
+    MissionIsPlaying, MissionHasBegun, MissionHasEnded, MissionWasWon,
+)
+from .parsers import GameLogEventParser
+
+
+#: Byte range of a single mission within a log. Range of the very first
+#: mission has no ``mission`` and ``date`` if log does not start with a
+#: "Mission is playing" line.
+MissionRange = namedtuple(
+    'MissionRange',
+    ['start', 'end', 'mission', 'date', 'has_begun', 'has_ended', 'was_won']
+)
+
+MISSION_MARKER = b"Mission"
+
+
+def _iter_marked_lines(data, marker):
+    size = len(data)
+    position = data.find(marker)
+
+    while position != -1:
+        start = data.rfind(b"\n", 0, position) + 1
+        end = data.find(b"\n", position)
+        end = size if end == -1 else end + 1
+
+        yield start, end, data[start:end]
+
+        position = data.find(marker, end)
+
+
+def split_missions(data, encoding=LOG_ENCODING):
+    """
+    Find byte ranges of missions within raw contents of a game log.
+
+    ``data`` is any bytes-like object supporting ``find()`` and ``rfind()``,
+    e.g. ``bytes`` or ``mmap.mmap``. Ranges follow each other without gaps and
+    cover whole data.
+
+    """
+    size = len(data)
+    ranges = []
+    current = dict(
+        start=0,
+        mission=None,
+        date=None,
+        has_begun=False,
+        has_ended=False,
+        was_won=False,
+    )
+
+    for start, end, line in _iter_marked_lines(data, MISSION_MARKER):
+        line = line.decode(encoding).rstrip("\r\n")
+
+        match = MissionIsPlaying.matcher(line)
+        if match:
+            if start > current['start'] or current['mission']:
+                ranges.append(MissionRange(end=start, **current))
+
+            date = datetime.datetime.strptime(
+                match.group('date'), LOG_DATE_FORMAT,
+            ).date()
+            current = dict(
+                start=start,
+                mission=match.group('mission'),
+                date=date,
+                has_begun=False,
+                has_ended=False,
+                was_won=False,
+            )
+        elif MissionHasBegun.matcher(line):
+            current['has_begun'] = True
+        elif MissionHasEnded.matcher(line):
+            current['has_ended'] = True
+        elif MissionWasWon.matcher(line):
+            current['was_won'] = True
+
+    if size > current['start'] or current['mission']:
+        ranges.append(MissionRange(end=size, **current))
+
+    return ranges
+
+
+def iter_dated_events(events, date=None, last_time=None):
+    """
+    Attach dates to events which carry time only.
+
+    Yields ``(date, event)`` tuples. Date is taken from events which have it
+    (e.g. "Mission is playing") and is moved to the next day when time of
+    events passes midnight. Date stays ``None`` until it becomes known.
+
+    ``date`` and ``last_time`` allow to continue dating of a log which is
+    processed in parts.
+
+    """
+    for event in events:
+        event_date = getattr(event, 'date', None)
+        event_time = getattr(event, 'time', None)
+
+        if event_date is not None:
+            date = event_date
+        elif (
+            date is not None and
+            last_time is not None and
+            event_time is not None and
+            event_time < last_time
+        ):
+            date += datetime.timedelta(days=1)
+
+        if event_time is not None:
+            last_time = event_time
+
+        yield date, event
+
+
+def iter_mission_lines(data, mission, encoding=LOG_ENCODING):
+    """
+    Iterate over decoded lines of a given mission range.
+
+    """
+    chunk = data[mission.start:mission.end]
+    for line in chunk.splitlines():
+        yield line.decode(encoding)
+
+
+def iter_mission_events(
+    data, mission, parser=None, ignore_errors=False, encoding=LOG_ENCODING,
+):
+    """
+    Parse a single mission range and yield ``(date, event)`` tuples.
+
+    """
+    if parser is None:
+        parser = GameLogEventParser()
+
+    lines = iter_mission_lines(data, mission, encoding)
+    events = parser.parse_lines(lines, ignore_errors=ignore_errors)
+    return iter_dated_events(events, mission.date)
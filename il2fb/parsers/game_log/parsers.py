@@ -1,29 +1,393 @@
 # coding: utf-8
 
+from collections import OrderedDict
+
 from il2fb.commons.events import EventParsingException
+from il2fb.commons.regex import make_matcher
 
+from .constants import LOG_ENCODING
 from .events import get_all_events
+from .lazy import make_lazy_event_class
+from .prefilter import get_event_phrase, get_event_phrases
 from .priority import get_event_priority
+from .regex import TIME_GROUP_PREFIX, POS_GROUP_SUFFIX
+from .streams import ReadaheadReader, open_log, iter_lines
+from .transformers import get_transformer_field
+
+
+TIME_PREFIX_MATCHER = make_matcher(TIME_GROUP_PREFIX)
+POS_SUFFIX_MATCHER = make_matcher(POS_GROUP_SUFFIX)
+
+#: Fields which are transformed again for each string found in parse cache.
+VARIABLE_FIELDS = frozenset(['time', 'pos', ])
 
 
 class GameLogEventParser(object):
+    """
+    Parser of game log events.
+
+    ``events`` define which events strings are classified against. By
+    default all known events are used.
+
+    ``only`` turns on selective mode: only the given subset of ``events``
+    is returned, while classification stays correct with respect to the
+    whole set of ``events``. Strings which cannot belong to selected events
+    are rejected by phrase prefilter before any regular expressions are
+    applied. Strings of other events are not treated as errors in selective
+    mode and ``None`` is returned for them.
 
-    def __init__(self, events=None):
+    ``fields`` is a projection: an iterable of names of event fields which
+    are needed by consumer. Transformers of other fields are not run and
+    those fields are set to ``None``. Transformers which do not declare
+    their fields are always run.
+
+    ``lazy`` makes parser return lazy events: transformers of their fields
+    are run only when fields are accessed for the first time.
+
+    ``cache_size`` enables LRU cache of parse results keyed by string's body
+    without leading time and trailing position. Strings found in cache skip
+    classification and only their time and position are transformed, while
+    other fields (e.g. actors) are shared with cached data. This pays off for
+    bursts of similar events, like destruction of trees and buildings. Cache
+    cannot be used together with lazy events.
+
+    """
+
+    def __init__(
+        self, events=None, only=None, fields=None, lazy=False,
+        cache_size=None,
+    ):
         events = events if events is not None else get_all_events()
-        self._events = sorted(events, key=get_event_priority)
+        events = sorted(events, key=get_event_priority)
+
+        if only is not None:
+            selection = frozenset(only)
+            unknown = selection.difference(events)
+
+            if unknown:
+                raise ValueError(
+                    "Selected events are not known to parser: {0}"
+                    .format(", ".join(sorted(x.__name__ for x in unknown)))
+                )
+
+            selection_phrases = list(set(
+                get_event_phrases(event) for event in selection
+            ))
+        else:
+            selection = None
+            selection_phrases = None
+
+        if cache_size and lazy:
+            raise ValueError("Parse cache cannot be used with lazy events")
+
+        self._setup(
+            events=events,
+            phrases=[get_event_phrase(event) for event in events],
+            plans=self._make_plans(events, fields),
+            selection=selection,
+            selection_phrases=selection_phrases,
+            lazy=lazy,
+            cache_size=cache_size,
+        )
+
+    def _setup(
+        self, events, phrases, plans, selection, selection_phrases, lazy,
+        cache_size,
+    ):
+        self._events = events
+        self._dispatch = list(zip(phrases, events))
+        self._plans = plans
+        self._selection = selection
+        self._selection_phrases = selection_phrases
+
+        if lazy:
+            self._lazy_events = {
+                event: make_lazy_event_class(event, *plans[event])
+                for event in events
+            }
+        else:
+            self._lazy_events = None
+
+        if cache_size:
+            self._cache = OrderedDict()
+            self._cache_size = cache_size
+        else:
+            self._cache = None
+            self._cache_size = None
+
+    def __getstate__(self):
+        # Transformers are closures and cannot be pickled, so they are
+        # referenced by their indices within events.
+        plans = {
+            event: (
+                tuple(event.transformers.index(x) for x in transformers),
+                skipped,
+            )
+            for event, (transformers, skipped) in self._plans.items()
+        }
+        return {
+            'events': self._events,
+            'phrases': [phrase for phrase, event in self._dispatch],
+            'plans': plans,
+            'selection': self._selection,
+            'selection_phrases': self._selection_phrases,
+            'lazy': self._lazy_events is not None,
+            'cache_size': self._cache_size,
+        }
+
+    def __setstate__(self, state):
+        state = dict(state)
+        state['plans'] = {
+            event: (
+                tuple(event.transformers[i] for i in indices),
+                skipped,
+            )
+            for event, (indices, skipped) in state['plans'].items()
+        }
+        self._setup(**state)
+
+    @staticmethod
+    def _make_plans(events, fields):
+        if fields is None:
+            return {
+                event: (event.transformers, tuple())
+                for event in events
+            }
+
+        fields = frozenset(fields)
+        known = set()
+
+        for event in events:
+            known.update(event.__slots__)
+
+        unknown = fields.difference(known)
+        if unknown:
+            raise ValueError(
+                "Projected fields are not known to parser: {0}"
+                .format(", ".join(sorted(unknown)))
+            )
+
+        plans = {}
+
+        for event in events:
+            transformers = tuple(
+                transformer
+                for transformer in event.transformers
+                if get_transformer_field(transformer) in fields or
+                get_transformer_field(transformer) is None
+            )
+            skipped = tuple(
+                name
+                for name in event.__slots__
+                if name not in fields
+            )
+            plans[event] = (transformers, skipped)
+
+        return plans
+
+    def build(self, event, match):
+        """
+        Create an instance of event from its match object.
+
+        """
+        if self._lazy_events is not None:
+            return self._lazy_events[event](match.groupdict())
+
+        transformers, skipped = self._plans[event]
+        data = match.groupdict()
+
+        for transformer in transformers:
+            transformer(data)
+
+        for name in skipped:
+            data[name] = None
+
+        return event(**data)
+
+    @property
+    def events(self):
+        """
+        Events known to parser in order of their priority.
+
+        """
+        return list(self._events)
+
+    @property
+    def selection(self):
+        """
+        Set of selected events or ``None`` if parser is not selective.
+
+        """
+        return self._selection
+
+    def is_selected(self, string):
+        """
+        Tell whether a string may contain one of selected events.
+
+        Only phrase prefilter is applied, so ``True`` is not a guarantee.
+
+        """
+        if self._selection_phrases is None:
+            return True
+
+        for phrases in self._selection_phrases:
+            for phrase in phrases:
+                if phrase not in string:
+                    break
+            else:
+                return True
+
+        return False
+
+    def match(self, string):
+        """
+        Find event which a string belongs to.
+
+        Returns a tuple of event class and match object, or a tuple of
+        ``None`` values if no event matches the string.
+
+        """
+        for phrase, event in self._dispatch:
+            if phrase in string:
+                match = event.matcher(string)
+                if match:
+                    return event, match
+
+        return None, None
 
     def parse(self, string, ignore_errors=False):
-        result = None
+        if not self.is_selected(string):
+            return None
+
+        if self._cache is not None:
+            prefix = TIME_PREFIX_MATCHER(string)
+            if prefix:
+                return self._parse_cached(string, prefix, ignore_errors)
+
+        event, match = self.match(string)
+
+        if event is None:
+            return self._on_unknown_string(string, ignore_errors)
 
-        for event in self._events:
-            result = event.from_s(string)
-            if result:
-                break
+        if self._selection is not None and event not in self._selection:
+            return None
 
-        if not result and not ignore_errors:
+        return self.build(event, match)
+
+    @staticmethod
+    def _on_unknown_string(string, ignore_errors):
+        if not ignore_errors:
             raise EventParsingException(
                 "No event was found for string \"{0}\""
                 .format(string)
             )
 
-        return result
+    def _parse_cached(self, string, prefix, ignore_errors):
+        body = string[prefix.end():]
+        index = body.rfind(" at ")
+        suffix = POS_SUFFIX_MATCHER(body, index) if index != -1 else None
+        key = (body[:index], True) if suffix else (body, False)
+
+        entry = self._cache.pop(key, None)
+
+        if entry is None:
+            event, match = self.match(string)
+
+            if event is None:
+                return self._on_unknown_string(string, ignore_errors)
+
+            selected = (
+                self._selection is None or event in self._selection
+            )
+
+            if suffix and 'pos_x' not in match.re.groupindex:
+                # Suffix only looks like position, so results for strings
+                # with other suffixes may differ and cannot be shared.
+                return self.build(event, match) if selected else None
+
+            if selected:
+                entry = self._make_cache_entry(event, match)
+            else:
+                entry = (None, None, None, None)
+
+        self._cache[key] = entry
+
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+        event, partial, transformers, skipped = entry
+
+        if event is None:
+            return None
+
+        data = dict(partial)
+        data['time'] = prefix.group('time')
+
+        if suffix:
+            data['pos_x'] = suffix.group('pos_x')
+            data['pos_y'] = suffix.group('pos_y')
+
+        for transformer in transformers:
+            transformer(data)
+
+        for name in skipped:
+            data[name] = None
+
+        return event(**data)
+
+    def _make_cache_entry(self, event, match):
+        transformers, skipped = self._plans[event]
+        variable_transformers = []
+        data = match.groupdict()
+
+        for transformer in transformers:
+            if get_transformer_field(transformer) in VARIABLE_FIELDS:
+                variable_transformers.append(transformer)
+            else:
+                transformer(data)
+
+        return (event, data, tuple(variable_transformers), skipped)
+
+    def parse_lines(self, lines, ignore_errors=False):
+        """
+        Lazily parse an iterable of log lines.
+
+        Line endings are stripped and blank lines are skipped. If
+        ``ignore_errors`` is set, lines which cannot be parsed are skipped
+        as well.
+
+        """
+        for line in lines:
+            line = line.rstrip("\r\n")
+
+            if not line:
+                continue
+
+            event = self.parse(line, ignore_errors=ignore_errors)
+
+            if event is not None:
+                yield event
+
+    def parse_file(
+        self, path, ignore_errors=False, encoding=LOG_ENCODING, threaded=False,
+    ):
+        """
+        Lazily parse a log file, which may be compressed with gzip, bzip2 or
+        xz. Compressed files are decompressed on the fly.
+
+        If ``threaded`` is set, file is read and decompressed ahead in a
+        background thread.
+
+        """
+        with open_log(path) as stream:
+            if threaded:
+                with ReadaheadReader(stream) as reader:
+                    lines = reader.iter_lines(encoding=encoding)
+
+                    for event in self.parse_lines(lines, ignore_errors):
+                        yield event
+            else:
+                lines = iter_lines(stream, encoding=encoding)
+
+                for event in self.parse_lines(lines, ignore_errors):
+                    yield event
@@ -0,0 +1,450 @@
+# coding: utf-8
+"""
+Staged ingestion pipelines.
+
+Pipeline is a chain of stages, e.g. read, split, parse, enrich and sink
+stages. Each stage maps an item to zero or more items for the next stage.
+A stage runs either inline, i.e. in the thread which pulls its items, in a
+thread of its own or in a pool of processes. Stages which run in threads or
+processes pass their items through bounded queues, so fast stages wait for
+slow ones instead of piling up items in memory.
+
+Every stage collects metrics: number of items, time spent on them and
+throughput.
+
+Standard stages work with batches of lines and events rather than with
+single ones, so costs of queues are paid per batch.
+
+"""
+
+import collections
+import itertools
+import multiprocessing
+import threading
+import time
+
+from .batches import ParseLinesToBatch, attach_batch, discard_batch
+from .constants import LOG_ENCODING
+from .missions import iter_dated_events
+from .parsers import GameLogEventParser
+from .pools import get_fork_context
+from .streams import (
+    DEFAULT_BUFFER_SIZE, _Producer, iter_line_chunks, open_log,
+)
+
+
+INLINE = 'inline'
+THREAD = 'thread'
+PROCESS = 'process'
+
+MODES = (INLINE, THREAD, PROCESS)
+
+DEFAULT_QUEUE_SIZE = 4
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+#: Functions of stages which run in processes. Filled by initializers of
+#: pools, or inherited by forked workers.
+_FUNCTIONS = {}
+_COUNTER = itertools.count()
+
+
+def _init_worker(key, function):
+    _FUNCTIONS[key] = function
+
+
+def _call(args):
+    key, item = args
+    started = _timer()
+    outputs = list(_FUNCTIONS[key](item) or ())
+    return _timer() - started, outputs
+
+
+class StageMetrics(object):
+    """
+    Metrics of a single stage.
+
+    ``busy_time`` is the total time spent by function of stage. For stages
+    which run in processes, it is summed across all of them.
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_time = 0.0
+        self.max_latency = 0.0
+        self.started = None
+        self.finished = None
+
+    def _add(self, latency, outputs):
+        self.items_in += 1
+        self.items_out += outputs
+        self.busy_time += latency
+
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    @property
+    def elapsed(self):
+        """
+        Wall time since the stage has started.
+
+        """
+        if self.started is None:
+            return 0.0
+
+        finished = self.finished if self.finished is not None else _timer()
+        return finished - self.started
+
+    @property
+    def mean_latency(self):
+        return self.busy_time / self.items_in if self.items_in else 0.0
+
+    @property
+    def throughput(self):
+        """
+        Number of input items per second of wall time.
+
+        """
+        elapsed = self.elapsed
+        return self.items_in / elapsed if elapsed else 0.0
+
+    def __repr__(self):
+        return (
+            "<StageMetrics '{0}' in={1} out={2} busy={3:.3f}s "
+            "max_latency={4:.3f}s>"
+            .format(
+                self.name, self.items_in, self.items_out, self.busy_time,
+                self.max_latency,
+            )
+        )
+
+
+class Stage(object):
+    """
+    Stage of a pipeline.
+
+    ``function`` accepts an item and returns an iterable of items for the
+    next stage or ``None``. Functions of stages which run in processes must
+    return picklable items. They are inherited by workers if ``fork`` start
+    method is available and must be picklable otherwise.
+
+    ``processes`` is the number of processes of a pool. ``queue_size`` is
+    the number of items which may wait for the next stage. For stages which
+    run in processes, at most ``2 * processes`` items are processed at once.
+
+    ``release`` is an optional callable which frees an output of the stage
+    if it is dropped because the pipeline is stopped early, e.g. a block of
+    shared memory. If it is given, pending items of a pool are waited for
+    before the pool is terminated.
+
+    """
+
+    def __init__(
+        self, function, name=None, mode=INLINE, processes=None,
+        queue_size=DEFAULT_QUEUE_SIZE, release=None,
+    ):
+        if mode not in MODES:
+            raise ValueError("Unknown mode of stage: {0}".format(mode))
+
+        if name is None:
+            name = getattr(function, '__name__', function.__class__.__name__)
+
+        self.function = function
+        self.name = name
+        self.mode = mode
+        self.processes = processes or multiprocessing.cpu_count()
+        self.queue_size = queue_size
+        self.release = release
+        self.metrics = StageMetrics(name)
+
+    def _map(self, items):
+        metrics = self.metrics
+        function = self.function
+
+        for item in items:
+            started = _timer()
+            latency = 0.0
+            count = 0
+
+            for output in function(item) or ():
+                count += 1
+                latency += _timer() - started
+                yield output
+                started = _timer()
+
+            metrics._add(latency + _timer() - started, count)
+
+    def _map_in_pool(self, items):
+        key = next(_COUNTER)
+        metrics = self.metrics
+
+        context = get_fork_context()
+
+        if context is not None:
+            _FUNCTIONS[key] = self.function
+            pool = context.Pool(self.processes)
+        else:
+            pool = multiprocessing.Pool(
+                self.processes, _init_worker, (key, self.function),
+            )
+
+        pending = collections.deque()
+        outputs = collections.deque()
+        limit = 2 * self.processes
+
+        try:
+            items = iter(items)
+
+            while True:
+                for item in items:
+                    pending.append(pool.apply_async(_call, ((key, item), )))
+
+                    if len(pending) >= limit:
+                        break
+
+                if not pending:
+                    break
+
+                latency, results = pending.popleft().get()
+                metrics._add(latency, len(results))
+                outputs.extend(results)
+
+                while outputs:
+                    yield outputs.popleft()
+        finally:
+            if self.release is not None:
+                self._release_pending(pending, outputs)
+
+            pool.terminate()
+            pool.join()
+            _FUNCTIONS.pop(key, None)
+
+    def _release_pending(self, pending, outputs):
+        for result in pending:
+            try:
+                outputs.extend(result.get()[1])
+            except Exception:
+                continue
+
+        for output in outputs:
+            self.release(output)
+
+    def _run(self, items):
+        self.metrics = StageMetrics(self.name)
+        self.metrics.started = _timer()
+
+        try:
+            if self.mode == PROCESS:
+                outputs = self._map_in_pool(items)
+            else:
+                outputs = self._map(items)
+
+            for output in outputs:
+                yield output
+        finally:
+            self.metrics.finished = _timer()
+
+
+class Pipeline(object):
+    """
+    Chain of stages.
+
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+
+    @property
+    def metrics(self):
+        """
+        Get metrics of stages of the last run.
+
+        """
+        return [stage.metrics for stage in self.stages]
+
+    def process(self, items):
+        """
+        Pass an iterable of items through all stages and yield outputs of
+        the last stage.
+
+        """
+        stopped = threading.Event()
+        producers = []
+
+        try:
+            for stage in self.stages:
+                items = stage._run(items)
+
+                if stage.mode != INLINE:
+                    # All threads of a pipeline share a single stop flag.
+                    producer = _Producer(
+                        items, stage.queue_size, stopped, stage.release,
+                    )
+                    producers.append(producer)
+                    items = iter(producer)
+
+            for item in items:
+                yield item
+        finally:
+            stopped.set()
+
+            for producer in producers:
+                producer.close()
+
+    def run(self, items):
+        """
+        Pass an iterable of items through all stages and discard outputs.
+        Returns metrics of stages.
+
+        """
+        for item in self.process(items):
+            pass
+
+        return self.metrics
+
+
+class ReadChunks(object):
+    """
+    Read stage: maps a path of a log, which may be compressed, to chunks of
+    its complete lines.
+
+    """
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+
+    def __call__(self, path):
+        stream = open_log(path, buffer_size=self.buffer_size)
+
+        try:
+            for chunk in iter_line_chunks(stream, self.buffer_size):
+                yield chunk
+        finally:
+            stream.close()
+
+
+class SplitLines(object):
+    """
+    Split stage: maps a chunk of bytes to a list of decoded lines.
+
+    """
+
+    def __init__(self, encoding=LOG_ENCODING):
+        self.encoding = encoding
+
+    def __call__(self, chunk):
+        lines = chunk.decode(self.encoding).split("\n")
+
+        if not lines[-1]:
+            lines.pop()
+
+        return [lines, ]
+
+
+class ParseLines(object):
+    """
+    Parse stage: maps a list of lines to a list of events.
+
+    Accepts an instance of ``GameLogEventParser``. A new parser with default
+    options is built if it is not given.
+
+    """
+
+    def __init__(self, parser=None, ignore_errors=False):
+        self.parser = parser if parser is not None else GameLogEventParser()
+        self.ignore_errors = ignore_errors
+
+    def __call__(self, lines):
+        return [list(self.parser.parse_lines(
+            lines, ignore_errors=self.ignore_errors,
+        )), ]
+
+
+class AttachDates(object):
+    """
+    Enrich stage: maps a list of events to a list of ``(date, event)``
+    tuples. Dates are tracked across lists, so this stage must not run in
+    processes.
+
+    """
+
+    def __init__(self, date=None):
+        self.date = date
+        self.last_time = None
+
+    def __call__(self, events):
+        results = list(iter_dated_events(events, self.date, self.last_time))
+
+        if results:
+            self.date = results[-1][0]
+
+        for event in reversed(events):
+            time = getattr(event, 'time', None)
+
+            if time is not None:
+                self.last_time = time
+                break
+
+        return [results, ]
+
+
+class WriteMany(object):
+    """
+    Sink stage: passes lists of items to ``write_many`` method of a sink,
+    e.g. of ``SQLiteSink`` or ``JSONLinesExporter``. Produces no items.
+
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __call__(self, items):
+        self.sink.write_many(items)
+
+
+def make_pipeline(
+    sink=None, parser=None, ignore_errors=False, encoding=LOG_ENCODING,
+    buffer_size=DEFAULT_BUFFER_SIZE, dates=False, parse_mode=INLINE,
+    processes=None, shared_memory=False,
+):
+    """
+    Build a pipeline of standard stages which maps paths of logs to lists
+    of events, or of ``(date, event)`` tuples if ``dates`` is set.
+
+    Files are read in a separate thread. Lists are passed to ``sink`` if it
+    is given.
+
+    If ``shared_memory`` is set, parsing processes pass events to parent
+    process via shared memory and the pipeline yields ``EventBatch``
+    objects instead of lists of events.
+
+    """
+    stages = [
+        Stage(ReadChunks(buffer_size), 'read', THREAD),
+        Stage(SplitLines(encoding), 'split'),
+    ]
+
+    if shared_memory and parse_mode == PROCESS:
+        stages.extend([
+            Stage(
+                ParseLinesToBatch(parser, ignore_errors), 'parse', PROCESS,
+                processes, release=discard_batch,
+            ),
+            Stage(attach_batch, 'attach'),
+        ])
+    else:
+        stages.append(Stage(
+            ParseLines(parser, ignore_errors), 'parse', parse_mode,
+            processes,
+        ))
+
+    if dates:
+        stages.append(Stage(AttachDates(), 'enrich'))
+
+    if sink is not None:
+        stages.append(Stage(WriteMany(sink), 'sink'))
+
+    return Pipeline(stages)
@@ -0,0 +1,159 @@
+# coding: utf-8
+"""
+Prefork pool of parsing processes.
+
+Parser is built in parent process once and worker processes are forked from
+it afterwards. This way compiled regular expressions and other structures of
+parser are shared by workers via copy-on-write memory instead of being
+created by each of them. Objects of parent process are frozen by garbage
+collector before forking (if supported by Python), so that collections in
+workers do not touch shared memory pages.
+
+Pool requires "fork" start method, which is not available on Windows.
+
+"""
+
+import gc
+import itertools
+import mmap
+import multiprocessing
+import os
+
+from .constants import LOG_ENCODING
+from .missions import split_missions, iter_dated_events
+from .parsers import GameLogEventParser
+
+
+#: Parsers of pools. Filled in parent process and inherited by workers.
+_PARSERS = {}
+_COUNTER = itertools.count()
+
+
+def get_fork_context():
+    """
+    Get a context of ``multiprocessing`` which starts processes by forking,
+    or ``None`` if forking is not supported.
+
+    """
+    get_all_start_methods = getattr(
+        multiprocessing, 'get_all_start_methods', None,
+    )
+
+    if get_all_start_methods is None:
+        # Python 2 always forks processes if it is supported.
+        return multiprocessing if hasattr(os, 'fork') else None
+
+    if 'fork' in get_all_start_methods():
+        return multiprocessing.get_context('fork')
+
+
+def _parse_lines(args):
+    key, lines, ignore_errors = args
+    parser = _PARSERS[key]
+    return list(parser.parse_lines(lines, ignore_errors=ignore_errors))
+
+
+def _parse_mission(args):
+    key, path, mission, ignore_errors, encoding = args
+    parser = _PARSERS[key]
+
+    with open(path, 'rb') as f:
+        f.seek(mission.start)
+        data = f.read(mission.end - mission.start)
+
+    lines = (line.decode(encoding) for line in data.splitlines())
+    events = parser.parse_lines(lines, ignore_errors=ignore_errors)
+    return list(iter_dated_events(events, mission.date))
+
+
+class PreforkParserPool(object):
+    """
+    Pool of processes which share a parser built in parent process.
+
+    Accepts an instance of ``GameLogEventParser``. A new parser with
+    default options is built if it is not given.
+
+    """
+
+    def __init__(self, parser=None, processes=None):
+        context = get_fork_context()
+
+        if context is None:
+            raise RuntimeError(
+                "Prefork pool requires 'fork' start method of processes"
+            )
+
+        self.parser = parser if parser is not None else GameLogEventParser()
+        self._key = next(_COUNTER)
+        _PARSERS[self._key] = self.parser
+
+        gc.collect()
+        self._frozen = hasattr(gc, 'freeze')
+        if self._frozen:
+            gc.freeze()
+
+        self._pool = context.Pool(processes)
+
+    def parse_chunks(self, chunks, ignore_errors=False, chunksize=1):
+        """
+        Parse an iterable of chunks of lines in worker processes.
+
+        Yields lists of events in order of chunks.
+
+        """
+        tasks = (
+            (self._key, list(chunk), ignore_errors)
+            for chunk in chunks
+        )
+        return self._pool.imap(_parse_lines, tasks, chunksize)
+
+    def parse_file(self, path, ignore_errors=False, encoding=LOG_ENCODING):
+        """
+        Split log file into missions and parse them in worker processes.
+
+        Yields ``(date, event)`` tuples in order of log.
+
+        """
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    missions = split_missions(data, encoding=encoding)
+                finally:
+                    data.close()
+            else:
+                missions = []
+
+        tasks = (
+            (self._key, path, mission, ignore_errors, encoding)
+            for mission in missions
+        )
+        for results in self._pool.imap(_parse_mission, tasks):
+            for result in results:
+                yield result
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+        self._release()
+
+    def terminate(self):
+        self._pool.terminate()
+        self._pool.join()
+        self._release()
+
+    def _release(self):
+        _PARSERS.pop(self._key, None)
+
+        if self._frozen:
+            gc.unfreeze()
+            self._frozen = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
@@ -0,0 +1,139 @@
+# coding: utf-8
+"""
+Phrase prefilter.
+
+Each event's regular expression contains literal phrases (e.g. "connected" or
+"destroyed") which must be present in a string for the expression to match
+it. Checking presence of a phrase is much cheaper than applying a regular
+expression, so phrases are used to skip events which cannot match a string.
+
+"""
+
+import re
+
+
+ESCAPED_CLASSES = set("sSdDwWbBAZ")
+QUANTIFIERS = set("*+?{")
+
+
+def get_pattern_phrases(pattern, flags=0):
+    """
+    Extract literal phrases which are mandatory for a given regular
+    expression.
+
+    Only the top level of expression is inspected: groups, character sets and
+    quantified characters end phrases. No phrases are returned if expression
+    has top-level alternatives.
+
+    """
+    verbose = bool(flags & re.VERBOSE)
+    phrases = []
+    current = []
+    depth = 0
+    i = 0
+
+    def flush():
+        if current:
+            phrases.append("".join(current))
+            del current[:]
+
+    while i < len(pattern):
+        char = pattern[i]
+
+        if char == "\\":
+            escaped = pattern[i + 1:i + 2]
+            i += 2
+            if depth or escaped in ESCAPED_CLASSES or escaped.isdigit():
+                flush()
+                continue
+            literal = escaped
+        elif char == "[":
+            i = _skip_character_set(pattern, i)
+            flush()
+            continue
+        elif char == "(":
+            depth += 1
+            i += 1
+            flush()
+            continue
+        elif char == ")":
+            depth -= 1
+            i += 1
+            continue
+        elif depth:
+            i += 1
+            continue
+        elif char == "|":
+            return []
+        elif char in "^$.":
+            i += 1
+            flush()
+            continue
+        elif verbose and char.isspace():
+            i += 1
+            continue
+        elif verbose and char == "#":
+            newline = pattern.find("\n", i)
+            i = len(pattern) if newline == -1 else newline + 1
+            continue
+        elif char == "{":
+            i = pattern.find("}", i) + 1 or len(pattern)
+            flush()
+            continue
+        elif char in QUANTIFIERS:
+            i += 1
+            flush()
+            continue
+        else:
+            literal = char
+            i += 1
+
+        if pattern[i:i + 1] in QUANTIFIERS:
+            flush()
+        else:
+            current.append(literal)
+
+    flush()
+    return phrases
+
+
+def _skip_character_set(pattern, i):
+    i += 1
+
+    if pattern[i:i + 1] == "^":
+        i += 1
+    if pattern[i:i + 1] == "]":
+        i += 1
+
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+
+    return i + 1
+
+
+def get_event_phrases(event):
+    """
+    Get distinct literal phrases which must be present in a string for a given
+    event to be parsed from it. Longer phrases go first.
+
+    """
+    try:
+        compiled = event.matcher.__self__
+    except AttributeError:
+        return tuple()
+
+    phrases = set(get_pattern_phrases(compiled.pattern, compiled.flags))
+    return tuple(sorted(phrases, key=lambda x: (-len(x), x)))
+
+
+def get_event_phrase(event):
+    """
+    Get the longest literal phrase which must be present in a string for a
+    given event to be parsed from it.
+
+    Empty string is returned if event has no such phrase, so it is present in
+    any string.
+
+    """
+    phrases = get_event_phrases(event)
+    return phrases[0] if phrases else ""
@@ -0,0 +1,402 @@
+# coding: utf-8
+"""
+Profiling of parsing.
+
+Profiler wraps a parser into an instrumented copy which attributes time to
+stages of parsing:
+
+* ``prefilter``: rejection of strings by phrases of selected events;
+* ``classify``: search for phrases of events in strings;
+* ``match:<event>``: regular expressions of each class of events;
+* ``extract``: extraction of captured strings from match objects;
+* ``transform:<transformer>``: each transformer of fields;
+* ``construct:<event>``: construction of event objects;
+* ``other``: everything else, e.g. reading of files and handling of lines.
+
+Time prefixes of strings are parsed by regular expressions of events and by
+``transform_time`` transformer, so they are accounted there.
+
+Deterministic mode measures every stage with a timer. This is exact, but
+timers add overhead to short stages. Sampling mode only marks current stage
+and a background thread samples it together with the Python stack of the
+profiled thread, so overhead is low but results are estimations.
+
+Results are available as a table of stages and as collapsed stacks, which are
+understood by flame graph tools.
+
+Parse cache is not used while profiling.
+
+"""
+
+import collections
+import sys
+import threading
+import time
+
+from .parsers import GameLogEventParser
+from .transformers import get_transformer_field
+
+
+DETERMINISTIC = 'deterministic'
+SAMPLING = 'sampling'
+
+MODES = (DETERMINISTIC, SAMPLING)
+
+DEFAULT_INTERVAL = 0.001
+
+OTHER = ('other', )
+PREFILTER = ('prefilter', )
+CLASSIFY = ('classify', )
+EXTRACT = ('extract', )
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+try:
+    from threading import get_ident as _get_thread_id
+except ImportError:
+    from thread import get_ident as _get_thread_id
+
+
+StageStats = collections.namedtuple('StageStats', ['name', 'calls', 'time'])
+StageStats.__doc__ = """
+Statistics of a stage of parsing. In sampling mode ``calls`` is the number
+of samples and ``time`` is estimated.
+
+"""
+
+
+def get_transformer_label(transformer):
+    """
+    Get a readable name of a transformer, e.g.
+    ``get_human_transformer(actor)``.
+
+    """
+    name = getattr(transformer, '__qualname__', transformer.__name__)
+    name = name.split('.<locals>', 1)[0]
+    field = get_transformer_field(transformer)
+    return "{0}({1})".format(name, field) if field else name
+
+
+class _ProfiledParser(GameLogEventParser):
+    """
+    Copy of a parser which reports stages of parsing to a profiler.
+
+    """
+
+    def __init__(self, parser, profiler):
+        state = dict(parser.__getstate__())
+        state['cache_size'] = None
+        self.__setstate__(state)
+        self._profiler = profiler
+
+        self._match_labels = {}
+        self._construct_labels = {}
+        self._transform_labels = {}
+
+        for event in self._events:
+            self._match_labels[event] = ('match', event.__name__)
+            self._construct_labels[event] = ('construct', event.__name__)
+
+            for transformer in self._plans[event][0]:
+                self._transform_labels[transformer] = (
+                    'transform', get_transformer_label(transformer),
+                )
+
+
+class _TimedParser(_ProfiledParser):
+
+    def is_selected(self, string):
+        started = _timer()
+        result = super(_TimedParser, self).is_selected(string)
+        self._profiler._add(PREFILTER, _timer() - started)
+        return result
+
+    def match(self, string):
+        add = self._profiler._add
+        labels = self._match_labels
+        started = _timer()
+
+        for phrase, event in self._dispatch:
+            if phrase in string:
+                now = _timer()
+                add(CLASSIFY, now - started)
+                match = event.matcher(string)
+                started = _timer()
+                add(labels[event], started - now)
+
+                if match:
+                    return event, match
+
+        add(CLASSIFY, _timer() - started)
+        return None, None
+
+    def build(self, event, match):
+        add = self._profiler._add
+
+        if self._lazy_events is not None:
+            started = _timer()
+            result = self._lazy_events[event](match.groupdict())
+            add(self._construct_labels[event], _timer() - started)
+            return result
+
+        transformers, skipped = self._plans[event]
+        labels = self._transform_labels
+
+        started = _timer()
+        data = match.groupdict()
+        finished = _timer()
+        add(EXTRACT, finished - started)
+
+        for transformer in transformers:
+            started = finished
+            transformer(data)
+            finished = _timer()
+            add(labels[transformer], finished - started)
+
+        for name in skipped:
+            data[name] = None
+
+        started = _timer()
+        result = event(**data)
+        add(self._construct_labels[event], _timer() - started)
+        return result
+
+
+class _MarkedParser(_ProfiledParser):
+
+    def is_selected(self, string):
+        profiler = self._profiler
+        profiler.stage = PREFILTER
+        result = super(_MarkedParser, self).is_selected(string)
+        profiler.stage = OTHER
+        return result
+
+    def match(self, string):
+        profiler = self._profiler
+        labels = self._match_labels
+        profiler.stage = CLASSIFY
+
+        for phrase, event in self._dispatch:
+            if phrase in string:
+                profiler.stage = labels[event]
+                match = event.matcher(string)
+                profiler.stage = CLASSIFY
+
+                if match:
+                    profiler.stage = OTHER
+                    return event, match
+
+        profiler.stage = OTHER
+        return None, None
+
+    def build(self, event, match):
+        profiler = self._profiler
+
+        if self._lazy_events is not None:
+            profiler.stage = self._construct_labels[event]
+            result = self._lazy_events[event](match.groupdict())
+            profiler.stage = OTHER
+            return result
+
+        transformers, skipped = self._plans[event]
+        labels = self._transform_labels
+
+        profiler.stage = EXTRACT
+        data = match.groupdict()
+
+        for transformer in transformers:
+            profiler.stage = labels[transformer]
+            transformer(data)
+
+        for name in skipped:
+            data[name] = None
+
+        profiler.stage = self._construct_labels[event]
+        result = event(**data)
+        profiler.stage = OTHER
+        return result
+
+
+class ParseProfiler(object):
+    """
+    Profiler of parsing.
+
+    Accepts an instance of ``GameLogEventParser``. A new parser with default
+    options is built if it is not given. Instrumented copy of it is
+    available as ``parser`` attribute and must be used between ``start()``
+    and ``stop()`` calls, or within ``with`` block, in the same thread.
+
+    ``interval`` is the number of seconds between samples in sampling mode.
+
+    """
+
+    def __init__(
+        self, parser=None, mode=DETERMINISTIC, interval=DEFAULT_INTERVAL,
+    ):
+        if mode not in MODES:
+            raise ValueError("Unknown mode of profiling: {0}".format(mode))
+
+        parser = parser if parser is not None else GameLogEventParser()
+        parser_class = _TimedParser if mode == DETERMINISTIC else _MarkedParser
+
+        self.parser = parser_class(parser, self)
+        self.mode = mode
+        self.interval = interval
+        self.elapsed = 0.0
+        self.stage = OTHER
+
+        self._stages = {}
+        self._stacks = {}
+        self._started = None
+        self._stopped = None
+        self._sampler = None
+        self._switch_interval = None
+
+    def _add(self, label, duration):
+        entry = self._stages.get(label)
+
+        if entry is None:
+            self._stages[label] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+
+    def start(self):
+        self._started = _timer()
+
+        if self.mode == SAMPLING:
+            if hasattr(sys, 'setswitchinterval'):
+                # Let sampler run as often as it is asked to.
+                self._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(
+                    min(self._switch_interval, self.interval)
+                )
+
+            self._stopped = threading.Event()
+            self._sampler = threading.Thread(
+                target=self._sample, args=(_get_thread_id(), ),
+            )
+            self._sampler.daemon = True
+            self._sampler.start()
+
+    def stop(self):
+        if self._started is None:
+            return
+
+        self.elapsed += _timer() - self._started
+        self._started = None
+
+        if self._sampler is not None:
+            self._stopped.set()
+            self._sampler.join()
+            self._sampler = None
+
+            if self._switch_interval is not None:
+                sys.setswitchinterval(self._switch_interval)
+                self._switch_interval = None
+
+    def _sample(self, thread_id):
+        stacks = self._stacks
+
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stage = self.stage
+            stack = []
+
+            while frame is not None:
+                stack.append("{0}:{1}".format(
+                    frame.f_globals.get('__name__'), frame.f_code.co_name,
+                ))
+                frame = frame.f_back
+
+            stack.reverse()
+            key = (tuple(stack), stage)
+            stacks[key] = stacks.get(key, 0) + 1
+
+    def _get_stage_times(self):
+        if self.mode == DETERMINISTIC:
+            stages = dict(
+                (label, tuple(entry))
+                for label, entry in self._stages.items()
+            )
+            measured = sum(x[1] for x in stages.values())
+            calls = stages.get(OTHER, (0, 0.0))[0]
+            stages[OTHER] = (calls, max(self.elapsed - measured, 0.0))
+            return stages
+
+        counts = {}
+
+        for (stack, stage), count in self._stacks.items():
+            counts[stage] = counts.get(stage, 0) + count
+
+        total = sum(counts.values())
+        return dict(
+            (label, (count, self.elapsed * count / total))
+            for label, count in counts.items()
+        )
+
+    def get_stages(self):
+        """
+        Get a list of ``StageStats`` ordered by time.
+
+        """
+        results = [
+            StageStats(":".join(label), calls, duration)
+            for label, (calls, duration) in self._get_stage_times().items()
+        ]
+        results.sort(key=lambda x: (-x.time, x.name))
+        return results
+
+    def format_table(self):
+        """
+        Format stages of parsing as a text table.
+
+        """
+        lines = [
+            "{0:<64} {1:>10} {2:>10} {3:>7}".format(
+                "stage",
+                "samples" if self.mode == SAMPLING else "calls",
+                "time, s",
+                "%",
+            ),
+        ]
+
+        for stage in self.get_stages():
+            share = 100.0 * stage.time / self.elapsed if self.elapsed else 0
+            lines.append("{0:<64} {1:>10} {2:>10.3f} {3:>7.1f}".format(
+                stage.name, stage.calls, stage.time, share,
+            ))
+
+        return "\n".join(lines) + "\n"
+
+    def write_collapsed(self, stream):
+        """
+        Write collapsed stacks into a text stream.
+
+        In deterministic mode stacks consist of stages and are weighted by
+        microseconds. In sampling mode stacks of Python frames are followed
+        by stages and are weighted by numbers of samples.
+
+        """
+        if self.mode == DETERMINISTIC:
+            entries = [
+                (("parse", ) + label, int(duration * 1e6))
+                for label, (calls, duration)
+                in self._get_stage_times().items()
+            ]
+        else:
+            entries = [
+                (stack + stage, count)
+                for (stack, stage), count in self._stacks.items()
+            ]
+
+        for stack, weight in sorted(entries):
+            if weight:
+                stream.write("{0} {1}\n".format(";".join(stack), weight))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
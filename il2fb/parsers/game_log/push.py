@@ -0,0 +1,168 @@
+# coding: utf-8
+"""
+SAX-style push parsing.
+
+Consumers register handlers for events they are interested in and push
+strings into parser. Handlers are called directly, without checking types of
+events by consumers. Strings which cannot belong to handled events are
+rejected by phrase prefilter, and events are not created at all if only raw
+handlers are interested in them.
+
+"""
+
+import inspect
+
+from il2fb.commons.events import EventParsingException
+
+from .parsers import GameLogEventParser
+from .prefilter import get_event_phrases
+from .taxonomy import get_events_by_categories
+
+
+class PushParser(object):
+    """
+    Parser which pushes events to registered handlers.
+
+    Accepts an instance of ``GameLogEventParser`` which is used for
+    classification and creation of events. A new parser with default options
+    is built if it is not given.
+
+    """
+
+    def __init__(self, parser=None):
+        self.parser = parser if parser is not None else GameLogEventParser()
+        self._handlers = []
+        self._table = None
+        self._phrases = None
+
+    def add_handler(self, handler, events=None, categories=None, raw=False):
+        """
+        Register a handler for given events.
+
+        ``events`` is an event class or an iterable of event classes.
+        ``categories`` is a bitmask of categories from ``taxonomy`` module:
+        handler is registered for events which belong to any of them. Handler
+        is registered for all events if neither of them is given.
+
+        Handlers are called with an event object as the only argument. Raw
+        handlers are called with event class and a dictionary of strings
+        captured by event's regular expression. The dictionary is shared by
+        raw handlers and must not be changed.
+
+        """
+        if inspect.isclass(events):
+            events = [events, ]
+
+        if categories is not None:
+            events = set(events or ())
+            events.update(get_events_by_categories(categories))
+        elif events is None:
+            events = self.parser.events
+
+        self._handlers.append((handler, frozenset(events), raw))
+        self._table = None
+
+    def remove_handler(self, handler):
+        """
+        Unregister all registrations of a given handler.
+
+        """
+        self._handlers = [x for x in self._handlers if x[0] is not handler]
+        self._table = None
+
+    def _build_table(self):
+        known = set(self.parser.events)
+        selection = self.parser.selection
+
+        if selection is not None:
+            known.intersection_update(selection)
+
+        table = {}
+
+        for handler, events, raw in self._handlers:
+            for event in events.intersection(known):
+                raw_handlers, handlers = table.setdefault(event, ([], []))
+                (raw_handlers if raw else handlers).append(handler)
+
+        self._table = {
+            event: (tuple(raw_handlers), tuple(handlers))
+            for event, (raw_handlers, handlers) in table.items()
+        }
+        self._phrases = list(set(
+            get_event_phrases(event) for event in self._table
+        ))
+
+    def is_handled(self, string):
+        """
+        Tell whether a string may contain one of handled events.
+
+        Only phrase prefilter is applied, so ``True`` is not a guarantee.
+
+        """
+        if self._table is None:
+            self._build_table()
+
+        for phrases in self._phrases:
+            for phrase in phrases:
+                if phrase not in string:
+                    break
+            else:
+                return True
+
+        return False
+
+    def feed(self, string, ignore_errors=False):
+        """
+        Parse a single string and call handlers of its event.
+
+        Returns class of event if it was handled or ``None`` otherwise.
+
+        Strings which cannot contain handled events are skipped silently. For
+        other strings ``EventParsingException`` is raised if they do not
+        contain any known event, unless ``ignore_errors`` is set.
+
+        """
+        if not self.is_handled(string):
+            return None
+
+        event, match = self.parser.match(string)
+
+        if event is None:
+            if not ignore_errors:
+                raise EventParsingException(
+                    "No event was found for string \"{0}\""
+                    .format(string)
+                )
+            return None
+
+        entry = self._table.get(event)
+
+        if entry is None:
+            return None
+
+        raw_handlers, handlers = entry
+
+        if raw_handlers:
+            data = match.groupdict()
+            for handler in raw_handlers:
+                handler(event, data)
+
+        if handlers:
+            instance = self.parser.build(event, match)
+            for handler in handlers:
+                handler(instance)
+
+        return event
+
+    def feed_lines(self, lines, ignore_errors=False):
+        """
+        Parse an iterable of log lines and call handlers of their events.
+
+        Line endings are stripped and blank lines are skipped.
+
+        """
+        for line in lines:
+            line = line.rstrip("\r\n")
+
+            if line:
+                self.feed(line, ignore_errors=ignore_errors)
@@ -0,0 +1,223 @@
+# coding: utf-8
+"""
+Ingestion server for log lines pushed by remote shippers.
+
+Shippers send newline-delimited log lines over TCP or UDP. Lines are parsed
+in batches and lists of events are passed to registered sinks together with
+tags of their sources.
+
+Source of a TCP connection is tagged by address of peer, unless shipper
+sends a ``#source <tag>`` line. Lines which start with ``#`` are not parsed.
+Connection is not read further until sinks have processed its previous
+batch, so slow sinks push back on shippers via TCP flow control. Connection
+is closed if shipper sends a line longer than ``max_line_length`` bytes.
+
+UDP datagrams may contain one or more complete lines and are tagged by
+addresses of peers. ``#source <tag>`` line tags the following lines of the
+same datagram. Datagrams are dropped if too many of them are waiting for
+sinks.
+
+Requires Python 3.5+.
+
+"""
+
+import asyncio
+import inspect
+import logging
+
+from .constants import LOG_ENCODING
+from .parsers import GameLogEventParser
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_READ_SIZE = 64 * 1024
+DEFAULT_DATAGRAM_QUEUE_SIZE = 1024
+DEFAULT_MAX_LINE_LENGTH = 64 * 1024
+
+SOURCE_DIRECTIVE = "#source "
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, address):
+        self.server._on_datagram(data, address)
+
+
+class IngestionServer(object):
+    """
+    Server which accepts log lines over TCP and UDP and passes parsed events
+    to sinks.
+
+    Accepts an instance of ``GameLogEventParser``. A new parser with default
+    options is built if it is not given. Unknown strings are skipped unless
+    ``ignore_errors`` is unset.
+
+    """
+
+    def __init__(
+        self, parser=None, encoding=LOG_ENCODING, ignore_errors=True,
+        read_size=DEFAULT_READ_SIZE,
+        datagram_queue_size=DEFAULT_DATAGRAM_QUEUE_SIZE,
+        max_line_length=DEFAULT_MAX_LINE_LENGTH,
+    ):
+        self.parser = parser if parser is not None else GameLogEventParser()
+        self.encoding = encoding
+        self.ignore_errors = ignore_errors
+        self.read_size = read_size
+        self.datagram_queue_size = datagram_queue_size
+        self.max_line_length = max_line_length
+        self.dropped_datagrams = 0
+
+        self._sinks = []
+        self._servers = []
+        self._transports = []
+        self._datagrams = None
+        self._datagram_task = None
+
+    def add_sink(self, sink):
+        """
+        Register a sink. Sink is a callable or a coroutine function which
+        accepts a tag of source and a list of events.
+
+        """
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        self._sinks.remove(sink)
+
+    def _split_lines(self, data, tag):
+        """
+        Decode complete lines, skip comments and apply ``#source``
+        directives. Returns tag of the last line and a list of lines.
+
+        """
+        lines = []
+
+        for line in data.decode(self.encoding).split("\n"):
+            if line.startswith(SOURCE_DIRECTIVE):
+                tag = line[len(SOURCE_DIRECTIVE):].strip()
+            elif not line.startswith("#"):
+                lines.append(line)
+
+        return tag, lines
+
+    async def _dispatch(self, tag, lines):
+        events = list(self.parser.parse_lines(
+            lines, ignore_errors=self.ignore_errors,
+        ))
+
+        if not events:
+            return
+
+        for sink in self._sinks:
+            result = sink(tag, events)
+
+            if inspect.isawaitable(result):
+                await result
+
+    async def _handle_connection(self, reader, writer):
+        host, port = writer.get_extra_info('peername')[:2]
+        tag = "{0}:{1}".format(host, port)
+        tail = b""
+
+        try:
+            while True:
+                data = await reader.read(self.read_size)
+
+                if not data:
+                    break
+
+                data = tail + data
+                end = data.rfind(b"\n") + 1
+                tail = data[end:]
+
+                if end:
+                    tag, lines = self._split_lines(data[:end], tag)
+                    await self._dispatch(tag, lines)
+
+                if len(tail) > self.max_line_length:
+                    LOG.warning(
+                        "Line of %s is longer than %s bytes, closing "
+                        "connection", tag, self.max_line_length,
+                    )
+                    tail = b""
+                    break
+
+            if tail:
+                tag, lines = self._split_lines(tail, tag)
+                await self._dispatch(tag, lines)
+        except Exception:
+            LOG.exception("Failed to process lines of %s", tag)
+        finally:
+            writer.close()
+
+    def _on_datagram(self, data, address):
+        try:
+            self._datagrams.put_nowait((data, address))
+        except asyncio.QueueFull:
+            self.dropped_datagrams += 1
+
+    async def _process_datagrams(self):
+        while True:
+            data, address = await self._datagrams.get()
+            tag = "{0}:{1}".format(*address[:2])
+
+            try:
+                tag, lines = self._split_lines(data, tag)
+                await self._dispatch(tag, lines)
+            except Exception:
+                LOG.exception("Failed to process datagram of %s", tag)
+
+    async def start_tcp(self, host='127.0.0.1', port=0):
+        """
+        Start accepting TCP connections. Returns bound ``(host, port)``.
+
+        """
+        server = await asyncio.start_server(
+            self._handle_connection, host, port,
+        )
+        self._servers.append(server)
+        return server.sockets[0].getsockname()[:2]
+
+    async def start_udp(self, host='127.0.0.1', port=0):
+        """
+        Start accepting UDP datagrams. Returns bound ``(host, port)``.
+
+        """
+        if self._datagrams is None:
+            self._datagrams = asyncio.Queue(maxsize=self.datagram_queue_size)
+            self._datagram_task = asyncio.ensure_future(
+                self._process_datagrams()
+            )
+
+        loop = asyncio.get_event_loop()
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(self), local_addr=(host, port),
+        )
+        self._transports.append(transport)
+        return transport.get_extra_info('sockname')[:2]
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+
+        for transport in self._transports:
+            transport.close()
+
+        if self._datagram_task is not None:
+            self._datagram_task.cancel()
+
+            try:
+                await self._datagram_task
+            except asyncio.CancelledError:
+                pass
+
+        self._servers = []
+        self._transports = []
+        self._datagrams = None
+        self._datagram_task = None
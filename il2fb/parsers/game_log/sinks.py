@@ -0,0 +1,348 @@
+# coding: utf-8
+"""
+Storage sinks for parsed events.
+
+``SQLiteSink`` stores events in a normalized schema: table ``events`` keeps
+common fields and the whole event encoded as JSON, table ``actors`` keeps
+actors of events by their roles. Events are inserted in batches, each batch
+is a single transaction.
+
+Sink can remember how far log files were read. Offsets of sources are
+updated in the same transactions as events, so imports of growing or
+interrupted logs can be resumed without losing or duplicating events.
+
+"""
+
+import datetime
+import sqlite3
+
+from .constants import LOG_ENCODING
+from .exporters import get_event_serializer
+from .missions import iter_dated_events
+from .parsers import GameLogEventParser
+from .taxonomy import get_event_categories, get_event_type_code
+from .tokens import ACTOR_FIELDS
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    offset INTEGER NOT NULL DEFAULT 0,
+    date TEXT,
+    last_time TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER REFERENCES sources (id),
+    type INTEGER NOT NULL,
+    categories INTEGER NOT NULL,
+    date TEXT,
+    time TEXT,
+    pos_x REAL,
+    pos_y REAL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actors (
+    event_id INTEGER NOT NULL REFERENCES events (id),
+    role TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    callsign TEXT,
+    aircraft TEXT,
+    flight TEXT,
+    ident TEXT,
+    member_index INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_date_time ON events (date, time);
+CREATE INDEX IF NOT EXISTS events_type ON events (type);
+CREATE INDEX IF NOT EXISTS actors_event_id ON actors (event_id);
+CREATE INDEX IF NOT EXISTS actors_callsign ON actors (callsign);
+"""
+
+
+class _LineReader(object):
+    """
+    Iterator over complete lines of a binary stream which keeps offset of
+    the end of the last line.
+
+    """
+
+    def __init__(self, stream, offset, encoding):
+        self.stream = stream
+        self.offset = offset
+        self.encoding = encoding
+
+    def __iter__(self):
+        for line in self.stream:
+            if not line.endswith(b"\n"):
+                # Line is still being written.
+                break
+
+            self.offset += len(line)
+            yield line.decode(self.encoding)
+
+
+class SQLiteSink(object):
+    """
+    Sink which writes events into SQLite database.
+
+    Events are written in batches of ``batch_size`` events. Sink must be
+    flushed or closed to write the rest of them.
+
+    """
+
+    def __init__(self, database, batch_size=1000):
+        self._connection = sqlite3.connect(database, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+        self._batch_size = batch_size
+        self._events = []
+        self._sources = {}
+
+    @property
+    def connection(self):
+        return self._connection
+
+    def get_source_state(self, source):
+        """
+        Get ``(offset, date, last_time)`` tuple describing how far a given
+        source was read. ``last_time`` is time of the last read event, it
+        tells whether the next events have passed midnight. Returns
+        ``(0, None, None)`` for unknown sources.
+
+        """
+        if source in self._sources:
+            return self._sources[source]
+
+        row = self._connection.execute(
+            "SELECT offset, date, last_time FROM sources WHERE path = ?",
+            (source, ),
+        ).fetchone()
+
+        if row is None:
+            return 0, None, None
+
+        offset, date, last_time = row
+
+        if date is not None:
+            date = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+
+        if last_time is not None:
+            last_time = datetime.datetime.strptime(
+                last_time, "%H:%M:%S",
+            ).time()
+
+        return offset, date, last_time
+
+    def set_source_state(self, source, offset, date=None, last_time=None):
+        """
+        Remember how far a given source was read. State is saved with the
+        next batch of events.
+
+        """
+        self._sources[source] = (offset, date, last_time)
+
+    def write(self, event, date=None, source=None, offset=None):
+        """
+        Write an event with its date.
+
+        If ``source`` is given, ``offset`` must point to the end of event
+        within source.
+
+        """
+        self._events.append((event, date, source))
+
+        if source is not None:
+            last_time = getattr(event, 'time', None)
+
+            if last_time is None and source in self._sources:
+                last_time = self._sources[source][2]
+
+            self.set_source_state(source, offset, date, last_time)
+
+        if len(self._events) >= self._batch_size:
+            self.flush()
+
+    def write_many(self, events):
+        """
+        Write an iterable of events or of ``(date, event)`` tuples.
+
+        """
+        for item in events:
+            if isinstance(item, tuple):
+                date, event = item
+            else:
+                date, event = None, item
+
+            self.write(event, date)
+
+    def import_file(
+        self, path, parser=None, ignore_errors=False, encoding=LOG_ENCODING,
+    ):
+        """
+        Parse log file starting from the place where previous import of it
+        has stopped. Incomplete last line is left for the next import.
+
+        Returns number of written events.
+
+        """
+        parser = parser if parser is not None else GameLogEventParser()
+        offset, date, last_time = self.get_source_state(path)
+        count = 0
+
+        with open(path, 'rb') as f:
+            f.seek(0, 2)
+
+            if f.tell() < offset:
+                # File was truncated or replaced.
+                offset, date, last_time = 0, None, None
+
+            f.seek(offset)
+            reader = _LineReader(f, offset, encoding)
+            events = parser.parse_lines(reader, ignore_errors=ignore_errors)
+
+            for date, event in iter_dated_events(events, date, last_time):
+                self.write(event, date, path, reader.offset)
+                count += 1
+
+                if getattr(event, 'time', None) is not None:
+                    last_time = event.time
+
+        self.set_source_state(path, reader.offset, date, last_time)
+        self.flush()
+        return count
+
+    def _get_next_event_id(self):
+        row = self._connection.execute("SELECT MAX(id) FROM events")
+        return (row.fetchone()[0] or 0) + 1
+
+    def _get_source_id(self, source, cache):
+        source_id = cache.get(source)
+
+        if source_id is None:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO sources (path) VALUES (?)", (source, ),
+            )
+            source_id = self._connection.execute(
+                "SELECT id FROM sources WHERE path = ?", (source, ),
+            ).fetchone()[0]
+            cache[source] = source_id
+
+        return source_id
+
+    def flush(self):
+        """
+        Write pending events and states of sources in a single transaction.
+
+        """
+        if not self._events and not self._sources:
+            return
+
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            event_id = self._get_next_event_id()
+            source_ids = {}
+            event_rows = []
+            actor_rows = []
+
+            for event, date, source in self._events:
+                source_id = (
+                    self._get_source_id(source, source_ids)
+                    if source is not None else
+                    None
+                )
+                event_rows.append(
+                    self._make_event_row(event_id, source_id, event, date)
+                )
+                actor_rows.extend(self._iter_actor_rows(event_id, event))
+                event_id += 1
+
+            connection.executemany(
+                "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                event_rows,
+            )
+            connection.executemany(
+                "INSERT INTO actors VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                actor_rows,
+            )
+
+            for source, (offset, date, last_time) in self._sources.items():
+                source_id = self._get_source_id(source, source_ids)
+                connection.execute(
+                    "UPDATE sources SET offset = ?, date = ?, last_time = ? "
+                    "WHERE id = ?",
+                    (
+                        offset,
+                        date and date.isoformat(),
+                        None if last_time is None else last_time.isoformat(),
+                        source_id,
+                    ),
+                )
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+
+        del self._events[:]
+        self._sources.clear()
+
+    @staticmethod
+    def _make_event_row(event_id, source_id, event, date):
+        event_class = event.__class__
+        time = getattr(event, 'time', None)
+        pos = getattr(event, 'pos', None)
+        data = get_event_serializer(event_class)(
+            event, '"name":"{0}"'.format(event_class.__name__),
+        )
+        return (
+            event_id,
+            source_id,
+            get_event_type_code(event_class),
+            get_event_categories(event_class),
+            date and date.isoformat(),
+            None if time is None else time.isoformat(),
+            None if pos is None else pos.x,
+            None if pos is None else pos.y,
+            data,
+        )
+
+    @staticmethod
+    def _iter_actor_rows(event_id, event):
+        for role in ACTOR_FIELDS:
+            actor = getattr(event, role, None)
+
+            if actor is None:
+                continue
+
+            ident = getattr(actor, 'id', None)
+
+            if ident is None:
+                ident = getattr(actor, 'name', None)
+
+            yield (
+                event_id,
+                role,
+                actor.__class__.__name__,
+                getattr(actor, 'callsign', None),
+                getattr(actor, 'aircraft', None),
+                getattr(actor, 'flight', None),
+                ident,
+                getattr(actor, 'index', None),
+            )
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,146 @@
+# coding: utf-8
+"""
+Snapshots of built parsers.
+
+Building a parser sorts events, extracts phrases for prefilter and prepares
+plans of transformers. Short-lived processes can load all of this from a
+snapshot file instead. Snapshots are keyed by version of library, version of
+Python, set of events and options of parser, so stale snapshots are never
+used.
+
+Note: regular expressions of events are compiled when events module is
+imported and are not a part of snapshots.
+
+Snapshots are pickles, so they are loaded only from directories and files
+which are owned by current user and are not writable by others. Snapshots
+are never loaded on systems without owners of files, e.g. on Windows.
+
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+import sys
+
+from .events import get_all_events
+from .parsers import GameLogEventParser
+from .utils import atomic_write
+from .version import VERSION
+
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_FILE_NAME_TEMPLATE = "il2fb-game-log-parser-{key}.pickle"
+
+
+def _get_class_path(cls):
+    return "{0}.{1}".format(cls.__module__, cls.__name__)
+
+
+def get_snapshot_key(events=None, **options):
+    """
+    Get key of snapshot for parser with given events and options.
+
+    """
+    events = events if events is not None else get_all_events()
+    only = options.get('only')
+    fields = options.get('fields')
+
+    parts = [
+        "format={0}".format(SNAPSHOT_FORMAT_VERSION),
+        "version={0}".format(VERSION),
+        "python={0}.{1}".format(*sys.version_info[:2]),
+        "events={0}".format(",".join(_get_class_path(x) for x in events)),
+        "only={0}".format(
+            None if only is None else
+            ",".join(sorted(_get_class_path(x) for x in only))
+        ),
+        "fields={0}".format(
+            None if fields is None else ",".join(sorted(fields))
+        ),
+        "lazy={0}".format(bool(options.get('lazy'))),
+        "cache_size={0}".format(options.get('cache_size') or None),
+    ]
+    data = "\n".join(parts).encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def get_snapshot_path(directory, key):
+    file_name = SNAPSHOT_FILE_NAME_TEMPLATE.format(key=key)
+    return os.path.join(directory, file_name)
+
+
+def save_snapshot(parser, path, key):
+    """
+    Atomically write snapshot of a parser to a given path.
+
+    """
+    with atomic_write(path) as f:
+        pickle.dump(
+            {'key': key, 'parser': parser},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+
+def _is_private(file_stat):
+    return (
+        file_stat.st_uid == os.getuid() and
+        not file_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def load_snapshot(path, key):
+    """
+    Load parser from a snapshot. ``None`` is returned if snapshot does not
+    exist, is broken, has a different key or may have been written by other
+    users.
+
+    """
+    if not hasattr(os, 'getuid'):
+        return None
+
+    try:
+        if not _is_private(os.stat(os.path.dirname(os.path.abspath(path)))):
+            return None
+
+        with open(path, 'rb') as f:
+            if not _is_private(os.fstat(f.fileno())):
+                return None
+
+            snapshot = pickle.load(f)
+    except (
+        EnvironmentError, EOFError, AttributeError, ImportError,
+        pickle.UnpicklingError,
+    ):
+        # Snapshot does not exist, is broken or refers to things which do
+        # not exist anymore.
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('key') != key:
+        return None
+
+    return snapshot.get('parser')
+
+
+def load_parser(directory, events=None, **options):
+    """
+    Load parser from a snapshot stored in a given directory or build a new
+    one and try to store its snapshot.
+
+    Accepts the same arguments as ``GameLogEventParser``.
+
+    """
+    key = get_snapshot_key(events, **options)
+    path = get_snapshot_path(directory, key)
+    parser = load_snapshot(path, key)
+
+    if parser is None:
+        parser = GameLogEventParser(events, **options)
+
+        try:
+            save_snapshot(parser, path, key)
+        except (IOError, OSError):
+            pass
+
+    return parser
@@ -0,0 +1,398 @@
+# coding: utf-8
+"""
+Streams of log files.
+
+Logs may be compressed with gzip, bzip2 or xz. Compression is detected by
+magic bytes and logs are decompressed on the fly, without extracting them
+anywhere. Files are read with large buffers.
+
+Decompression may be done in a background thread: compression libraries
+release GIL, so decompression of the next blocks overlaps with parsing of
+the current one.
+
+"""
+
+import bz2
+import gzip
+import io
+import threading
+
+import six
+
+from six.moves import queue
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+from .constants import LOG_ENCODING
+
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_QUEUE_SIZE = 4
+
+_END = object()
+
+GZIP = 'gzip'
+BZIP2 = 'bz2'
+XZ = 'xz'
+
+COMPRESSION_MAGICS = (
+    (GZIP, b"\x1f\x8b"),
+    (BZIP2, b"BZh"),
+    (XZ, b"\xfd7zXZ\x00"),
+)
+
+
+def detect_compression(prefix):
+    """
+    Get name of compression by first bytes of data. Returns ``None`` if data
+    is not compressed.
+
+    """
+    for name, magic in COMPRESSION_MAGICS:
+        if prefix.startswith(magic):
+            return name
+
+
+class _BZ2Stream(io.RawIOBase):
+    """
+    Raw stream which decompresses bzip2 data read from a binary stream.
+    Used on Python 2, where ``BZ2File`` accepts file names only.
+
+    """
+
+    def __init__(self, stream, block_size=DEFAULT_BUFFER_SIZE):
+        self._stream = stream
+        self._block_size = block_size
+        self._decompressor = bz2.BZ2Decompressor()
+        self._data = b""
+
+    def readable(self):
+        return True
+
+    def _decompress(self, data):
+        results = []
+
+        while data:
+            try:
+                results.append(self._decompressor.decompress(data))
+            except EOFError:
+                # The next stream of a multi-stream file.
+                self._decompressor = bz2.BZ2Decompressor()
+                continue
+
+            data = self._decompressor.unused_data
+
+            if data:
+                self._decompressor = bz2.BZ2Decompressor()
+
+        return b"".join(results)
+
+    def readinto(self, b):
+        while not self._data:
+            data = self._stream.read(self._block_size)
+
+            if not data:
+                return 0
+
+            self._data = self._decompress(data)
+
+        size = min(len(b), len(self._data))
+        b[:size] = self._data[:size]
+        self._data = self._data[size:]
+        return size
+
+
+def _open_decompressor(compression, stream):
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    elif compression == BZIP2:
+        if six.PY2:
+            return _BZ2Stream(stream)
+        return bz2.BZ2File(stream, mode='rb')
+    elif compression == XZ:
+        if lzma is None:
+            raise RuntimeError("Support of xz compression is not available")
+        return lzma.LZMAFile(stream, mode='rb')
+
+
+class _Producer(object):
+    """
+    Runs an iterable in a background thread and passes its items through a
+    bounded queue.
+
+    Producer is stopped by ``stopped`` event if it is given, e.g. by one
+    shared by several producers. Items which are dropped after stop are
+    passed to ``release`` callable if it is given.
+
+    """
+
+    def __init__(self, iterable, queue_size, stopped=None, release=None):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopped = stopped if stopped is not None else threading.Event()
+        self._release = release
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, args=(iterable, ))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            else:
+                return True
+
+        return False
+
+    def _run(self, iterable):
+        try:
+            for item in iterable:
+                if not self._put((item, None)):
+                    if self._release is not None:
+                        self._release(item)
+                    return
+        except Exception as e:
+            self._put((_END, e))
+        else:
+            self._put((_END, None))
+        finally:
+            close = getattr(iterable, 'close', None)
+
+            if close is not None:
+                close()
+
+    def _get(self):
+        while not self._finished and not self._stopped.is_set():
+            try:
+                item, error = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            if item is _END:
+                self._finished = True
+
+                if error is not None:
+                    raise error
+
+            return item
+
+        return _END
+
+    def get(self):
+        """
+        Get the next item. Returns ``None`` if there are no more items or
+        producer is stopped. Exceptions of iterable are raised here.
+
+        """
+        item = self._get()
+        return None if item is _END else item
+
+    def __iter__(self):
+        while True:
+            item = self._get()
+
+            if item is _END:
+                return
+
+            yield item
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join()
+
+        if self._release is None:
+            return
+
+        while True:
+            try:
+                item, error = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is not _END:
+                self._release(item)
+
+
+class _ThreadedRawStream(io.RawIOBase):
+    """
+    Raw stream which reads blocks of a source stream in a background thread.
+
+    """
+
+    def __init__(self, source, block_size, queue_size):
+        super(_ThreadedRawStream, self).__init__()
+        blocks = iter(lambda: source.read(block_size), b"")
+        self._producer = _Producer(blocks, queue_size)
+        self._block = b""
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._position >= len(self._block):
+            block = self._producer.get()
+
+            if block is None:
+                return 0
+
+            self._block = block
+            self._position = 0
+
+        size = min(len(buffer), len(self._block) - self._position)
+        end = self._position + size
+        buffer[:size] = self._block[self._position:end]
+        self._position = end
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._producer.close()
+
+        super(_ThreadedRawStream, self).close()
+
+
+def iter_line_chunks(stream, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Read a binary stream by blocks of ``buffer_size`` bytes and yield chunks
+    of complete lines. Only the last chunk may lack a line ending.
+
+    """
+    tail = b""
+
+    while True:
+        block = stream.read(buffer_size)
+
+        if not block:
+            break
+
+        end = block.rfind(b"\n") + 1
+
+        if end:
+            yield tail + block[:end]
+            tail = block[end:]
+        else:
+            tail += block
+
+    if tail:
+        yield tail
+
+
+class ReadaheadReader(object):
+    """
+    Reader which fills buffers from a binary stream in a background thread
+    and passes chunks of complete lines to consumer through a bounded queue.
+
+    Reading and decompression release GIL, so they overlap with processing
+    of previous chunks. At most ``queue_size`` chunks are read ahead.
+
+    """
+
+    def __init__(
+        self, stream, buffer_size=DEFAULT_BUFFER_SIZE, queue_size=2,
+    ):
+        self._producer = _Producer(
+            iter_line_chunks(stream, buffer_size), queue_size,
+        )
+
+    def __iter__(self):
+        while True:
+            chunk = self._producer.get()
+
+            if chunk is None:
+                break
+
+            yield chunk
+
+    def iter_lines(self, encoding=LOG_ENCODING):
+        """
+        Iterate over decoded lines. Line feeds are stripped, while carriage
+        returns are kept.
+
+        """
+        for chunk in self:
+            lines = chunk.decode(encoding).split("\n")
+
+            if not lines[-1]:
+                lines.pop()
+
+            for line in lines:
+                yield line
+
+    def close(self):
+        self._producer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class LogStream(io.BufferedReader):
+    """
+    Buffered binary stream of a log which closes all underlying streams.
+
+    """
+
+    def __init__(self, raw, buffer_size, resources=()):
+        super(LogStream, self).__init__(raw, buffer_size)
+        self._resources = resources
+
+    def close(self):
+        try:
+            super(LogStream, self).close()
+        finally:
+            for resource in reversed(self._resources):
+                resource.close()
+
+
+def open_log(
+    path, buffer_size=DEFAULT_BUFFER_SIZE, threaded=False,
+    queue_size=DEFAULT_QUEUE_SIZE,
+):
+    """
+    Open a log file, which may be compressed, for reading as a binary
+    stream.
+
+    If ``threaded`` is set, data is read and decompressed by a background
+    thread in blocks of ``buffer_size`` bytes. At most ``queue_size`` blocks
+    are read ahead.
+
+    """
+    f = io.open(path, 'rb', buffering=buffer_size)
+    resources = [f, ]
+
+    try:
+        compression = detect_compression(f.peek(8)[:8])
+        stream = f
+
+        if compression is not None:
+            stream = _open_decompressor(compression, f)
+            resources.append(stream)
+
+        if threaded:
+            stream = _ThreadedRawStream(stream, buffer_size, queue_size)
+            resources.append(stream)
+        elif compression is None:
+            return f
+
+        return LogStream(stream, buffer_size, resources)
+    except Exception:
+        for resource in reversed(resources):
+            resource.close()
+        raise
+
+
+def iter_lines(stream, encoding=LOG_ENCODING):
+    """
+    Iterate over decoded lines of a binary stream. Line endings are kept.
+
+    """
+    for line in stream:
+        yield line.decode(encoding)
@@ -0,0 +1,239 @@
+# coding: utf-8
+"""
+Summaries of log files.
+
+Summary of a log tells how many events of each type it contains, where its
+missions are, which callsigns appear in it, which time span it covers and
+how many lines are unknown to parser. Summaries are stored in sidecar files
+next to logs, so questions like "which logs contain pilot X" can be answered
+without parsing logs again.
+
+Sidecars are keyed by size, modification time and SHA-1 digest of logs.
+Size and modification time are checked first. Digest is calculated only if
+modification time has changed while size has not, e.g. if log was copied.
+
+"""
+
+import datetime
+import hashlib
+import json
+import os
+
+from collections import namedtuple
+
+from .constants import LOG_ENCODING
+from .missions import MissionRange, split_missions, iter_dated_events
+from .parsers import GameLogEventParser
+from .tokens import ACTOR_FIELDS
+from .utils import atomic_write
+from .version import VERSION
+
+
+SUMMARY_FORMAT_VERSION = 1
+SIDECAR_SUFFIX = ".summary.json"
+
+#: Fields of events needed to build summaries.
+SUMMARY_FIELDS = ('date', 'time', ) + ACTOR_FIELDS
+
+DATE_FORMAT = "%Y-%m-%d"
+TIME_FORMAT = "%H:%M:%S"
+
+#: ``start`` and ``end`` are ``(date, time)`` tuples of the first and the
+#: last events with time, ``counts`` maps names of events to their numbers.
+LogSummary = namedtuple(
+    'LogSummary',
+    [
+        'size', 'mtime', 'digest', 'counts', 'missions', 'callsigns',
+        'start', 'end', 'unknown_lines',
+    ]
+)
+
+
+def get_sidecar_path(path):
+    return path + SIDECAR_SUFFIX
+
+
+def get_digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def get_file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha1()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _get_callsigns(event):
+    for name in ACTOR_FIELDS:
+        callsign = getattr(getattr(event, name, None), 'callsign', None)
+
+        if callsign is not None:
+            yield callsign
+
+
+def build_summary(path, parser=None, encoding=LOG_ENCODING):
+    """
+    Parse a log file and build its summary.
+
+    """
+    if parser is None:
+        parser = GameLogEventParser(fields=SUMMARY_FIELDS)
+
+    stat = os.stat(path)
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    counts = {}
+    callsigns = set()
+    unknown_lines = [0, ]
+
+    def iter_events():
+        for line in data.splitlines():
+            line = line.decode(encoding).rstrip("\r\n")
+
+            if not line:
+                continue
+
+            event = parser.parse(line, ignore_errors=True)
+
+            if event is None:
+                unknown_lines[0] += 1
+            else:
+                yield event
+
+    start = end = None
+
+    for date, event in iter_dated_events(iter_events()):
+        counts[event.name] = counts.get(event.name, 0) + 1
+        callsigns.update(_get_callsigns(event))
+
+        time = getattr(event, 'time', None)
+
+        if time is not None:
+            end = (date, time)
+
+            if start is None:
+                start = end
+
+    return LogSummary(
+        size=stat.st_size,
+        mtime=stat.st_mtime,
+        digest=get_digest(data),
+        counts=counts,
+        missions=split_missions(data, encoding=encoding),
+        callsigns=sorted(callsigns),
+        start=start,
+        end=end,
+        unknown_lines=unknown_lines[0],
+    )
+
+
+def _format_moment(moment):
+    if moment is None:
+        return None
+
+    date, time = moment
+    return [date and date.strftime(DATE_FORMAT), time.strftime(TIME_FORMAT)]
+
+
+def _parse_date(value):
+    if value is None:
+        return None
+
+    return datetime.datetime.strptime(value, DATE_FORMAT).date()
+
+
+def _parse_moment(value):
+    if value is None:
+        return None
+
+    date, time = value
+    time = datetime.datetime.strptime(time, TIME_FORMAT).time()
+    return (_parse_date(date), time)
+
+
+def save_summary(summary, path):
+    """
+    Atomically write summary of a log file to its sidecar file.
+
+    """
+    data = summary._asdict()
+    data.update({
+        'format': SUMMARY_FORMAT_VERSION,
+        'version': VERSION,
+        'missions': [
+            dict(
+                mission._asdict(),
+                date=mission.date and mission.date.strftime(DATE_FORMAT),
+            )
+            for mission in summary.missions
+        ],
+        'start': _format_moment(summary.start),
+        'end': _format_moment(summary.end),
+    })
+
+    with atomic_write(get_sidecar_path(path), 'w') as f:
+        json.dump(data, f, sort_keys=True)
+
+
+def load_summary(path):
+    """
+    Load summary of a log file from its sidecar file. ``None`` is returned
+    if sidecar does not exist or is broken. Freshness of summary is not
+    checked.
+
+    """
+    try:
+        with open(get_sidecar_path(path), 'r') as f:
+            data = json.load(f)
+
+        if data.pop('format') != SUMMARY_FORMAT_VERSION:
+            return None
+
+        if data.pop('version') != VERSION:
+            return None
+
+        data['missions'] = [
+            MissionRange(**dict(x, date=_parse_date(x['date'])))
+            for x in data['missions']
+        ]
+        data['start'] = _parse_moment(data['start'])
+        data['end'] = _parse_moment(data['end'])
+        return LogSummary(**data)
+    except Exception:
+        return None
+
+
+def get_summary(path, parser=None, encoding=LOG_ENCODING):
+    """
+    Get summary of a log file from its sidecar file. Summary is rebuilt and
+    saved if log has changed or sidecar is missing.
+
+    """
+    summary = load_summary(path)
+    stat = os.stat(path)
+
+    if summary is not None and summary.size == stat.st_size:
+        if summary.mtime == stat.st_mtime:
+            return summary
+
+        if summary.digest == get_file_digest(path):
+            summary = summary._replace(mtime=stat.st_mtime)
+            _try_save_summary(summary, path)
+            return summary
+
+    summary = build_summary(path, parser=parser, encoding=encoding)
+    _try_save_summary(summary, path)
+    return summary
+
+
+def _try_save_summary(summary, path):
+    try:
+        save_summary(summary, path)
+    except (IOError, OSError):
+        pass
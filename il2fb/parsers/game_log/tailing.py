@@ -0,0 +1,246 @@
+# coding: utf-8
+"""
+Tailing of multiple logs in a single asyncio service.
+
+All logs are parsed by a single parser, so compiled regular expressions and
+other structures of parser are not duplicated. Logs are polled in rounds:
+at most ``batch_size`` bytes of each log are parsed per round, so bursts of
+one log do not starve others. Manager sleeps only if none of logs has grown.
+
+Events of each log are put into a separate queue. Bounded queues slow down
+tailing of their logs if consumers do not keep up: events which do not fit
+into a queue are put by a background task, and the log is not read further
+until they are delivered. Other logs are tailed meanwhile.
+
+Requires Python 3.5+.
+
+"""
+
+import asyncio
+import os
+
+from .constants import LOG_ENCODING
+from .parsers import GameLogEventParser
+
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_BATCH_SIZE = 256 * 1024
+
+
+class TailedFile(object):
+    """
+    State of a single tailed log.
+
+    """
+
+    def __init__(self, path, tag, offset, queue):
+        self.path = path
+        self.tag = tag
+        self.offset = offset
+        self.queue = queue
+        self._stream = None
+        self._inode = None
+        self._feeder = None
+
+    def _open(self, stat):
+        self.close()
+        self._stream = open(self.path, 'rb')
+        self._inode = stat.st_ino
+
+    def read_lines(self, size, encoding=LOG_ENCODING):
+        """
+        Read at most ``size`` bytes of complete lines which were appended to
+        log since the last call. Log is read from the beginning if it was
+        truncated or replaced.
+
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+
+        if self._stream is None or stat.st_ino != self._inode:
+            if self._stream is not None:
+                # File was replaced, e.g. by rotation.
+                self.offset = 0
+
+            self._open(stat)
+
+        if stat.st_size < self.offset:
+            self.offset = 0
+
+        if stat.st_size == self.offset:
+            return []
+
+        self._stream.seek(self.offset)
+        data = self._stream.read(min(size, stat.st_size - self.offset))
+        end = data.rfind(b"\n") + 1
+
+        if not end:
+            if len(data) < size:
+                # Last line is still being written.
+                return []
+
+            # Line does not fit into a batch.
+            end = len(data)
+
+        self.offset += end
+        lines = data[:end].decode(encoding).split("\n")
+
+        if not lines[-1]:
+            lines.pop()
+
+        return lines
+
+    @property
+    def is_busy(self):
+        """
+        Tell whether some events of log are still waiting for a place in
+        its queue.
+
+        """
+        return self._feeder is not None and not self._feeder.done()
+
+    def put_events(self, events):
+        """
+        Put a list of events into queue without waiting. Events which do
+        not fit into queue are put by a background task.
+
+        """
+        for i, event in enumerate(events):
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._feeder = asyncio.ensure_future(self._feed(events[i:]))
+                return
+
+    async def _feed(self, events):
+        for event in events:
+            await self.queue.put(event)
+
+    def close(self):
+        if self._feeder is not None:
+            self._feeder.cancel()
+            self._feeder = None
+
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class TailManager(object):
+    """
+    Manager which tails multiple logs and puts their events into queues.
+
+    Accepts an instance of ``GameLogEventParser`` which is shared by all
+    logs. A new parser with default options is built if it is not given.
+    Unknown strings are skipped unless ``ignore_errors`` is unset.
+
+    """
+
+    def __init__(
+        self, parser=None, interval=DEFAULT_INTERVAL,
+        batch_size=DEFAULT_BATCH_SIZE, encoding=LOG_ENCODING,
+        ignore_errors=True,
+    ):
+        self.parser = parser if parser is not None else GameLogEventParser()
+        self.interval = interval
+        self.batch_size = batch_size
+        self.encoding = encoding
+        self.ignore_errors = ignore_errors
+        self._files = {}
+        self._stopped = None
+
+    def add_file(self, path, tag=None, from_end=True, queue_size=0):
+        """
+        Start tailing a log and get a queue for its events.
+
+        Log is identified by ``tag`` which defaults to ``path``. If
+        ``from_end`` is set, only lines which are appended to log later are
+        parsed.
+
+        """
+        tag = tag if tag is not None else path
+
+        if tag in self._files:
+            raise ValueError("Log {0} is tailed already".format(tag))
+
+        offset = 0
+
+        if from_end and os.path.exists(path):
+            offset = os.path.getsize(path)
+
+        queue = asyncio.Queue(maxsize=queue_size)
+        self._files[tag] = TailedFile(path, tag, offset, queue)
+        return queue
+
+    def remove_file(self, tag):
+        self._files.pop(tag).close()
+
+    def get_queue(self, tag):
+        return self._files[tag].queue
+
+    def get_offsets(self):
+        """
+        Get a mapping of tags of logs to offsets of their unread parts.
+
+        """
+        return {tag: x.offset for tag, x in self._files.items()}
+
+    async def poll(self):
+        """
+        Parse new lines of all logs once. Returns number of parsed lines.
+
+        Logs whose queues are still full after the previous poll are
+        skipped.
+
+        """
+        count = 0
+
+        for tailed in list(self._files.values()):
+            if tailed.is_busy:
+                continue
+
+            lines = tailed.read_lines(self.batch_size, self.encoding)
+
+            if not lines:
+                continue
+
+            count += len(lines)
+            tailed.put_events(list(self.parser.parse_lines(
+                lines, ignore_errors=self.ignore_errors,
+            )))
+
+            # Let consumers run between batches.
+            await asyncio.sleep(0)
+
+        return count
+
+    async def run(self):
+        """
+        Tail logs until manager is stopped.
+
+        """
+        self._stopped = asyncio.Event()
+
+        try:
+            while not self._stopped.is_set():
+                if not await self.poll():
+                    try:
+                        await asyncio.wait_for(
+                            self._stopped.wait(), self.interval,
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._stopped = None
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def close(self):
+        self.stop()
+
+        for tailed in self._files.values():
+            tailed.close()
@@ -0,0 +1,282 @@
+# coding: utf-8
+"""
+Taxonomy of events.
+
+Every event has a stable integer type code and a bitmask of categories it
+belongs to. Filters and aggregators can test integers instead of checking
+classes or their names, and type codes can be used for compact storage of
+events.
+
+Type codes never change: new events must be appended to the end of
+``EVENT_TYPE_NAMES`` and removed events must be replaced with ``None``.
+
+"""
+
+from . import events as _events
+
+
+NONE = 0
+
+DAMAGE = 1 << 0
+KILL = 1 << 1
+CREW_CASUALTY = 1 << 2
+GROUND_DESTRUCTION = 1 << 3
+CONNECTION = 1 << 4
+MISSION_LIFECYCLE = 1 << 5
+HUMAN_INVOLVED = 1 << 6
+AI_INVOLVED = 1 << 7
+
+ALL = (
+    DAMAGE | KILL | CREW_CASUALTY | GROUND_DESTRUCTION | CONNECTION |
+    MISSION_LIFECYCLE | HUMAN_INVOLVED | AI_INVOLVED
+)
+
+#: Names of events. Type code of event is its index plus one.
+EVENT_TYPE_NAMES = (
+    "MissionIsPlaying",
+    "MissionHasBegun",
+    "MissionHasEnded",
+    "MissionWasWon",
+    "TargetStateWasChanged",
+    "HumanHasConnected",
+    "HumanHasDisconnected",
+    "HumanHasSelectedAirfield",
+    "HumanAircraftHasSpawned",
+    "HumanHasWentToBriefing",
+    "HumanHasToggledLandingLights",
+    "HumanHasToggledWingtipSmokes",
+    "HumanHasChangedSeat",
+    "HumanIsTryingToTakeSeat",
+    "HumanAircraftHasTookOff",
+    "HumanAircraftHasLanded",
+    "HumanAircraftHasCrashed",
+    "HumanHasDestroyedOwnAircraft",
+    "HumanHasDamagedOwnAircraft",
+    "HumanAircraftWasDamagedOnGround",
+    "HumanAircraftWasDamagedByHumanAircraft",
+    "HumanAircraftWasDamagedByStationaryUnit",
+    "HumanAircraftWasDamagedByMovingUnitMember",
+    "HumanAircraftWasDamagedByMovingUnit",
+    "HumanAircraftWasDamagedByAIAircraft",
+    "HumanAircraftWasShotDownByHumanAircraft",
+    "HumanAircraftWasShotDownByStationaryUnit",
+    "HumanAircraftWasShotDownByMovingUnitMember",
+    "HumanAircraftWasShotDownByMovingUnit",
+    "HumanAircraftWasShotDownByAIAircraft",
+    "HumanAircraftWasShotDownByHumanAircraftAndHumanAircraft",
+    "HumanAircraftWasShotDownByHumanAircraftAndAIAircraft",
+    "HumanAircraftWasShotDownByAIAircraftAndHumanAircraft",
+    "HumanAircraftWasShotDownByAIAircraftAndAIAircraft",
+    "HumanAircraftCrewMemberHasBailedOut",
+    "HumanAircraftCrewMemberHasLanded",
+    "HumanAircraftCrewMemberWasCaptured",
+    "HumanAircraftCrewMemberWasWounded",
+    "HumanAircraftCrewMemberWasHeavilyWounded",
+    "HumanAircraftCrewMemberWasKilled",
+    "HumanAircraftCrewMemberWasKilledByHumanAircraft",
+    "HumanAircraftCrewMemberWasKilledByStationaryUnit",
+    "HumanAircraftCrewMemberWasKilledByMovingUnitMember",
+    "HumanAircraftCrewMemberWasKilledByMovingUnit",
+    "HumanAircraftCrewMemberWasKilledByAIAircraft",
+    "HumanAircraftCrewMemberWasKilledInParachuteByStationaryUnit",
+    "HumanAircraftCrewMemberWasKilledInParachuteByMovingUnitMember",
+    "HumanAircraftCrewMemberWasKilledInParachuteByMovingUnit",
+    "HumanAircraftCrewMemberWasKilledInParachuteByHumanAircraft",
+    "HumanAircraftCrewMemberWasKilledInParachuteByAIAircraft",
+    "HumanAircraftCrewMemberParachuteWasDestroyedByStationaryUnit",
+    "HumanAircraftCrewMemberParachuteWasDestroyedByMovingUnitMember",
+    "HumanAircraftCrewMemberParachuteWasDestroyedByMovingUnit",
+    "HumanAircraftCrewMemberParachuteWasDestroyedByHumanAircraft",
+    "HumanAircraftCrewMemberParachuteWasDestroyedByAIAircraft",
+    "BuildingWasDestroyedByHumanAircraft",
+    "BuildingWasDestroyedByStationaryUnit",
+    "BuildingWasDestroyedByMovingUnitMember",
+    "BuildingWasDestroyedByMovingUnit",
+    "BuildingWasDestroyedByAIAircraft",
+    "TreeWasDestroyedByHumanAircraft",
+    "TreeWasDestroyedByStationaryUnit",
+    "TreeWasDestroyedByAIAircraft",
+    "TreeWasDestroyedByMovingUnitMember",
+    "TreeWasDestroyedByMovingUnit",
+    "TreeWasDestroyed",
+    "StationaryUnitWasDestroyed",
+    "StationaryUnitWasDestroyedByStationaryUnit",
+    "StationaryUnitWasDestroyedByMovingUnit",
+    "StationaryUnitWasDestroyedByMovingUnitMember",
+    "StationaryUnitWasDestroyedByHumanAircraft",
+    "StationaryUnitWasDestroyedByAIAircraft",
+    "BridgeWasDestroyedByHumanAircraft",
+    "BridgeWasDestroyedByStationaryUnit",
+    "BridgeWasDestroyedByMovingUnitMember",
+    "BridgeWasDestroyedByMovingUnit",
+    "BridgeWasDestroyedByAIAircraft",
+    "MovingUnitWasDestroyedByMovingUnit",
+    "MovingUnitWasDestroyedByMovingUnitMember",
+    "MovingUnitWasDestroyedByStationaryUnit",
+    "MovingUnitWasDestroyedByHumanAircraft",
+    "MovingUnitWasDestroyedByAIAircraft",
+    "MovingUnitMemberWasDestroyedByStationaryUnit",
+    "MovingUnitMemberWasDestroyedByAIAircraft",
+    "MovingUnitMemberWasDestroyedByHumanAircraft",
+    "MovingUnitMemberWasDestroyedByMovingUnit",
+    "MovingUnitMemberWasDestroyedByMovingUnitMember",
+    "AIAircraftHasDespawned",
+    "AIAircraftWasDamagedOnGround",
+    "AIAircraftWasDamagedByHumanAircraft",
+    "AIAircraftWasDamagedByStationaryUnit",
+    "AIAircraftWasDamagedByMovingUnitMember",
+    "AIAircraftWasDamagedByMovingUnit",
+    "AIAircraftWasDamagedByAIAircraft",
+    "AIHasDamagedOwnAircraft",
+    "AIHasDestroyedOwnAircraft",
+    "AIAircraftHasLanded",
+    "AIAircraftHasCrashed",
+    "AIAircraftWasShotDownByHumanAircraft",
+    "AIAircraftWasShotDownByAIAircraft",
+    "AIAircraftWasShotDownByStationaryUnit",
+    "AIAircraftWasShotDownByMovingUnitMember",
+    "AIAircraftWasShotDownByMovingUnit",
+    "AIAircraftWasShotDownByAIAircraftAndAIAircraft",
+    "AIAircraftWasShotDownByHumanAircraftAndAIAircraft",
+    "AIAircraftWasShotDownByAIAircraftAndHumanAircraft",
+    "AIAircraftWasShotDownByHumanAircraftAndHumanAircraft",
+    "AIAircraftCrewMemberWasKilled",
+    "AIAircraftCrewMemberWasKilledByStationaryUnit",
+    "AIAircraftCrewMemberWasKilledByHumanAircraft",
+    "AIAircraftCrewMemberWasKilledByAIAircraft",
+    "AIAircraftCrewMemberWasKilledByMovingUnitMember",
+    "AIAircraftCrewMemberWasKilledByMovingUnit",
+    "AIAircraftCrewMemberWasKilledInParachuteByAIAircraft",
+    "AIAircraftCrewMemberWasKilledInParachuteByStationaryUnit",
+    "AIAircraftCrewMemberWasKilledInParachuteByMovingUnitMember",
+    "AIAircraftCrewMemberWasKilledInParachuteByMovingUnit",
+    "AIAircraftCrewMemberWasKilledInParachuteByHumanAircraft",
+    "AIAircraftCrewMemberParachuteWasDestroyedByAIAircraft",
+    "AIAircraftCrewMemberParachuteWasDestroyedByStationaryUnit",
+    "AIAircraftCrewMemberParachuteWasDestroyedByMovingUnitMember",
+    "AIAircraftCrewMemberParachuteWasDestroyedByMovingUnit",
+    "AIAircraftCrewMemberParachuteWasDestroyedByHumanAircraft",
+    "AIAircraftCrewMemberParachuteWasDestroyed",
+    "AIAircraftCrewMemberWasWounded",
+    "AIAircraftCrewMemberWasHeavilyWounded",
+    "AIAircraftCrewMemberWasCaptured",
+    "AIAircraftCrewMemberHasBailedOut",
+    "AIAircraftCrewMemberHasLanded",
+)
+
+GROUND_OBJECTS = ("Building", "Tree", "StationaryUnit", "Bridge", "MovingUnit")
+CREW_CASUALTIES = ("WasKilled", "Wounded", "Captured", "ParachuteWasDestroyed")
+KILLS = ("ShotDown", "DestroyedOwnAircraft", "WasKilled")
+
+
+def _get_categories(name):
+    categories = NONE
+
+    if "Damaged" in name:
+        categories |= DAMAGE
+
+    if any(x in name for x in KILLS):
+        categories |= KILL
+
+    if "CrewMember" in name and any(x in name for x in CREW_CASUALTIES):
+        categories |= CREW_CASUALTY
+
+    if name.startswith(GROUND_OBJECTS) and "WasDestroyed" in name:
+        categories |= GROUND_DESTRUCTION
+
+    if name in ("HumanHasConnected", "HumanHasDisconnected"):
+        categories |= CONNECTION
+
+    if name.startswith("Mission"):
+        categories |= MISSION_LIFECYCLE
+
+    if "Human" in name:
+        categories |= HUMAN_INVOLVED
+
+    if "AI" in name:
+        categories |= AI_INVOLVED
+
+    return categories
+
+
+#: Mapping of event classes to their type codes.
+TYPE_CODES = {}
+
+#: Mapping of type codes to event classes.
+EVENT_CLASSES = {}
+
+#: Mapping of event classes to bitmasks of their categories.
+CATEGORIES = {}
+
+for _code, _name in enumerate(EVENT_TYPE_NAMES, 1):
+    if _name is None:
+        continue
+
+    _event = getattr(_events, _name)
+    TYPE_CODES[_event] = _code
+    EVENT_CLASSES[_code] = _event
+    CATEGORIES[_event] = _get_categories(_name)
+
+
+def _resolve(event):
+    event_class = event if isinstance(event, type) else event.__class__
+
+    if event_class in TYPE_CODES:
+        return event_class
+
+    # Subclasses of events, e.g. lazy events, are resolved to the nearest
+    # known event class.
+    for base in event_class.__mro__:
+        if base in TYPE_CODES:
+            return base
+
+    raise ValueError(
+        "Event {0} is not known to taxonomy".format(event_class.__name__)
+    )
+
+
+def get_event_type_code(event):
+    """
+    Get type code of an event or an event class.
+
+    """
+    try:
+        return TYPE_CODES[event.__class__]
+    except KeyError:
+        return TYPE_CODES[_resolve(event)]
+
+
+def get_event_class(type_code):
+    """
+    Get event class by its type code.
+
+    """
+    try:
+        return EVENT_CLASSES[type_code]
+    except KeyError:
+        raise ValueError("Unknown type code of event: {0}".format(type_code))
+
+
+def get_event_categories(event):
+    """
+    Get bitmask of categories of an event or an event class.
+
+    """
+    try:
+        return CATEGORIES[event.__class__]
+    except KeyError:
+        return CATEGORIES[_resolve(event)]
+
+
+def get_events_by_categories(categories):
+    """
+    Get classes of events which belong to any of given categories.
+
+    Classes are ordered by their type codes.
+
+    """
+    return [
+        EVENT_CLASSES[code]
+        for code in sorted(EVENT_CLASSES)
+        if CATEGORIES[EVENT_CLASSES[code]] & categories
+    ]
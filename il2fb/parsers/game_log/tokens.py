@@ -0,0 +1,59 @@
+# coding: utf-8
+"""
+Tokens of events.
+
+Tokens identify things events refer to: callsigns of humans, types of
+aircraft flown by humans and codes of flights of AI aircraft. Tokens are
+strings prefixed with their kinds, e.g. ``callsign:User0``, so that equal
+values of different kinds do not collide.
+
+"""
+
+from il2fb.commons import actors
+
+
+CALLSIGN = 'callsign'
+AIRCRAFT = 'aircraft'
+FLIGHT = 'flight'
+
+#: Fields of events which contain actors.
+ACTOR_FIELDS = ('actor', 'attacker', 'assistant', 'seat', )
+
+
+def make_token(kind, value):
+    return "{0}:{1}".format(kind, value)
+
+
+def get_actor_tokens(actor):
+    """
+    Get a list of tokens of a given actor.
+
+    """
+    if isinstance(actor, actors.Human):
+        tokens = [make_token(CALLSIGN, actor.callsign), ]
+
+        if isinstance(actor, actors.HumanAircraft):
+            tokens.append(make_token(AIRCRAFT, actor.aircraft))
+
+        return tokens
+
+    if isinstance(actor, actors.AIAircraft):
+        return [make_token(FLIGHT, actor.flight), ]
+
+    return []
+
+
+def get_event_tokens(event):
+    """
+    Get a set of tokens of all actors of a given event.
+
+    """
+    tokens = set()
+
+    for name in ACTOR_FIELDS:
+        actor = getattr(event, name, None)
+
+        if actor is not None:
+            tokens.update(get_actor_tokens(actor))
+
+    return tokens
@@ -7,26 +7,97 @@ Data transformers.
 import datetime
 
 from il2fb.commons import actors
+from il2fb.commons.organization import Belligerent
+from il2fb.commons.transformers import (
+    get_2d_pos_transformer as _get_2d_pos_transformer,
+    get_belligerent_transformer as _get_belligerent_transformer,
+    get_int_transformer as _get_int_transformer,
+)
+from six.moves import copyreg
 
 from .constants import LOG_TIME_FORMAT, LOG_DATE_FORMAT
 
 
+def produces(field_name):
+    """
+    Mark a transformer as the one which produces a given field of event.
+
+    """
+    def decorator(transformer):
+        transformer.field_name = field_name
+        return transformer
+
+    return decorator
+
+
+def get_transformer_field(transformer):
+    """
+    Get name of event's field produced by a given transformer or ``None`` if
+    it is unknown.
+
+    """
+    return getattr(transformer, 'field_name', None)
+
+
+@produces('time')
 def transform_time(data):
     value = data['time']
     data['time'] = datetime.datetime.strptime(value, LOG_TIME_FORMAT).time()
 
 
+@produces('date')
 def transform_date(data):
     value = data['date']
     data['date'] = datetime.datetime.strptime(value, LOG_DATE_FORMAT).date()
 
 
+def get_2d_pos_transformer(
+    dst_field_name='pos',
+    src_x_field_name='pos_x',
+    src_y_field_name='pos_y',
+):
+    transformer = _get_2d_pos_transformer(
+        dst_field_name, src_x_field_name, src_y_field_name,
+    )
+    return produces(dst_field_name)(transformer)
+
+
+transform_2d_pos = get_2d_pos_transformer('pos', 'pos_x', 'pos_y')
+
+
+def get_belligerent_transformer(
+    dst_field_name='belligerent',
+    src_field_name=None,
+):
+    transformer = _get_belligerent_transformer(dst_field_name, src_field_name)
+    return produces(dst_field_name)(transformer)
+
+
+transform_belligerent = get_belligerent_transformer('belligerent')
+
+
+def _reduce_constant(constant):
+    return getattr, (constant.container, constant.name)
+
+
+# Belligerents carry lazy translations which cannot be pickled, so they are
+# pickled by references to their containers, e.g. when events are passed
+# between processes.
+copyreg.pickle(Belligerent, _reduce_constant)
+
+
+def get_int_transformer(dst_field_name, src_field_name=None):
+    transformer = _get_int_transformer(dst_field_name, src_field_name)
+    return produces(dst_field_name)(transformer)
+
+
 def get_human_transformer(dst_field_name, src_field_prefix=None):
     if not src_field_prefix:
         src_field_prefix = dst_field_name
 
     callsign_field_name = '{0}_callsign'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.Human(
             data.pop(callsign_field_name),
@@ -45,6 +116,7 @@ def get_human_aircraft_transformer(dst_field_name, src_field_prefix=None):
     callsign_field_name = '{0}_callsign'.format(src_field_prefix)
     aircraft_field_name = '{0}_aircraft'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.HumanAircraft(
             data.pop(callsign_field_name),
@@ -67,6 +139,7 @@ def get_human_aircraft_crew_member_transformer(dst_field_name, src_field_prefix=
     aircraft_field_name = '{0}_aircraft'.format(src_field_prefix)
     index_field_name = '{0}_index'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.HumanAircraftCrewMember(
             data.pop(callsign_field_name),
@@ -87,6 +160,7 @@ def get_ai_aircraft_transformer(dst_field_name, src_field_prefix=None):
     flight_field_name = '{0}_flight'.format(src_field_prefix)
     aircraft_field_name = '{0}_aircraft'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.AIAircraft(
             data.pop(flight_field_name),
@@ -109,6 +183,7 @@ def get_ai_aircraft_crew_member_transformer(dst_field_name, src_field_prefix=Non
     aircraft_field_name = '{0}_aircraft'.format(src_field_prefix)
     index_field_name = '{0}_index'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.AIAircraftCrewMember(
             data.pop(flight_field_name),
@@ -129,6 +204,7 @@ def get_stationary_unit_transformer(dst_field_name, src_field_prefix=None):
 
     stationary_unit_field_name = '{0}_stationary_unit'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.StationaryUnit(
             data.pop(stationary_unit_field_name),
@@ -147,6 +223,7 @@ def get_moving_unit_transformer(dst_field_name, src_field_prefix=None):
 
     moving_unit_field_name = '{0}_moving_unit'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.MovingUnit(
             data.pop(moving_unit_field_name),
@@ -166,6 +243,7 @@ def get_moving_unit_member_transformer(dst_field_name, src_field_prefix=None):
     moving_unit_field_name = '{0}_moving_unit'.format(src_field_prefix)
     index_field_name = '{0}_index'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.MovingUnitMember(
             data.pop(moving_unit_field_name),
@@ -185,6 +263,7 @@ def get_building_transformer(dst_field_name, src_field_prefix=None):
 
     building_field_name = '{0}_building'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.Building(
             data.pop(building_field_name),
@@ -202,6 +281,7 @@ def get_bridge_transformer(dst_field_name, src_field_prefix=None):
 
     bridge_field_name = '{0}_bridge'.format(src_field_prefix)
 
+    @produces(dst_field_name)
     def transformer(data):
         data[dst_field_name] = actors.Bridge(
             data.pop(bridge_field_name),
@@ -0,0 +1,26 @@
+# coding: utf-8
+
+import contextlib
+import os
+import tempfile
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='wb'):
+    """
+    Open a temporary file next to a given path for writing. File is moved
+    to the path if writing succeeds and is removed otherwise, so readers
+    never see partially written files.
+
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp",
+    )
+
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        getattr(os, 'replace', os.rename)(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
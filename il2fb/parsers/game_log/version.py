@@ -0,0 +1,3 @@
+# coding: utf-8
+
+VERSION = "1.0.3"
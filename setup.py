@@ -1,6 +1,7 @@
 # coding: utf-8
 
 import os
+import re
 
 from setuptools import setup
 
@@ -31,9 +32,13 @@ with open(os.path.join(__here__, 'requirements', 'dist.txt')) as f:
 README = open(os.path.join(__here__, 'README.rst')).read()
 
 
+with open(os.path.join(__here__, 'il2fb', 'parsers', 'game_log', 'version.py')) as f:
+    VERSION = re.search(r'VERSION = "(.+)"', f.read()).group(1)
+
+
 setup(
     name='il2fb-game-log-parser',
-    version='1.0.3',
+    version=VERSION,
     description=(
         "Parse events from game log produced by dedicated server of "
         "«IL-2 Forgotten Battles» flight simulator"
@@ -55,6 +60,11 @@ setup(
         'il2fb.parsers',
     ],
     include_package_data=True,
+    entry_points={
+        'console_scripts': [
+            'il2fb-parse-log = il2fb.parsers.game_log.cli:main',
+        ],
+    },
     install_requires=REQUIREMENTS,
     dependency_links=DEPENDENCIES,
     classifiers=[
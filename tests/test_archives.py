@@ -0,0 +1,124 @@
+# coding: utf-8
+
+import io
+import unittest
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.archives import (
+    ArchiveWriter, ArchiveReader, ArchiveFormatError, HEADER,
+)
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+
+
+LINES = [
+    "[Sep 15, 2013 8:33:05 PM] Mission: path/PH.mis is Playing",
+    "[8:33:05 PM] Mission BEGIN",
+    "[8:33:05 PM] Target 3 Complete",
+    "[8:33:06 PM] User0 has connected",
+    "[8:33:06 PM] User0 selected army Red at 100.0 200.99",
+    "[8:33:07 PM] User0:Pe-8 loaded weapons '40fab100' fuel 40%",
+    "[8:33:08 PM] User0:Pe-8(0) seat occupied by User0 at 100.0 200.99",
+    "[8:33:09 PM] User0:Pe-8 damaged by User1:Bf-109G-6_Late at 1.5 2.0",
+    "[8:33:10 PM] User0:Pe-8 shot down by r01000 and r01001 at 100.0 200.99",
+    "[8:33:11 PM] User0:Pe-8(0) was killed by 0_Chief0 at 100.0 200.99",
+    "[8:33:12 PM] 0_Static destroyed by 0_Chief at 100.0 200.99",
+    "[8:33:13 PM]  Bridge0 destroyed by User0:Pe-8 at 100.0 200.99",
+    "[8:33:14 PM] 3do/Buildings/Finland/CenterHouse1_w/live.sim destroyed "
+    "by User0:Pe-8 at 100.0 200.99",
+    "[Sep 15, 2013 8:33:15 PM] Mission: RED WON",
+]
+
+
+class ArchivesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(ArchivesTestCase, self).setUp()
+        self.events = list(GameLogEventParser().parse_lines(LINES))
+
+    def write(self, events, close=True):
+        stream = io.BytesIO()
+        writer = ArchiveWriter(stream)
+        writer.write_many(events)
+
+        if close:
+            writer.close()
+
+        stream.seek(0)
+        return stream
+
+    def test_iteration(self):
+        stream = self.write(self.events)
+        self.assertEqual(list(ArchiveReader(stream)), self.events)
+
+    def test_iteration_of_legacy_streams(self):
+        data = self.write(self.events).getvalue()
+
+        class Stream(object):
+            # Like file objects of Python 2, which have no "seekable()".
+
+            def __init__(self, seekable):
+                self._stream = io.BytesIO(data)
+                self._seekable = seekable
+
+            def read(self, size=-1):
+                return self._stream.read(size)
+
+            def seek(self, offset, whence=0):
+                if not self._seekable:
+                    raise IOError("Illegal seek")
+                return self._stream.seek(offset, whence)
+
+        for seekable in [True, False]:
+            reader = ArchiveReader(Stream(seekable))
+            self.assertEqual(list(reader), self.events)
+
+    def test_random_access(self):
+        reader = ArchiveReader(self.write(self.events))
+
+        self.assertEqual(reader.count(), len(self.events))
+        self.assertEqual(reader.get(7), self.events[7])
+        self.assertEqual(reader.get(0), self.events[0])
+        self.assertEqual(reader.get(-1), self.events[-1])
+
+        with self.assertRaises(IndexError):
+            reader.get(len(self.events))
+
+    def test_unfinished_archive(self):
+        reader = ArchiveReader(self.write(self.events, close=False))
+        self.assertEqual(list(reader), self.events)
+
+        with self.assertRaises(ArchiveFormatError):
+            reader.count()
+
+    def test_strings_are_stored_once(self):
+        event = self.events[8]
+        data = self.write([event, event]).getvalue()
+
+        # Once in a record of string and once in table of footer.
+        self.assertEqual(data.count(b"User0"), 2)
+        self.assertEqual(data.count(b"r0100"), 2)
+
+    def test_projected_and_lazy_events(self):
+        parser = GameLogEventParser(fields=['actor'], lazy=True)
+        lazy_events = list(parser.parse_lines(LINES))
+        restored = list(ArchiveReader(self.write(lazy_events)))
+
+        self.assertEqual(restored[3].actor.callsign, "User0")
+        self.assertIsNone(restored[3].time)
+        self.assertIsInstance(restored[3], events.HumanHasConnected)
+
+    def test_context_manager(self):
+        stream = io.BytesIO()
+
+        with ArchiveWriter(stream) as writer:
+            writer.write(self.events[0])
+
+        stream.seek(0)
+        self.assertEqual(ArchiveReader(stream).count(), 1)
+
+    def test_invalid_stream(self):
+        with self.assertRaises(ArchiveFormatError):
+            ArchiveReader(io.BytesIO(b"not an archive"))
+
+        with self.assertRaises(ArchiveFormatError):
+            ArchiveReader(io.BytesIO(HEADER.pack(b"IL2FBEVA", 99)))
@@ -0,0 +1,154 @@
+# coding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from il2fb.parsers.game_log import taxonomy
+from il2fb.parsers.game_log.batches import (
+    MISSING_POSITION, EventBatch, ParseLinesToBatch, attach_batch,
+    discard_batch, shared_memory, write_batch,
+)
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+from il2fb.parsers.game_log.pipelines import PROCESS, make_pipeline
+from il2fb.parsers.game_log.pools import get_fork_context
+
+from .test_archives import LINES
+
+
+SHARED_MEMORY_DIRECTORY = "/dev/shm"
+
+
+@unittest.skipIf(
+    shared_memory is None or os.name == 'nt',
+    "shared memory batches are not available",
+)
+class EventBatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(EventBatchTestCase, self).setUp()
+        self.events = list(GameLogEventParser().parse_lines(LINES))
+
+    def test_columns(self):
+        with EventBatch(write_batch(self.events)) as batch:
+            self.assertEqual(len(batch), len(self.events))
+            self.assertEqual(
+                list(batch.type_codes),
+                [taxonomy.get_event_type_code(x) for x in self.events],
+            )
+
+            # "[Sep 15, 2013 8:33:05 PM] Mission: ... is Playing"
+            self.assertEqual(batch.times[0], 20 * 3600 + 33 * 60 + 5)
+            self.assertEqual(batch.pos_x[0], MISSING_POSITION)
+            self.assertIsNone(batch.get_actor_id(0))
+
+            # "User1:Bf-109G-6_Late ... at 1.5 2.0"
+            self.assertEqual((batch.pos_x[7], batch.pos_y[7]), (150, 200))
+            self.assertEqual(
+                batch.get_actor_id(7), self.events[7].actor.callsign,
+            )
+
+    def test_events(self):
+        with EventBatch(write_batch(self.events)) as batch:
+            self.assertEqual(list(batch), self.events)
+            self.assertEqual(batch[7], self.events[7])
+            self.assertEqual(batch[-1], self.events[-1])
+
+            with self.assertRaises(IndexError):
+                batch[len(self.events)]
+
+    def test_empty_batch(self):
+        with EventBatch(write_batch([])) as batch:
+            self.assertEqual(len(batch), 0)
+            self.assertEqual(list(batch), [])
+            self.assertEqual(batch.strings, [])
+
+    def test_block_is_unlinked(self):
+        name = write_batch(self.events)
+        batch = EventBatch(name)
+        batch.close()
+        batch.close()
+
+        with self.assertRaises(OSError):
+            EventBatch(name)
+
+    def test_discard_batch(self):
+        name = write_batch(self.events)
+        discard_batch(name)
+
+        with self.assertRaises(OSError):
+            EventBatch(name)
+
+    def test_stages(self):
+        names = ParseLinesToBatch(ignore_errors=True)(LINES + ["foo bar", ])
+        self.assertEqual(len(names), 1)
+
+        batches = attach_batch(names[0])
+        self.assertEqual(list(batches[0]), self.events)
+        batches[0].close()
+
+    def test_windows(self):
+        with mock.patch.object(os, 'name', 'nt'):
+            with self.assertRaises(RuntimeError):
+                write_batch(self.events)
+
+            with self.assertRaises(RuntimeError):
+                make_pipeline(parse_mode=PROCESS, shared_memory=True)
+
+    def _make_log(self, count):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        path = os.path.join(directory, "eventlog.lst")
+        with open(path, 'w') as f:
+            f.write("\n".join(LINES * count) + "\n")
+
+        return path
+
+    @unittest.skipIf(
+        get_fork_context() is None, "'fork' start method is not supported",
+    )
+    def test_pipeline(self):
+        path = self._make_log(3)
+        pipeline = make_pipeline(
+            parse_mode=PROCESS, processes=2, shared_memory=True,
+            buffer_size=512,
+        )
+        results = []
+
+        for batch in pipeline.process([path, ]):
+            self.assertIsInstance(batch, EventBatch)
+            results.extend(batch)
+            batch.close()
+
+        self.assertEqual(results, self.events * 3)
+        self.assertEqual(
+            [x.name for x in pipeline.metrics],
+            ["read", "split", "parse", "attach"],
+        )
+
+    @unittest.skipIf(
+        get_fork_context() is None, "'fork' start method is not supported",
+    )
+    @unittest.skipUnless(
+        os.path.isdir(SHARED_MEMORY_DIRECTORY),
+        "blocks of shared memory are not visible in file system",
+    )
+    def test_pipeline_stopped_early(self):
+        path = self._make_log(50)
+        before = set(os.listdir(SHARED_MEMORY_DIRECTORY))
+
+        pipeline = make_pipeline(
+            parse_mode=PROCESS, processes=2, shared_memory=True,
+            buffer_size=512,
+        )
+        results = pipeline.process([path, ])
+        batch = next(results)
+        batch.close()
+        results.close()
+
+        after = set(os.listdir(SHARED_MEMORY_DIRECTORY))
+        self.assertEqual(after - before, set())
@@ -0,0 +1,154 @@
+# coding: utf-8
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from il2fb.parsers.game_log import bloom
+from il2fb.parsers.game_log.bloom import (
+    BloomFilter, build_chunk_filters, load_chunk_filters, get_chunk_filters,
+    get_sidecar_path, find_chunks,
+)
+
+from .test_archives import LINES
+
+
+class BloomFilterTestCase(unittest.TestCase):
+
+    def test_membership(self):
+        values = ["callsign:User{0}".format(i) for i in range(1000)]
+        bloom = BloomFilter.for_capacity(len(values), error_rate=0.01)
+
+        for value in values:
+            bloom.add(value)
+
+        for value in values:
+            self.assertIn(value, bloom)
+
+        false_positives = sum(
+            "callsign:Other{0}".format(i) in bloom
+            for i in range(10000)
+        )
+        self.assertLess(false_positives, 300)
+
+    def test_empty_filter(self):
+        bloom = BloomFilter.for_capacity(0)
+        self.assertNotIn("callsign:User0", bloom)
+
+
+class ChunkFiltersTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(ChunkFiltersTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "eventlog.lst")
+
+        with open(self.path, 'wb') as f:
+            f.write("\n".join(LINES).encode('latin-1'))
+
+        self.chunk_size = sum(len(x) + 1 for x in LINES[:8])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(ChunkFiltersTestCase, self).tearDown()
+
+    def test_build_chunk_filters(self):
+        chunk_filters = build_chunk_filters(
+            self.path, chunk_size=self.chunk_size,
+        )
+        size = os.path.getsize(self.path)
+
+        self.assertEqual(
+            [(x.start, x.end) for x in chunk_filters],
+            [(0, self.chunk_size), (self.chunk_size, size)],
+        )
+        self.assertIn("aircraft:Bf-109G-6_Late", chunk_filters[0].filter)
+        self.assertIn("flight:r0100", chunk_filters[1].filter)
+        self.assertIn("callsign:User0", chunk_filters[1].filter)
+
+    def test_find_chunks(self):
+        self.assertEqual(
+            find_chunks(
+                self.path, "flight:r0100", chunk_size=self.chunk_size,
+            ),
+            [(self.chunk_size, os.path.getsize(self.path)), ],
+        )
+        self.assertTrue(os.path.exists(get_sidecar_path(self.path)))
+
+        with mock.patch.object(bloom, 'build_chunk_filters') as build:
+            self.assertEqual(
+                len(find_chunks(
+                    self.path, "callsign:User0", chunk_size=self.chunk_size,
+                )),
+                2,
+            )
+            self.assertEqual(
+                find_chunks(
+                    self.path, "callsign:User9", chunk_size=self.chunk_size,
+                ),
+                [],
+            )
+            self.assertFalse(build.called)
+
+    def test_changed_options(self):
+        get_chunk_filters(self.path, chunk_size=self.chunk_size)
+        self.assertIsNotNone(
+            load_chunk_filters(self.path, chunk_size=self.chunk_size)
+        )
+        self.assertIsNone(load_chunk_filters(self.path))
+        self.assertIsNone(load_chunk_filters(
+            self.path, chunk_size=self.chunk_size, error_rate=0.01,
+        ))
+        self.assertEqual(len(get_chunk_filters(self.path)), 1)
+
+    def test_log_grows_while_building(self):
+        build = bloom.build_chunk_filters
+
+        def build_and_append(*args, **kwargs):
+            results = build(*args, **kwargs)
+
+            with open(self.path, 'ab') as f:
+                f.write(b"\n[8:33:16 PM] User9 has connected\n")
+
+            return results
+
+        with mock.patch.object(bloom, 'build_chunk_filters') as mocked:
+            mocked.side_effect = build_and_append
+            get_chunk_filters(self.path)
+
+        self.assertIsNone(load_chunk_filters(self.path))
+        self.assertEqual(len(find_chunks(self.path, "callsign:User9")), 1)
+
+    def test_compressed_log(self):
+        path = self.path + ".gz"
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        with gzip.open(path, 'wb') as f:
+            f.write(data)
+
+        self.assertEqual(
+            find_chunks(path, "flight:r0100", chunk_size=self.chunk_size),
+            [(self.chunk_size, len(data)), ],
+        )
+
+    def test_stale_sidecar(self):
+        get_chunk_filters(self.path)
+        self.assertIsNotNone(load_chunk_filters(self.path))
+
+        with open(self.path, 'ab') as f:
+            f.write(b"\n[8:33:16 PM] User9 has connected\n")
+
+        self.assertIsNone(load_chunk_filters(self.path))
+        self.assertEqual(len(find_chunks(self.path, "callsign:User9")), 1)
+
+    def test_broken_sidecar(self):
+        with open(get_sidecar_path(self.path), 'wb') as f:
+            f.write(b"IL2FB")
+
+        self.assertIsNone(load_chunk_filters(self.path))
@@ -0,0 +1,138 @@
+# coding: utf-8
+
+import asyncio
+import unittest
+
+import mock
+
+from il2fb.parsers.game_log import events, taxonomy
+from il2fb.parsers.game_log.bus import EventBus
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+
+
+CONNECTED = "[8:33:05 PM] User0 has connected"
+DISCONNECTED = "[8:33:05 PM] User1 has disconnected"
+LANDED = "[8:33:05 PM] User0:Pe-8 landed at 100.0 200.99"
+
+
+class EventBusTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(EventBusTestCase, self).setUp()
+        self.bus = EventBus()
+        self.parser = GameLogEventParser()
+        self.connected = self.parser.parse(CONNECTED)
+        self.disconnected = self.parser.parse(DISCONNECTED)
+        self.landed = self.parser.parse(LANDED)
+
+    def test_subscribe_by_events(self):
+        subscriber = mock.Mock()
+        self.bus.subscribe(subscriber, events.HumanHasConnected)
+
+        self.bus.publish_many([
+            self.connected, self.disconnected, self.landed,
+        ])
+
+        self.assertEqual(
+            subscriber.call_args_list, [mock.call(self.connected), ],
+        )
+
+    def test_subscribe_by_categories(self):
+        subscriber = mock.Mock()
+        self.bus.subscribe(subscriber, categories=taxonomy.CONNECTION)
+
+        self.bus.publish_many([
+            self.connected, self.disconnected, self.landed,
+        ])
+
+        self.assertEqual(
+            subscriber.call_args_list,
+            [mock.call(self.connected), mock.call(self.disconnected), ],
+        )
+
+    def test_subscribe_to_all_events(self):
+        subscriber = mock.Mock()
+        self.bus.subscribe(subscriber)
+
+        self.bus.publish_many([
+            self.connected, self.disconnected, self.landed,
+        ])
+
+        self.assertEqual(subscriber.call_count, 3)
+
+    def test_predicate(self):
+        subscriber = mock.Mock()
+        predicate = mock.Mock(
+            side_effect=lambda event: event.actor.callsign == "User1"
+        )
+        self.bus.subscribe(
+            subscriber, categories=taxonomy.CONNECTION, predicate=predicate,
+        )
+
+        self.bus.publish_many([
+            self.connected, self.disconnected, self.landed,
+        ])
+
+        self.assertEqual(
+            subscriber.call_args_list, [mock.call(self.disconnected), ],
+        )
+        # Predicate is not called for events of other types.
+        self.assertEqual(predicate.call_count, 2)
+
+    def test_unsubscribe(self):
+        first, second = mock.Mock(), mock.Mock()
+        self.bus.subscribe(first, events.HumanHasConnected)
+        self.bus.subscribe(first, events.HumanAircraftHasLanded)
+        self.bus.subscribe(second, events.HumanHasConnected)
+
+        self.assertEqual(
+            self.bus.get_subscribers(events.HumanHasConnected),
+            [first, second],
+        )
+
+        self.bus.unsubscribe(first)
+        self.bus.publish_many([self.connected, self.landed])
+
+        self.assertFalse(first.called)
+        self.assertEqual(second.call_count, 1)
+        self.assertEqual(
+            self.bus.get_subscribers(events.HumanAircraftHasLanded), [],
+        )
+
+    def test_lazy_events(self):
+        subscriber = mock.Mock()
+        self.bus.subscribe(subscriber, events.HumanHasConnected)
+
+        event = GameLogEventParser(lazy=True).parse(CONNECTED)
+        self.bus.publish(event)
+
+        self.assertEqual(subscriber.call_args_list, [mock.call(event), ])
+
+    def test_async_subscribers(self):
+        received = []
+
+        async def subscriber(event):
+            await asyncio.sleep(0)
+            received.append(event)
+
+        plain = mock.Mock()
+        self.bus.subscribe(subscriber, categories=taxonomy.CONNECTION)
+        self.bus.subscribe(plain, events.HumanAircraftHasLanded)
+
+        async def main():
+            await self.bus.publish_async(self.connected)
+            self.assertEqual(received, [self.connected, ])
+
+            tasks = self.bus.publish_many([self.disconnected, self.landed])
+            self.assertEqual(len(tasks), 1)
+            self.assertEqual(plain.call_count, 1)
+
+            await asyncio.gather(*tasks)
+            self.assertEqual(received, [self.connected, self.disconnected])
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            loop.run_until_complete(main())
+        finally:
+            loop.close()
@@ -0,0 +1,206 @@
+# coding: utf-8
+
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import mock
+
+from il2fb.parsers.game_log import cli, events
+from il2fb.parsers.game_log.archives import ArchiveReader
+from il2fb.parsers.game_log.cli import main, make_argument_parser, run
+from il2fb.parsers.game_log.pools import get_fork_context
+
+from .test_archives import LINES
+
+
+class CommandLineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(CommandLineTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, "output")
+
+        with open(self.get_path("eventlog.lst"), 'w') as f:
+            f.write("\n".join(LINES + ["foo bar", ]) + "\n")
+
+        with gzip.open(self.get_path("eventlog.1.lst.gz"), 'wb') as f:
+            f.write("\n".join(LINES[:3]).encode('ascii'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(CommandLineTestCase, self).tearDown()
+
+    def get_path(self, name):
+        return os.path.join(self.directory, name)
+
+    def run_command(self, *argv):
+        stats = io.StringIO()
+        args = make_argument_parser().parse_args(list(argv))
+        count = run(args, stats_stream=stats)
+        return count, stats.getvalue()
+
+    def read_jsonl(self):
+        with open(self.output) as f:
+            return [json.loads(line) for line in f]
+
+    def test_jsonl(self):
+        count, stats = self.run_command(
+            self.get_path("*.lst*"), "-o", self.output,
+        )
+
+        self.assertEqual(count, len(LINES) + 3)
+        self.assertEqual(stats, "")
+
+        results = self.read_jsonl()
+        self.assertEqual(len(results), count)
+        # Files are sorted by names.
+        self.assertEqual(results[3]['name'], "MissionIsPlaying")
+
+    def test_types_and_moments(self):
+        count, stats = self.run_command(
+            self.get_path("eventlog.lst"), "-o", self.output,
+            "--types", "HumanHasConnected,HumanAircraftHasSpawned",
+            "--since", "2013-09-15 20:33:07",
+            "--stats",
+        )
+
+        self.assertEqual(count, 1)
+        self.assertEqual(
+            self.read_jsonl()[0]['name'], "HumanAircraftHasSpawned",
+        )
+        self.assertIn(
+            "{0}: {1} lines, {2} skipped lines, 1 events written"
+            .format(self.get_path("eventlog.lst"), len(LINES) + 1,
+                    len(LINES) - 1),
+            stats,
+        )
+        self.assertIn("parse", stats)
+
+        count, stats = self.run_command(
+            self.get_path("eventlog.lst"), "-o", self.output,
+            "--until", "2013-09-15 20:33:06", "--stats",
+        )
+
+        self.assertEqual(count, 5)
+        self.assertIn("total: {0} lines, 1 unknown lines".format(
+            len(LINES) + 1,
+        ), stats)
+
+    def test_csv(self):
+        self.run_command(
+            self.get_path("eventlog.lst"), "-o", self.output, "-f", "csv",
+        )
+
+        with open(self.output) as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(rows[0][:3], ["date", "time", "event"])
+        self.assertEqual(
+            rows[1][:3], ["2013-09-15", "20:33:05", "MissionIsPlaying"],
+        )
+        # "User1:Bf-109G-6_Late ... at 1.5 2.0"
+        self.assertEqual(rows[8][3:5], ["1.5", "2.0"])
+        self.assertEqual(json.loads(rows[8][5])['pos'], {'x': 1.5, 'y': 2.0})
+
+    def test_csv_stream_on_python_2(self):
+        args = make_argument_parser().parse_args([
+            self.get_path("eventlog.lst"), "-o", self.output, "-f", "csv",
+        ])
+
+        with mock.patch.object(cli.six, 'PY2', True):
+            with mock.patch.object(cli, '_CSVOutput'):
+                output, stream = cli._open_output(args)
+
+        try:
+            self.assertIn('b', stream.mode)
+        finally:
+            stream.close()
+
+    def test_types_have_dates(self):
+        count, stats = self.run_command(
+            self.get_path("eventlog.lst"), "-o", self.output, "-f", "csv",
+            "--types", "HumanHasConnected",
+        )
+        self.assertEqual(count, 1)
+
+        with open(self.output) as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(
+            rows[1][:3], ["2013-09-15", "20:33:06", "HumanHasConnected"],
+        )
+
+    def test_binary(self):
+        self.run_command(
+            self.get_path("eventlog.lst"), "-o", self.output, "-f", "binary",
+        )
+
+        with open(self.output, 'rb') as f:
+            results = list(ArchiveReader(f))
+
+        self.assertEqual(len(results), len(LINES))
+        self.assertIsInstance(results[0], events.MissionIsPlaying)
+
+    def test_sqlite(self):
+        self.run_command(
+            self.get_path("eventlog.lst"), "-o", self.output, "-f", "sqlite",
+        )
+
+        connection = sqlite3.connect(self.output)
+        try:
+            count = connection.execute("SELECT COUNT(*) FROM events")
+            self.assertEqual(count.fetchone()[0], len(LINES))
+        finally:
+            connection.close()
+
+    @unittest.skipIf(
+        get_fork_context() is None, "'fork' start method is not supported",
+    )
+    def test_jobs(self):
+        count, stats = self.run_command(
+            self.get_path("*.lst*"), "-o", self.output, "--jobs", "2",
+        )
+
+        self.assertEqual(count, len(LINES) + 3)
+        self.assertEqual(len(self.read_jsonl()), count)
+
+    def test_profile(self):
+        profile_output = self.get_path("profile.txt")
+        count, stats = self.run_command(
+            self.get_path("eventlog.lst"), "-o", self.output,
+            "--profile", "deterministic", "--profile-output", profile_output,
+        )
+
+        self.assertEqual(count, len(LINES))
+        self.assertIn("match:MissionIsPlaying", stats)
+
+        with open(profile_output) as f:
+            self.assertIn("parse;construct;MissionIsPlaying ", f.read())
+
+    def test_main(self):
+        path = self.get_path("eventlog.lst")
+
+        with mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(main([path, "-o", self.output]), 0)
+            self.assertEqual(
+                main([path, "-o", self.output, "--strict"]), 1,
+            )
+            self.assertIn("foo bar", stderr.getvalue())
+
+            for argv in [
+                [path, "-f", "sqlite"],
+                [path, "--jobs", "0"],
+                [path, "--jobs", "2", "--profile", "sampling"],
+                [path, "--types", "Foo"],
+                [path, "--since", "yesterday"],
+                [self.get_path("missing.lst"), ],
+            ]:
+                with self.assertRaises(SystemExit):
+                    main(argv)
@@ -8,6 +8,7 @@ from il2fb.commons.organization import Belligerents
 from il2fb.commons.spatial import Point2D
 
 from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.transformers import get_transformer_field
 
 
 class MissionIsPlayingTestCase(unittest.TestCase):
@@ -5159,3 +5160,14 @@ class AIAircraftCrewMemberHasLandedTestCase(unittest.TestCase):
                 'verbose_name': "AI aircraft crew member has landed",
             }
         )
+
+
+class TransformerFieldsTestCase(unittest.TestCase):
+
+    def test_transformers_declare_fields(self):
+        for event in events.get_all_events():
+            for transformer in event.transformers:
+                self.assertIn(
+                    get_transformer_field(transformer),
+                    event.__slots__,
+                )
@@ -0,0 +1,116 @@
+# coding: utf-8
+
+import io
+import json
+import unittest
+
+import mock
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.exporters import (
+    JSONLinesExporter, get_event_serializer,
+)
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+
+from .test_archives import LINES
+
+
+class VerboseName(object):
+
+    def __init__(self):
+        self.language = "en"
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "Event ({0})".format(self.language)
+
+    __unicode__ = __str__
+
+
+class JSONLinesExporterTestCase(unittest.TestCase):
+
+    def export(self, events, **kwargs):
+        stream = io.StringIO()
+
+        with JSONLinesExporter(stream, **kwargs) as exporter:
+            exporter.write_many(events)
+
+        return stream.getvalue()
+
+    def assert_primitives(self, events, output):
+        self.assertTrue(output.endswith("\n"))
+        self.assertEqual(
+            [json.loads(line) for line in output.splitlines()],
+            [json.loads(json.dumps(x.to_primitive())) for x in events],
+        )
+
+    def test_export(self):
+        items = list(GameLogEventParser().parse_lines(LINES))
+        self.assert_primitives(items, self.export(items))
+
+    def test_export_of_lazy_and_projected_events(self):
+        parser = GameLogEventParser(fields=['time', 'actor'], lazy=True)
+        items = list(parser.parse_lines(LINES))
+        self.assert_primitives(items, self.export(items))
+
+    def test_serializer(self):
+        event = events.HumanHasConnected(time=None, actor=None)
+        serializer = get_event_serializer(events.HumanHasConnected)
+
+        self.assertIs(
+            serializer, get_event_serializer(events.HumanHasConnected),
+        )
+        self.assertEqual(
+            serializer(event, '"name":"x"'),
+            '{"time":null,"actor":null,"name":"x"}',
+        )
+
+    def test_batches(self):
+        items = list(GameLogEventParser().parse_lines(LINES))
+        stream = io.StringIO()
+        exporter = JSONLinesExporter(stream, batch_size=5)
+
+        exporter.write_many(items[:4])
+        self.assertEqual(stream.getvalue(), "")
+
+        exporter.write(items[4])
+        self.assertEqual(len(stream.getvalue().splitlines()), 5)
+
+        exporter.write(items[5])
+        self.assertEqual(len(stream.getvalue().splitlines()), 5)
+
+        exporter.close()
+        self.assertEqual(len(stream.getvalue().splitlines()), 6)
+
+    def test_verbose_names_are_cached_per_language(self):
+
+        class Event(events.ParsableEvent):
+            __slots__ = ['time', ]
+            verbose_name = VerboseName()
+            matcher = None
+
+        event = Event(time=None)
+        stream = io.StringIO()
+        exporter = JSONLinesExporter(stream)
+        target = 'il2fb.parsers.game_log.exporters.get_language'
+
+        with mock.patch(target, return_value="en"):
+            exporter.write_many([event, event])
+
+        Event.verbose_name.language = "ru"
+
+        with mock.patch(target, return_value="ru"):
+            exporter.write_many([event, event])
+
+        exporter.close()
+
+        self.assertEqual(Event.verbose_name.calls, 2)
+        verbose_names = [
+            json.loads(line)['verbose_name']
+            for line in stream.getvalue().splitlines()
+        ]
+        self.assertEqual(
+            verbose_names,
+            ["Event (en)", "Event (en)", "Event (ru)", "Event (ru)"],
+        )
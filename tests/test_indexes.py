@@ -0,0 +1,187 @@
+# coding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.indexes import (
+    HEADER, SEGMENT_FORMAT_VERSION, SEGMENT_MAGIC, LogIndex, IndexSegment,
+    write_segment,
+)
+
+from .test_archives import LINES
+
+
+class IndexSegmentTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(IndexSegmentTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "segment-00000000.idx")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(IndexSegmentTestCase, self).tearDown()
+
+    def test_lookup(self):
+        postings = {
+            "term{0:03d}".format(i): [(i % 2, i * 10), (0, 1)]
+            for i in range(100)
+        }
+        write_segment(self.path, [("a", 0, 10), ("b", 0, 20)], postings)
+        segment = IndexSegment(self.path)
+
+        try:
+            self.assertEqual(len(segment), 100)
+            self.assertEqual(segment.lookup("term000"), [("a", 0), ("a", 1)])
+            self.assertEqual(
+                segment.lookup("term051"), [("a", 1), ("b", 510)],
+            )
+            self.assertEqual(
+                segment.lookup("term099"), [("a", 1), ("b", 990)],
+            )
+            self.assertEqual(segment.lookup("term"), [])
+            self.assertEqual(segment.lookup("term100"), [])
+            self.assertEqual(
+                [term for term, items in segment.iter_items()],
+                sorted(postings),
+            )
+        finally:
+            segment.close()
+
+    def test_invalid_segment(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"x" * 100)
+
+        with self.assertRaises(ValueError):
+            IndexSegment(self.path)
+
+    def test_unknown_version(self):
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(
+                SEGMENT_MAGIC, SEGMENT_FORMAT_VERSION + 1, 0, 0,
+            ))
+
+        with self.assertRaises(ValueError):
+            IndexSegment(self.path)
+
+
+class LogIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(LogIndexTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.index_directory = os.path.join(self.directory, "index")
+        self.log_path = os.path.join(self.directory, "eventlog.lst")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(LogIndexTestCase, self).tearDown()
+
+    def append_log(self, data):
+        with open(self.log_path, 'ab') as f:
+            f.write(data.encode('latin-1'))
+
+    def get_offset(self, i):
+        return sum(len(x) + 1 for x in LINES[:i])
+
+    def test_incremental_updates(self):
+        self.append_log("\n".join(LINES[:8]) + "\n" + LINES[8][:10])
+
+        with LogIndex(self.index_directory) as index:
+            self.assertEqual(index.add_file(self.log_path), 5)
+            self.assertEqual(index.add_file(self.log_path), 0)
+            self.assertEqual(len(index.segments), 1)
+            self.assertEqual(
+                index.get_indexed_size(self.log_path), self.get_offset(8),
+            )
+
+        self.append_log(LINES[8][10:] + "\n" + "\n".join(LINES[9:]) + "\n")
+
+        with LogIndex(self.index_directory) as index:
+            self.assertEqual(index.add_file(self.log_path), 4)
+            self.assertEqual(len(index.segments), 2)
+
+            path = os.path.abspath(self.log_path)
+            self.assertEqual(index.lookup("flight:r0100"), [
+                (path, self.get_offset(8)),
+            ])
+            self.assertEqual(
+                [offset for path, offset in index.lookup("callsign:User0")],
+                [self.get_offset(i) for i in [3, 4, 5, 6, 7, 8, 9, 11, 12]],
+            )
+            self.assertEqual(index.lookup("callsign:User9"), [])
+
+            results = list(index.iter_events("aircraft:Bf-109G-6_Late"))
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0][1], self.get_offset(7))
+            self.assertIsInstance(
+                results[0][2], events.HumanAircraftWasDamagedByHumanAircraft,
+            )
+
+    def test_replaced_file(self):
+        self.append_log("\n".join(LINES) + "\n")
+
+        with LogIndex(self.index_directory) as index:
+            index.add_file(self.log_path)
+
+        os.remove(self.log_path)
+        self.append_log(
+            "[8:33:05 PM] Bob has connected\n"
+            "[8:33:06 PM] Bob has disconnected\n"
+        )
+
+        with LogIndex(self.index_directory) as index:
+            self.assertEqual(index.get_indexed_size(self.log_path), 0)
+            self.assertEqual(index.add_file(self.log_path), 2)
+            self.assertEqual(
+                [x[2] for x in index.iter_lines("callsign:Bob")],
+                [
+                    "[8:33:05 PM] Bob has connected",
+                    "[8:33:06 PM] Bob has disconnected",
+                ],
+            )
+            self.assertEqual(index.lookup("callsign:User0"), [])
+
+            index.compact()
+            self.assertEqual(len(index.lookup("callsign:Bob")), 2)
+            self.assertEqual(index.lookup("callsign:User0"), [])
+
+    def test_file_replaced_with_longer_one(self):
+        self.append_log(LINES[3] + "\n")
+
+        with LogIndex(self.index_directory) as index:
+            index.add_file(self.log_path)
+
+        os.remove(self.log_path)
+        self.append_log("\n".join(["[8:33:05 PM] Bob has connected", ] * 5))
+        self.append_log("\n")
+
+        with LogIndex(self.index_directory) as index:
+            self.assertEqual(index.add_file(self.log_path), 5)
+            self.assertEqual(len(index.lookup("callsign:Bob")), 5)
+            self.assertEqual(index.lookup("callsign:User0"), [])
+
+    def test_compact(self):
+        self.append_log("\n".join(LINES[:8]) + "\n")
+
+        with LogIndex(self.index_directory) as index:
+            index.add_file(self.log_path)
+            self.append_log("\n".join(LINES[8:]) + "\n")
+            index.add_file(self.log_path)
+
+            expected = index.lookup("callsign:User0")
+            index.compact()
+
+            self.assertEqual(len(index.segments), 1)
+            self.assertEqual(index.lookup("callsign:User0"), expected)
+            self.assertEqual(
+                index.segments[0].files,
+                [(os.path.abspath(self.log_path), 0, self.get_offset(14))],
+            )
+
+        self.assertEqual(
+            os.listdir(self.index_directory), ["segment-00000002.idx", ],
+        )
@@ -0,0 +1,82 @@
+# coding: utf-8
+
+import datetime
+import pickle
+import unittest
+
+import mock
+
+from il2fb.commons import actors
+from il2fb.commons.spatial import Point2D
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.lazy import make_lazy_event_class
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+
+
+STRING = "[8:33:05 PM] User0:Pe-8 landed at 100.0 200.99"
+
+
+class LazyEventTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(LazyEventTestCase, self).setUp()
+        self.parser = GameLogEventParser(lazy=True)
+
+    def test_lazy_event_class(self):
+        lazy_class = make_lazy_event_class(events.HumanAircraftHasLanded)
+        self.assertTrue(
+            issubclass(lazy_class, events.HumanAircraftHasLanded)
+        )
+        self.assertEqual(lazy_class.__name__, "HumanAircraftHasLanded")
+
+    def test_fields_are_evaluated_on_access(self):
+        event = self.parser.parse(STRING)
+
+        self.assertIsInstance(event, events.HumanAircraftHasLanded)
+        self.assertEqual(event.name, "HumanAircraftHasLanded")
+        self.assertEqual(event.time, datetime.time(20, 33, 5))
+        self.assertEqual(event.actor, actors.HumanAircraft("User0", "Pe-8"))
+        self.assertEqual(event.pos, Point2D(100.0, 200.99))
+        self.assertEqual(
+            event.to_primitive(),
+            events.HumanAircraftHasLanded.from_s(STRING).to_primitive(),
+        )
+
+    def test_transformers_are_not_run_until_access(self):
+        transformer = mock.Mock()
+        transformer.field_name = 'time'
+        lazy_class = make_lazy_event_class(
+            events.MissionHasBegun, transformers=[transformer, ],
+        )
+        event = lazy_class({'time': "8:33:05 PM"})
+        self.assertFalse(transformer.called)
+
+        self.assertEqual(event.time, "8:33:05 PM")
+        event.time
+        transformer.assert_called_once_with({'time': "8:33:05 PM"})
+
+    def test_transformers_without_fields_are_eager(self):
+        transformer = mock.Mock(spec=[])
+        lazy_class = make_lazy_event_class(
+            events.MissionHasBegun, transformers=[transformer, ],
+        )
+        lazy_class({'time': "8:33:05 PM"})
+        self.assertTrue(transformer.called)
+
+    def test_unknown_attribute(self):
+        event = self.parser.parse(STRING)
+        with self.assertRaises(AttributeError):
+            event.foo
+
+    def test_projection(self):
+        parser = GameLogEventParser(lazy=True, fields=['actor', ])
+        event = parser.parse(STRING)
+        self.assertIsNone(event.time)
+        self.assertIsNone(event.pos)
+        self.assertEqual(event.actor, actors.HumanAircraft("User0", "Pe-8"))
+
+    def test_pickling(self):
+        event = pickle.loads(pickle.dumps(self.parser.parse(STRING)))
+        self.assertIs(event.__class__, events.HumanAircraftHasLanded)
+        self.assertEqual(event, events.HumanAircraftHasLanded.from_s(STRING))
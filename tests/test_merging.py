@@ -0,0 +1,122 @@
+# coding: utf-8
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from il2fb.parsers.game_log.merging import merge_events, merge_files
+
+
+def make_log(date, times):
+    lines = [
+        "[{0} 8:00:00 PM] Mission: path/PH.mis is Playing".format(date),
+    ]
+    lines.extend(
+        "[{0}] User0 has connected".format(time)
+        for time in times
+    )
+    return "\n".join(lines) + "\n"
+
+
+class Event(object):
+
+    def __init__(self, time):
+        self.time = time
+
+
+class MergeEventsTestCase(unittest.TestCase):
+
+    def test_merge_events(self):
+        date = datetime.date(2013, 9, 15)
+        first = [
+            (date, Event(datetime.time(1))),
+            (date, Event(datetime.time(3))),
+            (date, Event(None)),
+            (date + datetime.timedelta(days=1), Event(datetime.time(0))),
+        ]
+        second = [
+            (None, Event(datetime.time(0))),
+            (date, Event(datetime.time(2))),
+            (date, Event(datetime.time(3))),
+            (date, Event(datetime.time(5))),
+        ]
+        results = list(merge_events([('a', first), ('b', second)]))
+
+        self.assertEqual(
+            [(tag, event) for tag, date, event in results],
+            [
+                ('b', second[0][1]),
+                ('a', first[0][1]),
+                ('b', second[1][1]),
+                ('a', first[1][1]),
+                ('a', first[2][1]),
+                ('b', second[2][1]),
+                ('b', second[3][1]),
+                ('a', first[3][1]),
+            ],
+        )
+
+    def test_merge_events_lazily(self):
+
+        def iter_events():
+            for i in range(3):
+                yield None, Event(datetime.time(i))
+
+            raise AssertionError("Source was read too far")
+
+        results = merge_events({'a': iter_events()})
+
+        for i in range(3):
+            self.assertEqual(next(results)[2].time, datetime.time(i))
+
+    def test_merge_empty_sources(self):
+        self.assertEqual(list(merge_events([('a', []), ('b', [])])), [])
+
+
+class MergeFilesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(MergeFilesTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(MergeFilesTestCase, self).tearDown()
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'w') as f:
+            f.write(data)
+
+        return path
+
+    def test_merge_files(self):
+        first = self.write("first.lst", make_log(
+            "Sep 15, 2013", ["8:00:01 PM", "8:00:03 PM", "11:59:59 PM"],
+        ))
+        second = self.write("second.lst", make_log(
+            "Sep 16, 2013", ["8:00:02 PM", "8:00:04 PM"],
+        ))
+        results = list(merge_files({'first': first, 'second': second}))
+
+        self.assertEqual(
+            [
+                (tag, date.day, event.time.strftime("%H:%M:%S"))
+                for tag, date, event in results
+            ],
+            [
+                ('first', 15, "20:00:00"),
+                ('first', 15, "20:00:01"),
+                ('first', 15, "20:00:03"),
+                ('first', 15, "23:59:59"),
+                ('second', 16, "20:00:00"),
+                ('second', 16, "20:00:02"),
+                ('second', 16, "20:00:04"),
+            ],
+        )
+
+        results = list(merge_files([first, second]))
+        self.assertEqual(results[0][0], first)
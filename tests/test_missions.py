@@ -0,0 +1,110 @@
+# coding: utf-8
+
+import datetime
+import unittest
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.missions import (
+    MissionRange, split_missions, iter_dated_events, iter_mission_events,
+)
+
+
+LOG = (
+    b"[8:00:00 PM] User0 has connected\r\n"
+    b"[Sep 15, 2013 8:33:05 PM] Mission: PH.mis is Playing\r\n"
+    b"[8:33:05 PM] Mission BEGIN\r\n"
+    b"[11:59:59 PM] User0 has disconnected\r\n"
+    b"[12:00:01 AM] User1 has connected\r\n"
+    b"[Sep 16, 2013 12:10:00 AM] Mission: RED WON\r\n"
+    b"[12:10:05 AM] Mission END\r\n"
+    b"[Sep 16, 2013 12:20:00 AM] Mission: path/PH2.mis is Playing\r\n"
+    b"[12:20:00 AM] Mission BEGIN\r\n"
+    b"[12:21:00 AM] User1 has disconnected"
+)
+
+
+class SplitMissionsTestCase(unittest.TestCase):
+
+    def test_split_missions(self):
+        first = LOG.index(b"[Sep 15")
+        second = LOG.index(b"[Sep 16, 2013 12:20")
+
+        self.assertEqual(
+            split_missions(LOG),
+            [
+                MissionRange(
+                    start=0,
+                    end=first,
+                    mission=None,
+                    date=None,
+                    has_begun=False,
+                    has_ended=False,
+                    was_won=False,
+                ),
+                MissionRange(
+                    start=first,
+                    end=second,
+                    mission="PH.mis",
+                    date=datetime.date(2013, 9, 15),
+                    has_begun=True,
+                    has_ended=True,
+                    was_won=True,
+                ),
+                MissionRange(
+                    start=second,
+                    end=len(LOG),
+                    mission="path/PH2.mis",
+                    date=datetime.date(2013, 9, 16),
+                    has_begun=True,
+                    has_ended=False,
+                    was_won=False,
+                ),
+            ]
+        )
+
+    def test_split_missions_without_leading_data(self):
+        data = LOG[LOG.index(b"[Sep 15"):]
+        result = split_missions(data)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0].start, 0)
+
+    def test_split_missions_without_missions(self):
+        self.assertEqual(split_missions(b""), [])
+        self.assertEqual(
+            split_missions(b"[8:00:00 PM] User0 has connected\n"),
+            [
+                MissionRange(
+                    start=0,
+                    end=33,
+                    mission=None,
+                    date=None,
+                    has_begun=False,
+                    has_ended=False,
+                    was_won=False,
+                ),
+            ]
+        )
+
+
+class IterMissionEventsTestCase(unittest.TestCase):
+
+    def test_iter_mission_events(self):
+        mission = split_missions(LOG)[1]
+        result = list(iter_mission_events(LOG, mission))
+
+        self.assertEqual(
+            [(date, event.__class__) for date, event in result],
+            [
+                (datetime.date(2013, 9, 15), events.MissionIsPlaying),
+                (datetime.date(2013, 9, 15), events.MissionHasBegun),
+                (datetime.date(2013, 9, 15), events.HumanHasDisconnected),
+                (datetime.date(2013, 9, 16), events.HumanHasConnected),
+                (datetime.date(2013, 9, 16), events.MissionWasWon),
+                (datetime.date(2013, 9, 16), events.MissionHasEnded),
+            ]
+        )
+
+    def test_iter_dated_events_without_date(self):
+        event = events.MissionHasBegun(time=datetime.time(20, 33, 5))
+        result = list(iter_dated_events([event, ]))
+        self.assertEqual(result, [(None, event), ])
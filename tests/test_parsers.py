@@ -1,12 +1,15 @@
 # coding: utf-8
 
+import datetime
 import unittest
 
 import six
 
+from il2fb.commons import actors
 from il2fb.commons.events import EventParsingException
+from il2fb.commons.spatial import Point2D
 
-from il2fb.parsers.game_log import GameLogEventParser, get_all_events
+from il2fb.parsers.game_log import GameLogEventParser, events, get_all_events
 
 
 class EventsParserTestCase(unittest.TestCase):
@@ -42,3 +45,193 @@ class EventsParserTestCase(unittest.TestCase):
     def test_parse_invalid_string_safely(self):
         event = self.parser.parse("foo bar baz quz", ignore_errors=True)
         self.assertIsNone(event)
+
+    def test_parse_lines(self):
+        lines = [
+            "[8:33:05 PM] User0 has connected\r\n",
+            "\r\n",
+            "foo bar\n",
+            "[8:33:05 PM] User0 has disconnected",
+        ]
+        result = list(self.parser.parse_lines(lines, ignore_errors=True))
+        self.assertEqual(
+            [x.__class__.__name__ for x in result],
+            ["HumanHasConnected", "HumanHasDisconnected"],
+        )
+
+
+class SelectiveEventsParserTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(SelectiveEventsParserTestCase, self).setUp()
+        self.parser = GameLogEventParser(only=[
+            events.AIAircraftWasShotDownByAIAircraft,
+            events.HumanHasConnected,
+        ])
+
+    def test_selected_events_are_parsed(self):
+        event = self.parser.parse("[8:33:05 PM] User0 has connected")
+        self.assertIsInstance(event, events.HumanHasConnected)
+
+        event = self.parser.parse(
+            "[8:33:05 PM] r01001 shot down by g01002 at 100.0 200.99"
+        )
+        self.assertIsInstance(event, events.AIAircraftWasShotDownByAIAircraft)
+
+    def test_classification_is_not_affected(self):
+        string = (
+            "[8:33:05 PM] User0:Pe-8 shot down by g01002 at 100.0 200.99"
+        )
+        self.assertIsInstance(
+            events.AIAircraftWasShotDownByAIAircraft.from_s(string),
+            events.AIAircraftWasShotDownByAIAircraft,
+        )
+        self.assertIsNone(self.parser.parse(string))
+
+    def test_other_strings_are_rejected_by_prefilter(self):
+        string = "[8:33:05 PM] User0 has disconnected"
+        self.assertFalse(self.parser.is_selected("foo bar"))
+        self.assertTrue(self.parser.is_selected(string))
+        self.assertIsNone(self.parser.parse("foo bar"))
+        self.assertIsNone(self.parser.parse(string))
+
+    def test_unknown_selected_string(self):
+        with self.assertRaises(EventParsingException):
+            self.parser.parse("[8:33:05 PM] foo has connected twice")
+
+    def test_unknown_selected_events(self):
+        with self.assertRaises(ValueError) as cm:
+            GameLogEventParser(
+                events=[events.HumanHasConnected, ],
+                only=[events.HumanHasDisconnected, ],
+            )
+
+        self.assertEqual(
+            six.text_type(cm.exception),
+            "Selected events are not known to parser: HumanHasDisconnected"
+        )
+
+
+class ProjectionEventsParserTestCase(unittest.TestCase):
+
+    def test_projected_fields_are_transformed(self):
+        parser = GameLogEventParser(fields=['time', 'actor'])
+        event = parser.parse(
+            "[8:33:05 PM] User0:Pe-8 shot down by User1:Bf-109G-6_Late "
+            "at 100.0 200.99"
+        )
+        self.assertIsInstance(
+            event, events.HumanAircraftWasShotDownByHumanAircraft,
+        )
+        self.assertEqual(event.time, datetime.time(20, 33, 5))
+        self.assertEqual(event.actor, actors.HumanAircraft("User0", "Pe-8"))
+        self.assertIsNone(event.attacker)
+        self.assertIsNone(event.pos)
+
+    def test_raw_fields_are_projected(self):
+        parser = GameLogEventParser(fields=['mission', ])
+        event = parser.parse(
+            "[Sep 15, 2013 8:33:05 PM] Mission: PH.mis is Playing"
+        )
+        self.assertEqual(event.mission, "PH.mis")
+        self.assertIsNone(event.date)
+        self.assertIsNone(event.time)
+
+    def test_empty_projection(self):
+        parser = GameLogEventParser(fields=[])
+        event = parser.parse("[8:33:05 PM] User0 has connected")
+        self.assertIsInstance(event, events.HumanHasConnected)
+        self.assertIsNone(event.time)
+        self.assertIsNone(event.actor)
+
+    def test_unknown_fields(self):
+        with self.assertRaises(ValueError) as cm:
+            GameLogEventParser(fields=['time', 'foo', 'bar'])
+
+        self.assertEqual(
+            six.text_type(cm.exception),
+            "Projected fields are not known to parser: bar, foo"
+        )
+
+
+class CachingEventsParserTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(CachingEventsParserTestCase, self).setUp()
+        self.parser = GameLogEventParser(cache_size=2)
+
+    def test_cached_results_are_reused(self):
+        first = self.parser.parse(
+            "[8:33:05 PM] 3do/Buildings/Finland/CenterHouse1_w/live.sim "
+            "destroyed by User0:Pe-8 at 100.0 200.99"
+        )
+        second = self.parser.parse(
+            "[8:33:06 PM] 3do/Buildings/Finland/CenterHouse1_w/live.sim "
+            "destroyed by User0:Pe-8 at 300.0 400.99"
+        )
+
+        self.assertIsInstance(second, events.BuildingWasDestroyedByHumanAircraft)
+        self.assertIs(second.actor, first.actor)
+        self.assertIs(second.attacker, first.attacker)
+        self.assertEqual(second.time, datetime.time(20, 33, 6))
+        self.assertEqual(second.pos, Point2D(300.0, 400.99))
+        self.assertEqual(first.pos, Point2D(100.0, 200.99))
+
+    def test_strings_without_position(self):
+        first = self.parser.parse("[8:33:05 PM] User0 has connected")
+        second = self.parser.parse("[8:33:06 PM] User0 has connected")
+
+        self.assertIs(second.actor, first.actor)
+        self.assertEqual(second.time, datetime.time(20, 33, 6))
+
+    def test_strings_without_time_prefix(self):
+        event = self.parser.parse(
+            "[Sep 15, 2013 8:33:05 PM] Mission: PH.mis is Playing"
+        )
+        self.assertIsInstance(event, events.MissionIsPlaying)
+
+    def test_least_recently_used_results_are_evicted(self):
+        first = self.parser.parse("[8:33:05 PM] User0 has connected")
+        self.parser.parse("[8:33:05 PM] User1 has connected")
+        self.parser.parse("[8:33:05 PM] User0 has connected")
+        self.parser.parse("[8:33:05 PM] User2 has connected")
+
+        event = self.parser.parse("[8:33:05 PM] User0 has connected")
+        self.assertIs(event.actor, first.actor)
+
+        event = self.parser.parse("[8:33:05 PM] User1 has connected")
+        self.assertEqual(event.actor, actors.Human("User1"))
+
+    def test_unknown_strings_are_not_cached(self):
+        string = "[8:33:05 PM] foo bar"
+
+        with self.assertRaises(EventParsingException):
+            self.parser.parse(string)
+
+        with self.assertRaises(EventParsingException):
+            self.parser.parse(string)
+
+        self.assertIsNone(self.parser.parse(string, ignore_errors=True))
+
+    def test_projection_and_selection(self):
+        parser = GameLogEventParser(
+            only=[events.HumanAircraftHasLanded, ],
+            fields=['actor', ],
+            cache_size=10,
+        )
+        string = "[8:33:05 PM] User0:Pe-8 landed at 100.0 200.99"
+
+        for i in range(2):
+            event = parser.parse(string)
+            self.assertIsNone(event.time)
+            self.assertIsNone(event.pos)
+            self.assertEqual(event.actor, actors.HumanAircraft("User0", "Pe-8"))
+
+        for i in range(2):
+            self.assertIsNone(parser.parse(
+                "[8:33:05 PM] r01000 landed at 100.0 200.99"
+            ))
+
+    def test_cache_cannot_be_used_with_lazy_events(self):
+        with self.assertRaises(ValueError):
+            GameLogEventParser(lazy=True, cache_size=10)
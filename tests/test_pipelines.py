@@ -0,0 +1,189 @@
+# coding: utf-8
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from il2fb.commons.events import EventParsingException
+from il2fb.commons.organization import Belligerents
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.pipelines import (
+    INLINE, THREAD, PROCESS, Stage, Pipeline, ReadChunks, SplitLines,
+    ParseLines, AttachDates, WriteMany, make_pipeline,
+)
+from il2fb.parsers.game_log.pools import get_fork_context
+
+
+LOG = (
+    b"[Sep 15, 2013 11:59:00 PM] Mission: PH.mis is Playing\r\n"
+    b"[11:59:00 PM] Mission BEGIN\r\n"
+    b"[11:59:59 PM] User0 has connected\r\n"
+    b"[12:00:01 AM] User0 has disconnected\r\n"
+    b"[12:10:05 AM] Mission END\r\n"
+    b"[Sep 16, 2013 12:10:06 AM] Mission: RED WON\r\n"
+)
+
+
+def duplicate(item):
+    return [item, item]
+
+
+def square(item):
+    return [item * item, ]
+
+
+class PipelineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(PipelineTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "eventlog.lst")
+
+        with open(self.path, 'wb') as f:
+            f.write(LOG)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(PipelineTestCase, self).tearDown()
+
+    def test_modes(self):
+        for mode in (INLINE, THREAD):
+            pipeline = Pipeline([
+                Stage(duplicate, mode=mode, queue_size=1),
+                Stage(square),
+            ])
+            self.assertEqual(
+                list(pipeline.process(range(4))),
+                [0, 0, 1, 1, 4, 4, 9, 9],
+            )
+
+            duplicate_metrics, square_metrics = pipeline.metrics
+            self.assertEqual(duplicate_metrics.name, "duplicate")
+            self.assertEqual(duplicate_metrics.items_in, 4)
+            self.assertEqual(duplicate_metrics.items_out, 8)
+            self.assertEqual(square_metrics.items_in, 8)
+            self.assertEqual(square_metrics.items_out, 8)
+            self.assertGreater(square_metrics.elapsed, 0)
+            self.assertGreaterEqual(
+                square_metrics.busy_time, square_metrics.max_latency,
+            )
+
+    @unittest.skipIf(
+        get_fork_context() is None, "'fork' start method is not supported",
+    )
+    def test_process_mode(self):
+        pipeline = Pipeline([
+            Stage(square, mode=PROCESS, processes=2),
+            Stage(duplicate, mode=THREAD),
+        ])
+        metrics = pipeline.run(range(10))
+
+        self.assertEqual(metrics[0].items_in, 10)
+        self.assertEqual(metrics[1].items_out, 20)
+        self.assertEqual(
+            list(pipeline.process(range(5))),
+            [0, 0, 1, 1, 4, 4, 9, 9, 16, 16],
+        )
+
+    @unittest.skipIf(
+        get_fork_context() is None, "'fork' start method is not supported",
+    )
+    def test_parse_in_processes(self):
+        pipeline = make_pipeline(parse_mode=PROCESS, processes=2)
+        results = [
+            event
+            for batch in pipeline.process([self.path, ])
+            for event in batch
+        ]
+
+        self.assertEqual(len(results), 6)
+        self.assertIs(results[-1].belligerent, Belligerents.red)
+
+    def test_errors(self):
+        def fail(item):
+            raise ValueError(item)
+
+        pipeline = Pipeline([
+            Stage(duplicate, mode=THREAD),
+            Stage(fail, mode=THREAD),
+        ])
+
+        with self.assertRaises(ValueError):
+            list(pipeline.process(range(100)))
+
+    def test_early_exit(self):
+        pipeline = Pipeline([
+            Stage(duplicate, mode=THREAD, queue_size=1),
+            Stage(duplicate, mode=THREAD, queue_size=1),
+        ])
+
+        outputs = pipeline.process(iter(int, 1))
+        self.assertEqual([next(outputs) for i in range(3)], [0, 0, 0])
+        outputs.close()
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            Stage(square, mode='fiber')
+
+    def test_standard_stages(self):
+        pipeline = Pipeline([
+            Stage(ReadChunks(buffer_size=40), mode=THREAD),
+            Stage(SplitLines()),
+            Stage(ParseLines()),
+            Stage(AttachDates()),
+        ])
+        results = [
+            item
+            for batch in pipeline.process([self.path, ])
+            for item in batch
+        ]
+
+        self.assertEqual(
+            [(date, event.__class__) for date, event in results],
+            [
+                (datetime.date(2013, 9, 15), events.MissionIsPlaying),
+                (datetime.date(2013, 9, 15), events.MissionHasBegun),
+                (datetime.date(2013, 9, 15), events.HumanHasConnected),
+                (datetime.date(2013, 9, 16), events.HumanHasDisconnected),
+                (datetime.date(2013, 9, 16), events.MissionHasEnded),
+                (datetime.date(2013, 9, 16), events.MissionWasWon),
+            ]
+        )
+        self.assertEqual(
+            [x.name for x in pipeline.metrics],
+            ["ReadChunks", "SplitLines", "ParseLines", "AttachDates"],
+        )
+        self.assertGreater(pipeline.metrics[0].items_out, 1)
+
+    def test_parse_errors(self):
+        with open(self.path, 'ab') as f:
+            f.write(b"foo bar\r\n")
+
+        with self.assertRaises(EventParsingException):
+            make_pipeline().run([self.path, ])
+
+        sink = mock.Mock()
+        metrics = make_pipeline(
+            sink=sink, ignore_errors=True, dates=True,
+        ).run([self.path, ])
+
+        self.assertEqual(
+            [x.name for x in metrics],
+            ["read", "split", "parse", "enrich", "sink"],
+        )
+        self.assertEqual(sink.write_many.call_count, 1)
+        results = sink.write_many.call_args[0][0]
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[-1][0], datetime.date(2013, 9, 16))
+
+    def test_write_many(self):
+        sink = mock.Mock()
+        stage = WriteMany(sink)
+
+        self.assertIsNone(stage([1, 2]))
+        sink.write_many.assert_called_once_with([1, 2])
@@ -0,0 +1,99 @@
+# coding: utf-8
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from il2fb.commons.events import EventParsingException
+from il2fb.commons.organization import Belligerents
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+from il2fb.parsers.game_log.pools import PreforkParserPool, get_fork_context
+
+
+LOG = (
+    b"[Sep 15, 2013 8:33:05 PM] Mission: PH.mis is Playing\r\n"
+    b"[8:33:05 PM] Mission BEGIN\r\n"
+    b"[11:59:59 PM] User0 has connected\r\n"
+    b"[12:00:01 AM] User0 has disconnected\r\n"
+    b"[12:10:05 AM] Mission END\r\n"
+    b"[Sep 16, 2013 12:20:00 AM] Mission: PH2.mis is Playing\r\n"
+    b"[12:20:00 AM] Mission BEGIN\r\n"
+    b"foo bar\r\n"
+)
+
+
+@unittest.skipIf(
+    get_fork_context() is None, "'fork' start method is not supported",
+)
+class PreforkParserPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(PreforkParserPoolTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(PreforkParserPoolTestCase, self).tearDown()
+
+    def test_parse_chunks(self):
+        chunks = [
+            ["[8:33:05 PM] User0 has connected", ],
+            ["[8:33:05 PM] User0 has disconnected", "foo bar"],
+        ]
+
+        with PreforkParserPool(processes=2) as pool:
+            results = list(pool.parse_chunks(chunks, ignore_errors=True))
+
+        self.assertEqual(
+            [[x.__class__ for x in result] for result in results],
+            [[events.HumanHasConnected, ], [events.HumanHasDisconnected, ]],
+        )
+
+    def test_parse_file(self):
+        path = os.path.join(self.directory, "eventlog.lst")
+        with open(path, 'wb') as f:
+            f.write(LOG)
+
+        parser = GameLogEventParser(lazy=True)
+
+        with PreforkParserPool(parser, processes=2) as pool:
+            results = list(pool.parse_file(path, ignore_errors=True))
+
+        self.assertEqual(
+            [(date, event.__class__) for date, event in results],
+            [
+                (datetime.date(2013, 9, 15), events.MissionIsPlaying),
+                (datetime.date(2013, 9, 15), events.MissionHasBegun),
+                (datetime.date(2013, 9, 15), events.HumanHasConnected),
+                (datetime.date(2013, 9, 16), events.HumanHasDisconnected),
+                (datetime.date(2013, 9, 16), events.MissionHasEnded),
+                (datetime.date(2013, 9, 16), events.MissionIsPlaying),
+                (datetime.date(2013, 9, 16), events.MissionHasBegun),
+            ]
+        )
+        self.assertEqual(results[2][1].actor.callsign, "User0")
+
+    def test_parse_file_with_belligerents(self):
+        path = os.path.join(self.directory, "eventlog.lst")
+        with open(path, 'wb') as f:
+            f.write(
+                b"[Sep 15, 2013 8:33:05 PM] Mission: PH.mis is Playing\r\n"
+                b"[8:33:05 PM] Mission BEGIN\r\n"
+                b"[Sep 15, 2013 8:40:00 PM] Mission: RED WON\r\n"
+            )
+
+        with PreforkParserPool(processes=1) as pool:
+            results = list(pool.parse_file(path))
+
+        self.assertEqual(len(results), 3)
+        self.assertIsInstance(results[2][1], events.MissionWasWon)
+        self.assertEqual(results[2][1].belligerent, Belligerents.red)
+
+    def test_errors_are_propagated(self):
+        with PreforkParserPool(processes=1) as pool:
+            with self.assertRaises(EventParsingException):
+                list(pool.parse_chunks([["foo bar", ], ]))
@@ -0,0 +1,74 @@
+# coding: utf-8
+
+import re
+import unittest
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.prefilter import (
+    get_pattern_phrases, get_event_phrases, get_event_phrase,
+)
+
+
+class GetPatternPhrasesTestCase(unittest.TestCase):
+
+    def test_literals_are_split_by_special_sequences(self):
+        self.assertEqual(
+            get_pattern_phrases(r"^\[(?P<time>\d{1,2})\]\s+has\sconnected$"),
+            ["[", "]", "has", "connected"],
+        )
+
+    def test_quantified_characters_are_excluded(self):
+        self.assertEqual(
+            get_pattern_phrases(r"foox?bar ba+z qu{2}x"),
+            ["foo", "bar b", "z q", "x"],
+        )
+
+    def test_escaped_characters_are_literals(self):
+        self.assertEqual(
+            get_pattern_phrases(r"foo\(bar\)[\]()]baz"),
+            ["foo(bar)", "baz"],
+        )
+
+    def test_verbose_whitespaces_are_ignored(self):
+        self.assertEqual(
+            get_pattern_phrases("foo bar # comment\nbaz", re.VERBOSE),
+            ["foobarbaz"],
+        )
+
+    def test_alternatives_have_no_phrases(self):
+        self.assertEqual(get_pattern_phrases("foo|bar"), [])
+        self.assertEqual(get_pattern_phrases("(foo|bar)baz"), ["baz"])
+
+
+class GetEventPhrasesTestCase(unittest.TestCase):
+
+    def test_get_event_phrases(self):
+        self.assertEqual(
+            get_event_phrases(events.HumanHasConnected),
+            ("connected", "has", "[", "]"),
+        )
+
+    def test_get_event_phrase(self):
+        self.assertEqual(
+            get_event_phrase(events.HumanHasConnected),
+            "connected",
+        )
+
+    def test_event_without_compiled_matcher(self):
+
+        class Event(events.ParsableEvent):
+            verbose_name = "Event"
+            matcher = staticmethod(lambda x: None)
+
+        self.assertEqual(get_event_phrases(Event), tuple())
+        self.assertEqual(get_event_phrase(Event), "")
+
+    def test_phrases_are_present_in_examples(self):
+        for event in events.get_all_events():
+            examples = [
+                x.strip()[1:-1] for x in event.__doc__.splitlines()
+                if x.strip().startswith('"')
+            ]
+            for example in examples:
+                for phrase in get_event_phrases(event):
+                    self.assertIn(phrase, example)
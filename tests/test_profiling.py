@@ -0,0 +1,103 @@
+# coding: utf-8
+
+import io
+import unittest
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+from il2fb.parsers.game_log.profiling import (
+    SAMPLING, ParseProfiler, get_transformer_label,
+)
+from il2fb.parsers.game_log.transformers import (
+    transform_human_as_actor, transform_time,
+)
+
+from .test_archives import LINES
+
+
+class ParseProfilerTestCase(unittest.TestCase):
+
+    def test_transformer_labels(self):
+        self.assertEqual(
+            get_transformer_label(transform_time), "transform_time(time)",
+        )
+        self.assertEqual(
+            get_transformer_label(transform_human_as_actor),
+            "get_human_transformer(actor)",
+        )
+
+    def test_deterministic(self):
+        profiler = ParseProfiler(GameLogEventParser(cache_size=100))
+
+        with profiler:
+            results = list(profiler.parser.parse_lines(LINES * 2))
+
+        self.assertEqual(
+            results, list(GameLogEventParser().parse_lines(LINES * 2)),
+        )
+
+        stages = {x.name: x for x in profiler.get_stages()}
+        # Failed attempts of matching are counted too.
+        self.assertGreaterEqual(stages["match:MissionIsPlaying"].calls, 2)
+        self.assertEqual(stages["construct:MissionIsPlaying"].calls, 2)
+        self.assertEqual(
+            stages["transform:transform_time(time)"].calls, len(LINES) * 2,
+        )
+        self.assertEqual(stages["extract"].calls, len(LINES) * 2)
+        self.assertGreater(stages["classify"].calls, len(LINES) * 2)
+        self.assertIn("other", stages)
+        self.assertAlmostEqual(
+            sum(x.time for x in stages.values()), profiler.elapsed,
+        )
+
+        table = profiler.format_table()
+        self.assertTrue(table.startswith("stage "))
+        self.assertIn("match:MissionIsPlaying", table)
+
+        stream = io.StringIO()
+        profiler.write_collapsed(stream)
+        lines = stream.getvalue().splitlines()
+        self.assertTrue(all(x.startswith("parse;") for x in lines))
+        self.assertTrue(any(
+            x.startswith("parse;match;MissionIsPlaying ") for x in lines
+        ))
+
+    def test_selective_and_lazy_parsers(self):
+        parser = GameLogEventParser(
+            only=[events.HumanHasConnected, ], lazy=True,
+        )
+        profiler = ParseProfiler(parser)
+
+        with profiler:
+            results = list(profiler.parser.parse_lines(LINES))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].actor.callsign, "User0")
+
+        stages = {x.name: x for x in profiler.get_stages()}
+        self.assertEqual(stages["prefilter"].calls, len(LINES))
+        self.assertEqual(stages["construct:HumanHasConnected"].calls, 1)
+
+    def test_sampling(self):
+        profiler = ParseProfiler(mode=SAMPLING, interval=0.0001)
+
+        with profiler:
+            for i in range(200):
+                list(profiler.parser.parse_lines(LINES))
+
+        stages = profiler.get_stages()
+        self.assertTrue(stages)
+        self.assertAlmostEqual(
+            sum(x.time for x in stages), profiler.elapsed,
+        )
+
+        stream = io.StringIO()
+        profiler.write_collapsed(stream)
+        line = stream.getvalue().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        self.assertIn(__name__, stack)
+        self.assertGreater(int(count), 0)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            ParseProfiler(mode='magic')
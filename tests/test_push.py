@@ -0,0 +1,128 @@
+# coding: utf-8
+
+import unittest
+
+import mock
+
+from il2fb.commons.events import EventParsingException
+
+from il2fb.parsers.game_log import events, taxonomy
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+from il2fb.parsers.game_log.push import PushParser
+
+
+CONNECTED = "[8:33:05 PM] User0 has connected"
+DISCONNECTED = "[8:33:05 PM] User0 has disconnected"
+LANDED = "[8:33:05 PM] User0:Pe-8 landed at 100.0 200.99"
+
+
+class PushParserTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(PushParserTestCase, self).setUp()
+        self.parser = PushParser()
+
+    def test_handlers(self):
+        handler = mock.Mock()
+        self.parser.add_handler(handler, events.HumanHasConnected)
+
+        result = self.parser.feed(CONNECTED)
+
+        self.assertIs(result, events.HumanHasConnected)
+        self.assertEqual(handler.call_count, 1)
+        event = handler.call_args[0][0]
+        self.assertIsInstance(event, events.HumanHasConnected)
+        self.assertEqual(event.actor.callsign, "User0")
+
+    def test_raw_handlers(self):
+        raw_handler = mock.Mock()
+        self.parser.add_handler(
+            raw_handler,
+            [events.HumanHasConnected, events.HumanHasDisconnected],
+            raw=True,
+        )
+
+        with mock.patch.object(self.parser.parser, 'build') as build:
+            self.parser.feed_lines([CONNECTED + "\r\n", "\n", DISCONNECTED])
+
+        self.assertFalse(build.called)
+        self.assertEqual(
+            raw_handler.call_args_list,
+            [
+                mock.call(
+                    events.HumanHasConnected,
+                    {'time': "8:33:05 PM", 'actor_callsign': "User0"},
+                ),
+                mock.call(
+                    events.HumanHasDisconnected,
+                    {'time': "8:33:05 PM", 'actor_callsign': "User0"},
+                ),
+            ]
+        )
+
+    def test_unhandled_strings(self):
+        handler = mock.Mock()
+        self.parser.add_handler(handler, events.HumanHasConnected)
+
+        with mock.patch.object(self.parser.parser, 'match') as match:
+            self.assertIsNone(self.parser.feed(LANDED))
+            self.assertIsNone(self.parser.feed("foo bar"))
+
+        self.assertFalse(match.called)
+        self.assertIsNone(self.parser.feed(DISCONNECTED))
+        self.assertFalse(handler.called)
+
+    def test_handlers_of_all_events(self):
+        handler = mock.Mock()
+        self.parser.add_handler(handler)
+        self.parser.feed(LANDED)
+        self.assertIsInstance(
+            handler.call_args[0][0], events.HumanAircraftHasLanded,
+        )
+
+    def test_remove_handler(self):
+        handler = mock.Mock()
+        self.parser.add_handler(handler, events.HumanHasConnected)
+        self.parser.add_handler(handler, events.HumanHasDisconnected)
+        self.parser.feed(CONNECTED)
+        self.parser.remove_handler(handler)
+        self.parser.feed(DISCONNECTED)
+        self.assertEqual(handler.call_count, 1)
+
+    def test_selective_parser(self):
+        parser = PushParser(GameLogEventParser(only=[
+            events.HumanHasConnected,
+        ]))
+        handler = mock.Mock()
+        parser.add_handler(handler)
+
+        parser.feed(CONNECTED)
+        parser.feed(DISCONNECTED)
+
+        self.assertEqual(handler.call_count, 1)
+
+    def test_unknown_strings(self):
+        self.parser.add_handler(mock.Mock())
+        string = "[8:33:05 PM] User0 has connected twice"
+
+        with self.assertRaises(EventParsingException):
+            self.parser.feed(string)
+
+        self.assertIsNone(self.parser.feed(string, ignore_errors=True))
+
+    def test_handlers_of_categories(self):
+        handler = mock.Mock()
+        self.parser.add_handler(
+            handler,
+            events=events.HumanAircraftHasLanded,
+            categories=taxonomy.CONNECTION,
+        )
+        self.parser.feed_lines([CONNECTED, DISCONNECTED, LANDED])
+        self.assertEqual(
+            [x[0][0].__class__ for x in handler.call_args_list],
+            [
+                events.HumanHasConnected,
+                events.HumanHasDisconnected,
+                events.HumanAircraftHasLanded,
+            ]
+        )
@@ -0,0 +1,167 @@
+# coding: utf-8
+
+import asyncio
+import socket
+import unittest
+
+from il2fb.parsers.game_log.servers import IngestionServer
+
+
+class IngestionServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(IngestionServerTestCase, self).setUp()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = IngestionServer()
+        self.results = []
+        self.received = asyncio.Event()
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        super(IngestionServerTestCase, self).tearDown()
+
+    def sink(self, tag, events):
+        for event in events:
+            self.results.append((tag, event.actor.callsign))
+
+        self.received.set()
+
+    def wait_for(self, count):
+
+        async def wait():
+            while len(self.results) < count:
+                self.received.clear()
+                await asyncio.wait_for(self.received.wait(), 5)
+
+        self.loop.run_until_complete(wait())
+
+    def test_tcp(self):
+        calls = []
+
+        async def async_sink(tag, events):
+            calls.append(len(events))
+
+        self.server.add_sink(self.sink)
+        self.server.add_sink(async_sink)
+        address = self.loop.run_until_complete(self.server.start_tcp())
+
+        async def send():
+            reader, writer = await asyncio.open_connection(*address)
+            writer.write(b"#source server1\n")
+            writer.write(b"[8:33:05 PM] User0 has connected\nfoo bar\n")
+            writer.write(b"[8:33:05 PM] User1 has ")
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            writer.write(b"connected\r\n[8:33:05 PM] User2 has connected")
+            await writer.drain()
+            writer.close()
+
+        self.loop.run_until_complete(send())
+        self.wait_for(3)
+
+        self.assertEqual(self.results, [
+            ("server1", "User0"),
+            ("server1", "User1"),
+            ("server1", "User2"),
+        ])
+        self.assertEqual(sum(calls), 3)
+
+    def test_tcp_source_tag_by_peer(self):
+        self.server.add_sink(self.sink)
+        address = self.loop.run_until_complete(self.server.start_tcp())
+
+        async def send():
+            reader, writer = await asyncio.open_connection(*address)
+            writer.write(b"[8:33:05 PM] User0 has connected\n")
+            await writer.drain()
+            host, port = writer.get_extra_info('sockname')[:2]
+            writer.close()
+            return "{0}:{1}".format(host, port)
+
+        tag = self.loop.run_until_complete(send())
+        self.wait_for(1)
+        self.assertEqual(self.results, [(tag, "User0"), ])
+
+    def test_tcp_long_line(self):
+        self.server = IngestionServer(max_line_length=100, read_size=64)
+        self.server.add_sink(self.sink)
+        address = self.loop.run_until_complete(self.server.start_tcp())
+
+        async def send():
+            reader, writer = await asyncio.open_connection(*address)
+            writer.write(b"[8:33:05 PM] User0 has connected\n")
+            writer.write(b"x" * 200)
+            await writer.drain()
+            data = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return data
+
+        self.assertEqual(self.loop.run_until_complete(send()), b"")
+        self.assertEqual(len(self.results), 1)
+
+    def test_tcp_long_line_after_complete_line(self):
+        self.server = IngestionServer(max_line_length=100)
+        self.server.add_sink(self.sink)
+        address = self.loop.run_until_complete(self.server.start_tcp())
+
+        async def send():
+            reader, writer = await asyncio.open_connection(*address)
+            writer.write(
+                b"[8:33:05 PM] User0 has connected\n" + b"x" * 200
+            )
+            await writer.drain()
+            data = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return data
+
+        self.assertEqual(self.loop.run_until_complete(send()), b"")
+        self.assertEqual(len(self.results), 1)
+
+    def test_udp(self):
+        self.server.add_sink(self.sink)
+        address = self.loop.run_until_complete(self.server.start_udp())
+
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client.bind(("127.0.0.1", 0))
+
+        try:
+            client.sendto(
+                b"[8:33:05 PM] User0 has connected\n"
+                b"[8:33:05 PM] User1 has connected\n",
+                address,
+            )
+            self.wait_for(2)
+            tag = "{0}:{1}".format(*client.getsockname())
+        finally:
+            client.close()
+
+        self.assertEqual(self.results, [(tag, "User0"), (tag, "User1")])
+
+    def test_udp_source_tag(self):
+        self.server.add_sink(self.sink)
+        address = self.loop.run_until_complete(self.server.start_udp())
+
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        try:
+            client.sendto(
+                b"# comment\n"
+                b"#source server1\n"
+                b"[8:33:05 PM] User0 has connected\n",
+                address,
+            )
+            self.wait_for(1)
+        finally:
+            client.close()
+
+        self.assertEqual(self.results, [("server1", "User0"), ])
+
+    def test_remove_sink(self):
+        self.server.add_sink(self.sink)
+        self.server.remove_sink(self.sink)
+
+        with self.assertRaises(ValueError):
+            self.server.remove_sink(self.sink)
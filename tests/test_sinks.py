@@ -0,0 +1,171 @@
+# coding: utf-8
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+from il2fb.parsers.game_log.sinks import SQLiteSink
+from il2fb.parsers.game_log.taxonomy import get_event_type_code
+
+from .test_archives import LINES
+
+
+class SQLiteSinkTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(SQLiteSinkTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.database = os.path.join(self.directory, "events.sqlite")
+        self.log_path = os.path.join(self.directory, "eventlog.lst")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(SQLiteSinkTestCase, self).tearDown()
+
+    def append_log(self, data):
+        with open(self.log_path, 'ab') as f:
+            f.write(data.encode('latin-1'))
+
+    def test_write_many(self):
+        items = list(GameLogEventParser().parse_lines(LINES))
+        date = datetime.date(2013, 9, 15)
+
+        with SQLiteSink(self.database, batch_size=5) as sink:
+            sink.write_many([(date, item) for item in items])
+            sink.flush()
+
+            journal_mode = sink.connection.execute(
+                "PRAGMA journal_mode"
+            ).fetchone()[0]
+            self.assertEqual(journal_mode, "wal")
+
+            rows = sink.connection.execute(
+                "SELECT type, date, time, pos_x, pos_y, data FROM events "
+                "ORDER BY id"
+            ).fetchall()
+            self.assertEqual(len(rows), len(items))
+
+            type_code, date, time, pos_x, pos_y, data = rows[4]
+            self.assertEqual(
+                type_code,
+                get_event_type_code(events.HumanHasSelectedAirfield),
+            )
+            self.assertEqual(date, "2013-09-15")
+            self.assertEqual(time, "20:33:06")
+            self.assertEqual((pos_x, pos_y), (100.0, 200.99))
+            self.assertEqual(json.loads(data)['belligerent']['value'], 1)
+
+            count = sink.connection.execute(
+                "SELECT COUNT(DISTINCT event_id) FROM actors "
+                "WHERE callsign = ?", ("User0", ),
+            ).fetchone()[0]
+            self.assertEqual(count, 9)
+
+            rows = sink.connection.execute(
+                "SELECT role, kind, flight, aircraft FROM actors "
+                "WHERE flight IS NOT NULL ORDER BY role"
+            ).fetchall()
+            self.assertEqual(rows, [
+                ("assistant", "AIAircraft", "r0100", "1"),
+                ("attacker", "AIAircraft", "r0100", "0"),
+            ])
+
+    def test_batches(self):
+        sink = SQLiteSink(self.database, batch_size=2)
+        items = list(GameLogEventParser().parse_lines(LINES[:3]))
+        sink.write_many(items)
+
+        count = sink.connection.execute(
+            "SELECT COUNT(*) FROM events"
+        ).fetchone()[0]
+        self.assertEqual(count, 2)
+
+        sink.close()
+
+        with SQLiteSink(self.database) as sink:
+            count = sink.connection.execute(
+                "SELECT COUNT(*) FROM events"
+            ).fetchone()[0]
+            self.assertEqual(count, 3)
+
+    def test_import_file(self):
+        self.append_log("\n".join(LINES[:5]) + "\n" + LINES[5][:10])
+
+        with SQLiteSink(self.database, batch_size=2) as sink:
+            self.assertEqual(sink.import_file(self.log_path), 5)
+            state = sink.get_source_state(self.log_path)
+            self.assertEqual(state[1], datetime.date(2013, 9, 15))
+
+        with SQLiteSink(self.database) as sink:
+            self.assertEqual(sink.get_source_state(self.log_path), state)
+            self.assertEqual(sink.import_file(self.log_path), 0)
+
+        self.append_log(LINES[5][10:] + "\n" + "\n".join(LINES[6:]) + "\n")
+
+        with SQLiteSink(self.database) as sink:
+            self.assertEqual(
+                sink.import_file(self.log_path), len(LINES) - 5,
+            )
+            rows = sink.connection.execute(
+                "SELECT DISTINCT date, source_id FROM events"
+            ).fetchall()
+            self.assertEqual(rows, [("2013-09-15", 1), ])
+            self.assertEqual(
+                sink.get_source_state(self.log_path)[0],
+                os.path.getsize(self.log_path),
+            )
+
+    def test_import_truncated_file(self):
+        self.append_log("\n".join(LINES) + "\n")
+
+        with SQLiteSink(self.database) as sink:
+            sink.import_file(self.log_path)
+
+        os.remove(self.log_path)
+        self.append_log(LINES[1] + "\n")
+
+        with SQLiteSink(self.database) as sink:
+            self.assertEqual(sink.import_file(self.log_path), 1)
+            self.assertEqual(
+                sink.get_source_state(self.log_path),
+                (len(LINES[1]) + 1, None, datetime.time(20, 33, 5)),
+            )
+
+    def test_import_file_over_midnight(self):
+        self.append_log(
+            "[Sep 15, 2013 11:59:00 PM] Mission: PH.mis is Playing\n"
+            "[11:59:59 PM] User0 has connected\n"
+        )
+
+        with SQLiteSink(self.database) as sink:
+            self.assertEqual(sink.import_file(self.log_path), 2)
+            self.assertEqual(
+                sink.get_source_state(self.log_path)[1:],
+                (datetime.date(2013, 9, 15), datetime.time(23, 59, 59)),
+            )
+
+        self.append_log(
+            "[12:00:00 AM] User0 has disconnected\n"
+            "[12:00:01 AM] User0 has connected\n"
+        )
+
+        with SQLiteSink(self.database) as sink:
+            self.assertEqual(sink.import_file(self.log_path), 2)
+            rows = sink.connection.execute(
+                "SELECT date, time FROM events ORDER BY id"
+            ).fetchall()
+            self.assertEqual(rows, [
+                ("2013-09-15", "23:59:00"),
+                ("2013-09-15", "23:59:59"),
+                ("2013-09-16", "00:00:00"),
+                ("2013-09-16", "00:00:01"),
+            ])
+            self.assertEqual(
+                sink.get_source_state(self.log_path)[1:],
+                (datetime.date(2013, 9, 16), datetime.time(0, 0, 1)),
+            )
@@ -0,0 +1,105 @@
+# coding: utf-8
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from il2fb.parsers.game_log import events
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+from il2fb.parsers.game_log.snapshots import (
+    get_snapshot_key, get_snapshot_path, save_snapshot, load_snapshot,
+    load_parser,
+)
+
+
+STRING = "[8:33:05 PM] User0:Pe-8 landed at 100.0 200.99"
+
+
+class ParserPicklingTestCase(unittest.TestCase):
+
+    def test_pickling(self):
+        parser = GameLogEventParser(
+            only=[events.HumanAircraftHasLanded, ],
+            fields=['time', 'actor'],
+            lazy=True,
+        )
+        restored = pickle.loads(pickle.dumps(parser))
+
+        event = restored.parse(STRING)
+        self.assertEqual(event.name, "HumanAircraftHasLanded")
+        self.assertIsNone(event.pos)
+        self.assertEqual(event.actor.callsign, "User0")
+        self.assertIsNone(restored.parse("[8:33:05 PM] User0 has connected"))
+
+
+class SnapshotsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(SnapshotsTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(SnapshotsTestCase, self).tearDown()
+
+    def test_get_snapshot_key(self):
+        key = get_snapshot_key()
+        self.assertEqual(key, get_snapshot_key(events.get_all_events()))
+        self.assertNotEqual(key, get_snapshot_key(lazy=True))
+        self.assertNotEqual(key, get_snapshot_key(fields=['time', ]))
+        self.assertNotEqual(
+            key, get_snapshot_key([events.HumanHasConnected, ]),
+        )
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), "owners are not supported")
+    def test_save_and_load_snapshot(self):
+        path = os.path.join(self.directory, "snapshot")
+        save_snapshot(GameLogEventParser(), path, "foo")
+
+        self.assertIsNone(load_snapshot(path, "bar"))
+
+        parser = load_snapshot(path, "foo")
+        self.assertIsInstance(parser, GameLogEventParser)
+        self.assertEqual(parser.parse(STRING).name, "HumanAircraftHasLanded")
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), "owners are not supported")
+    def test_load_snapshot_writable_by_others(self):
+        path = os.path.join(self.directory, "snapshot")
+        save_snapshot(GameLogEventParser(), path, "foo")
+        self.assertIsNotNone(load_snapshot(path, "foo"))
+
+        os.chmod(path, 0o666)
+        self.assertIsNone(load_snapshot(path, "foo"))
+
+        os.chmod(path, 0o600)
+        os.chmod(self.directory, 0o777)
+        self.assertIsNone(load_snapshot(path, "foo"))
+
+    def test_load_missing_or_broken_snapshot(self):
+        path = os.path.join(self.directory, "snapshot")
+        self.assertIsNone(load_snapshot(path, "foo"))
+
+        with open(path, 'wb') as f:
+            f.write(b"foo")
+
+        self.assertIsNone(load_snapshot(path, "foo"))
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), "owners are not supported")
+    def test_load_parser(self):
+        parser = load_parser(self.directory, cache_size=10)
+        path = get_snapshot_path(
+            self.directory, get_snapshot_key(cache_size=10),
+        )
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(path)])
+
+        restored = load_parser(self.directory, cache_size=10)
+        self.assertIsNot(restored, parser)
+        self.assertEqual(restored.parse(STRING).name, "HumanAircraftHasLanded")
+
+    def test_load_parser_from_unwritable_directory(self):
+        directory = os.path.join(self.directory, "missing")
+        parser = load_parser(directory)
+        self.assertIsInstance(parser, GameLogEventParser)
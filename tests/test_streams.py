@@ -0,0 +1,165 @@
+# coding: utf-8
+
+import bz2
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+from il2fb.parsers.game_log.streams import (
+    ReadaheadReader, detect_compression, open_log, iter_lines,
+    iter_line_chunks, lzma, _BZ2Stream,
+)
+
+from .test_archives import LINES
+
+
+DATA = ("\r\n".join(LINES) + "\r\n").encode('latin-1')
+
+
+def gzip_compress(data):
+    buffer = io.BytesIO()
+
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as f:
+        f.write(data)
+
+    return buffer.getvalue()
+
+
+class StreamsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(StreamsTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(StreamsTestCase, self).tearDown()
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        return path
+
+    def get_paths(self):
+        paths = [
+            self.write("eventlog.lst", DATA),
+            self.write("eventlog.lst.gz", gzip_compress(DATA)),
+            self.write("eventlog.lst.bz2", bz2.compress(DATA)),
+        ]
+
+        if lzma is not None:
+            paths.append(self.write("eventlog.lst.xz", lzma.compress(DATA)))
+
+        return paths
+
+    def test_bz2_stream(self):
+        data = bz2.compress(DATA) + bz2.compress(DATA)
+        stream = _BZ2Stream(io.BytesIO(data), block_size=7)
+
+        with io.BufferedReader(stream, 16) as f:
+            self.assertEqual(f.read(), DATA * 2)
+
+    def test_detect_compression(self):
+        self.assertEqual(detect_compression(gzip_compress(b"")), "gzip")
+        self.assertEqual(detect_compression(bz2.compress(b"")), "bz2")
+        self.assertEqual(detect_compression(b"\xfd7zXZ\x00\x00"), "xz")
+        self.assertIsNone(detect_compression(DATA))
+        self.assertIsNone(detect_compression(b""))
+
+    def test_open_log(self):
+        for path in self.get_paths():
+            for threaded in [False, True]:
+                with open_log(path, buffer_size=16, threaded=threaded) as f:
+                    self.assertEqual(f.read(), DATA)
+
+    def test_iter_lines(self):
+        path = self.write("eventlog.lst.gz", gzip_compress(DATA))
+
+        with open_log(path, threaded=True) as f:
+            lines = list(iter_lines(f))
+
+        self.assertEqual([x.rstrip("\r\n") for x in lines], LINES)
+
+    def test_close_threaded_stream_before_end(self):
+        path = self.write("eventlog.lst", DATA * 100)
+
+        with open_log(path, buffer_size=16, queue_size=1, threaded=True) as f:
+            f.readline()
+
+        self.assertTrue(f.closed)
+
+    def test_empty_file(self):
+        path = self.write("eventlog.lst", b"")
+
+        for threaded in [False, True]:
+            with open_log(path, threaded=threaded) as f:
+                self.assertEqual(f.read(), b"")
+
+    def test_parse_file(self):
+        parser = GameLogEventParser()
+        expected = list(parser.parse_lines(LINES))
+
+        for path in self.get_paths():
+            self.assertEqual(list(parser.parse_file(path)), expected)
+            self.assertEqual(
+                list(parser.parse_file(path, threaded=True)), expected,
+            )
+
+
+class FailingStream(io.BytesIO):
+
+    def read(self, size=-1):
+        data = super(FailingStream, self).read(size)
+
+        if not data:
+            raise IOError("Stream is broken")
+
+        return data
+
+
+class ReadaheadReaderTestCase(unittest.TestCase):
+
+    def test_iter_line_chunks(self):
+        stream = io.BytesIO(b"foo\nbar\nlong line\nbaz")
+        self.assertEqual(
+            list(iter_line_chunks(stream, buffer_size=6)),
+            [b"foo\n", b"bar\n", b"long line\n", b"baz"],
+        )
+
+    def test_chunks(self):
+        with ReadaheadReader(io.BytesIO(DATA), buffer_size=100) as reader:
+            chunks = list(reader)
+
+        self.assertEqual(b"".join(chunks), DATA)
+        self.assertGreater(len(chunks), 1)
+
+        for chunk in chunks:
+            self.assertTrue(chunk.endswith(b"\n"))
+
+    def test_iter_lines(self):
+        with ReadaheadReader(io.BytesIO(DATA), buffer_size=100) as reader:
+            lines = list(reader.iter_lines())
+
+        self.assertEqual([x.rstrip("\r") for x in lines], LINES)
+
+    def test_close_before_end(self):
+        reader = ReadaheadReader(
+            io.BytesIO(DATA * 100), buffer_size=16, queue_size=1,
+        )
+        next(iter(reader))
+        reader.close()
+
+    def test_errors(self):
+        reader = ReadaheadReader(FailingStream(DATA))
+
+        with self.assertRaises(IOError):
+            list(reader)
+
+        reader.close()
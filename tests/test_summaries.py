@@ -0,0 +1,90 @@
+# coding: utf-8
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from il2fb.parsers.game_log import summaries
+from il2fb.parsers.game_log.summaries import (
+    get_sidecar_path, build_summary, load_summary, get_summary,
+)
+
+from .test_archives import LINES
+
+
+class SummariesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(SummariesTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "eventlog.lst")
+        self.write_log(LINES + ["foo bar", ""])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(SummariesTestCase, self).tearDown()
+
+    def write_log(self, lines):
+        with open(self.path, 'wb') as f:
+            f.write("\n".join(lines).encode('latin-1'))
+
+    def test_build_summary(self):
+        summary = build_summary(self.path)
+        date = datetime.date(2013, 9, 15)
+
+        self.assertEqual(summary.size, os.path.getsize(self.path))
+        self.assertEqual(summary.counts['HumanHasConnected'], 1)
+        self.assertEqual(sum(summary.counts.values()), len(LINES))
+        self.assertEqual(summary.callsigns, ["User0", "User1"])
+        self.assertEqual(summary.start, (date, datetime.time(20, 33, 5)))
+        self.assertEqual(summary.end, (date, datetime.time(20, 33, 15)))
+        self.assertEqual(summary.unknown_lines, 1)
+
+        self.assertEqual(len(summary.missions), 1)
+        self.assertEqual(summary.missions[0].mission, "path/PH.mis")
+        self.assertTrue(summary.missions[0].was_won)
+
+    def test_get_summary(self):
+        self.assertIsNone(load_summary(self.path))
+
+        summary = get_summary(self.path)
+        self.assertTrue(os.path.exists(get_sidecar_path(self.path)))
+        self.assertEqual(load_summary(self.path), summary)
+
+        with mock.patch.object(summaries, 'build_summary') as build:
+            self.assertEqual(get_summary(self.path), summary)
+            self.assertFalse(build.called)
+
+    def test_get_summary_of_touched_file(self):
+        summary = get_summary(self.path)
+        mtime = summary.mtime + 10
+        os.utime(self.path, (mtime, mtime))
+
+        with mock.patch.object(summaries, 'build_summary') as build:
+            touched = get_summary(self.path)
+            self.assertFalse(build.called)
+
+        self.assertEqual(touched.mtime, mtime)
+        self.assertEqual(touched._replace(mtime=summary.mtime), summary)
+        self.assertEqual(load_summary(self.path).mtime, mtime)
+
+    def test_get_summary_of_changed_file(self):
+        summary = get_summary(self.path)
+        self.write_log(LINES[:3] + ["[8:33:06 PM] User2 has connected"])
+        os.utime(self.path, (summary.mtime, summary.mtime))
+
+        changed = get_summary(self.path)
+        self.assertNotEqual(changed.digest, summary.digest)
+        self.assertEqual(changed.callsigns, ["User2"])
+        self.assertEqual(changed.unknown_lines, 0)
+
+    def test_broken_sidecar(self):
+        with open(get_sidecar_path(self.path), 'w') as f:
+            f.write("{")
+
+        self.assertIsNone(load_summary(self.path))
+        self.assertEqual(get_summary(self.path).unknown_lines, 1)
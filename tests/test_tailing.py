@@ -0,0 +1,156 @@
+# coding: utf-8
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from il2fb.parsers.game_log.tailing import TailManager
+
+
+class TailManagerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(TailManagerTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.loop = asyncio.new_event_loop()
+        self.manager = TailManager(interval=0.01)
+
+    def tearDown(self):
+        self.manager.close()
+        self.loop.close()
+        shutil.rmtree(self.directory)
+        super(TailManagerTestCase, self).tearDown()
+
+    def get_path(self, name):
+        return os.path.join(self.directory, name)
+
+    def append(self, path, data):
+        with open(path, 'ab') as f:
+            f.write(data.encode('latin-1'))
+
+    def poll(self):
+        return self.loop.run_until_complete(self.manager.poll())
+
+    def get_callsigns(self, queue):
+        results = []
+
+        while not queue.empty():
+            results.append(queue.get_nowait().actor.callsign)
+
+        return results
+
+    def test_poll(self):
+        first = self.get_path("first.lst")
+        second = self.get_path("second.lst")
+        self.append(first, "[8:33:05 PM] Old has connected\n")
+
+        first_queue = self.manager.add_file(first)
+        second_queue = self.manager.add_file(second, tag='second')
+        self.assertEqual(self.poll(), 0)
+
+        self.append(first, "[8:33:05 PM] User0 has connected\n")
+        self.append(first, "foo bar\n[8:33:05 PM] User1 has")
+        self.append(second, "[8:33:05 PM] User2 has connected\r\n")
+        self.assertEqual(self.poll(), 3)
+        self.assertEqual(self.get_callsigns(first_queue), ["User0", ])
+        self.assertEqual(self.get_callsigns(second_queue), ["User2", ])
+
+        self.append(first, " connected\n")
+        self.assertEqual(self.poll(), 1)
+        self.assertEqual(self.get_callsigns(first_queue), ["User1", ])
+
+        self.assertEqual(self.manager.get_offsets(), {
+            first: os.path.getsize(first),
+            'second': os.path.getsize(second),
+        })
+        self.assertIs(self.manager.get_queue('second'), second_queue)
+
+    def test_fair_batches(self):
+        manager = TailManager(batch_size=40)
+        first = self.get_path("first.lst")
+        second = self.get_path("second.lst")
+        first_queue = manager.add_file(first)
+        second_queue = manager.add_file(second)
+
+        for i in range(5):
+            line = "[8:33:05 PM] User{0} has connected\n".format(i)
+            self.append(first, line)
+
+        self.append(second, "[8:33:05 PM] User9 has connected\n")
+
+        try:
+            count = self.loop.run_until_complete(manager.poll())
+            self.assertEqual(count, 2)
+            self.assertEqual(self.get_callsigns(first_queue), ["User0", ])
+            self.assertEqual(self.get_callsigns(second_queue), ["User9", ])
+        finally:
+            manager.close()
+
+    def test_full_queue(self):
+        first = self.get_path("first.lst")
+        second = self.get_path("second.lst")
+        first_queue = self.manager.add_file(first, queue_size=1)
+        second_queue = self.manager.add_file(second)
+
+        self.append(first, "[8:33:05 PM] User0 has connected\n" * 3)
+        self.append(second, "[8:33:05 PM] User1 has connected\n")
+        self.assertEqual(self.poll(), 4)
+        self.assertEqual(self.get_callsigns(second_queue), ["User1", ])
+
+        # Log is not read further while its events wait for the queue.
+        self.append(first, "[8:33:05 PM] User2 has connected\n")
+        self.append(second, "[8:33:05 PM] User3 has connected\n")
+        self.assertEqual(self.poll(), 1)
+        self.assertEqual(self.get_callsigns(second_queue), ["User3", ])
+
+        async def consume():
+            return [(await first_queue.get()) for i in range(3)]
+
+        results = self.loop.run_until_complete(consume())
+        self.assertEqual(
+            [x.actor.callsign for x in results], ["User0", "User0", "User0"],
+        )
+        self.assertEqual(self.poll(), 1)
+        self.assertEqual(self.get_callsigns(first_queue), ["User2", ])
+
+    def test_truncated_file(self):
+        path = self.get_path("eventlog.lst")
+        self.append(path, "[8:33:05 PM] User0 has connected\n" * 2)
+        queue = self.manager.add_file(path, from_end=False)
+        self.assertEqual(self.poll(), 2)
+
+        with open(path, 'w') as f:
+            f.write("[8:33:05 PM] User1 has connected\n")
+
+        self.assertEqual(self.poll(), 1)
+        self.assertEqual(
+            self.get_callsigns(queue), ["User0", "User0", "User1"],
+        )
+
+    def test_add_file_twice(self):
+        path = self.get_path("eventlog.lst")
+        self.manager.add_file(path)
+
+        with self.assertRaises(ValueError):
+            self.manager.add_file(path)
+
+        self.manager.remove_file(path)
+        self.manager.add_file(path)
+
+    def test_run(self):
+        path = self.get_path("eventlog.lst")
+        queue = self.manager.add_file(path)
+
+        async def consume():
+            self.append(path, "[8:33:05 PM] User0 has connected\n")
+            event = await asyncio.wait_for(queue.get(), 5)
+            self.manager.stop()
+            return event
+
+        async def main():
+            return await asyncio.gather(self.manager.run(), consume())
+
+        results = self.loop.run_until_complete(main())
+        self.assertEqual(results[1].actor.callsign, "User0")
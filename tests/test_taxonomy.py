@@ -0,0 +1,90 @@
+# coding: utf-8
+
+import unittest
+
+from il2fb.parsers.game_log import events, taxonomy
+from il2fb.parsers.game_log.lazy import make_lazy_event_class
+
+
+class TaxonomyTestCase(unittest.TestCase):
+
+    def test_all_events_have_type_codes(self):
+        self.assertEqual(
+            set(taxonomy.TYPE_CODES),
+            set(events.get_all_events()),
+        )
+
+    def test_type_codes_are_stable(self):
+        self.assertEqual(
+            taxonomy.get_event_type_code(events.MissionIsPlaying), 1,
+        )
+        self.assertEqual(
+            taxonomy.get_event_type_code(events.AIAircraftCrewMemberHasLanded),
+            129,
+        )
+
+    def test_get_event_type_code(self):
+        event = events.MissionHasBegun(time=None)
+        self.assertEqual(taxonomy.get_event_type_code(event), 2)
+
+        lazy_class = make_lazy_event_class(events.MissionHasBegun)
+        self.assertEqual(taxonomy.get_event_type_code(lazy_class), 2)
+
+    def test_get_event_type_code_of_unknown_event(self):
+
+        class Event(events.ParsableEvent):
+            verbose_name = "Event"
+            matcher = None
+
+        with self.assertRaises(ValueError) as cm:
+            taxonomy.get_event_type_code(Event)
+
+        self.assertEqual(
+            str(cm.exception), "Event Event is not known to taxonomy",
+        )
+
+    def test_get_event_class(self):
+        self.assertIs(taxonomy.get_event_class(2), events.MissionHasBegun)
+
+        with self.assertRaises(ValueError):
+            taxonomy.get_event_class(0)
+
+    def test_get_event_categories(self):
+        self.assertEqual(
+            taxonomy.get_event_categories(
+                events.AIAircraftCrewMemberWasKilledByHumanAircraft
+            ),
+            (
+                taxonomy.KILL |
+                taxonomy.CREW_CASUALTY |
+                taxonomy.HUMAN_INVOLVED |
+                taxonomy.AI_INVOLVED
+            ),
+        )
+        self.assertEqual(
+            taxonomy.get_event_categories(events.TreeWasDestroyed),
+            taxonomy.GROUND_DESTRUCTION,
+        )
+        self.assertEqual(
+            taxonomy.get_event_categories(events.HumanAircraftWasDamagedOnGround),
+            taxonomy.DAMAGE | taxonomy.HUMAN_INVOLVED,
+        )
+        self.assertEqual(
+            taxonomy.get_event_categories(events.TargetStateWasChanged),
+            taxonomy.NONE,
+        )
+
+    def test_get_events_by_categories(self):
+        self.assertEqual(
+            taxonomy.get_events_by_categories(
+                taxonomy.CONNECTION | taxonomy.MISSION_LIFECYCLE
+            ),
+            [
+                events.MissionIsPlaying,
+                events.MissionHasBegun,
+                events.MissionHasEnded,
+                events.MissionWasWon,
+                events.HumanHasConnected,
+                events.HumanHasDisconnected,
+            ]
+        )
@@ -0,0 +1,44 @@
+# coding: utf-8
+
+import unittest
+
+from il2fb.commons import actors
+
+from il2fb.parsers.game_log.parsers import GameLogEventParser
+from il2fb.parsers.game_log.tokens import (
+    get_actor_tokens, get_event_tokens, make_token,
+)
+
+
+class TokensTestCase(unittest.TestCase):
+
+    def test_make_token(self):
+        self.assertEqual(make_token('callsign', "User0"), "callsign:User0")
+
+    def test_get_actor_tokens(self):
+        self.assertEqual(
+            get_actor_tokens(actors.Human("User0")),
+            ["callsign:User0", ],
+        )
+        self.assertEqual(
+            get_actor_tokens(
+                actors.HumanAircraftCrewMember("User0", "Pe-8", 1)
+            ),
+            ["callsign:User0", "aircraft:Pe-8"],
+        )
+        self.assertEqual(
+            get_actor_tokens(actors.AIAircraft("r0100", 1)),
+            ["flight:r0100", ],
+        )
+        self.assertEqual(get_actor_tokens(actors.StationaryUnit("0")), [])
+
+    def test_get_event_tokens(self):
+        event = GameLogEventParser().parse(
+            "[8:33:05 PM] User0:Pe-8 shot down by User1:Bf-109G-2 and r01000 "
+            "at 100.0 200.99"
+        )
+        self.assertEqual(get_event_tokens(event), set([
+            "callsign:User0", "aircraft:Pe-8",
+            "callsign:User1", "aircraft:Bf-109G-2",
+            "flight:r0100",
+        ]))
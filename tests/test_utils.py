@@ -0,0 +1,46 @@
+# coding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from il2fb.parsers.game_log.utils import atomic_write
+
+
+class AtomicWriteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(AtomicWriteTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "file")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(AtomicWriteTestCase, self).tearDown()
+
+    def test_write(self):
+        with atomic_write(self.path) as f:
+            f.write(b"foo")
+
+        with atomic_write(self.path, 'w') as f:
+            f.write("bar")
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "bar")
+
+        self.assertEqual(os.listdir(self.directory), ["file", ])
+
+    def test_failure(self):
+        with atomic_write(self.path) as f:
+            f.write(b"foo")
+
+        with self.assertRaises(ValueError):
+            with atomic_write(self.path) as f:
+                f.write(b"bar")
+                raise ValueError
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b"foo")
+
+        self.assertEqual(os.listdir(self.directory), ["file", ])